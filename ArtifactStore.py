@@ -0,0 +1,171 @@
+# ==================================
+# ArtifactStore.py
+# ==================================
+
+from dotenv import dotenv_values
+import threading
+import tempfile
+import hashlib
+import sqlite3
+import json
+import time
+import os
+
+# ==============================
+# Load Environment Variables
+# ==============================
+env_vars = dotenv_values(".env")
+ARTIFACT_DIR = os.path.join("Data", "Artifacts")
+ArtifactCacheMB = float(env_vars.get("ArtifactCacheMB", 512))
+
+# Opt-in: serve a previous result for the same model/prompt/parameters
+# instead of calling the API again.
+ReuseArtifacts = env_vars.get("ReuseArtifacts", "False").strip().lower() == "true"
+
+# ==============================
+# Keys
+# ==============================
+def ArtifactKey(model: str, prompt: str, params: dict | None = None) -> str:
+    identity = json.dumps({"model": model, "prompt": prompt, "params": params or {}}, sort_keys=True)
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+# ==============================
+# Content-Addressed Store
+# ==============================
+# Blobs live at <root>/<first two hex chars>/<key><ext>. A SQLite index maps
+# key -> file, size and last access, so lookups are a primary-key read and
+# eviction removes the least recently used blobs once the store is over
+# its size limit. The total size is kept as a running count; it is only
+# re-read from the index when it says eviction is due (another process, such
+# as the image worker, may share the same store).
+class ArtifactStore:
+    def __init__(self, root: str = ARTIFACT_DIR, max_bytes: int = int(ArtifactCacheMB * 1024 * 1024)):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            "key TEXT PRIMARY KEY, "
+            "path TEXT NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "model TEXT, "
+            "prompt TEXT, "
+            "created REAL NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS artifacts_last_access ON artifacts (last_access)")
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path_for(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT path, size FROM artifacts WHERE key = ?", (key,)).fetchone()
+            if row is None or not os.path.exists(row[0]):
+                if row is not None:
+                    self._conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+                    self._total -= row[1]
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE artifacts SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return row[0]
+
+    def get(self, key: str) -> bytes | None:
+        path = self.path_for(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT path FROM artifacts WHERE key = ?", (key,)).fetchone()
+        return row is not None and os.path.exists(row[0])
+
+    def put(self, key: str, data: bytes, ext: str = "", model: str = "", prompt: str = "") -> str:
+        folder = os.path.join(self.root, key[:2])
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, key + ext)
+
+        # Write then rename, so a crash never leaves a truncated blob behind.
+        # Each writer gets its own temp file: two threads may store the same
+        # key at once (prewarming and live speech both saying "Opening youtube").
+        descriptor, temp_path = tempfile.mkstemp(dir=folder, prefix=key, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM artifacts WHERE key = ?", (key,)).fetchone()
+            self._total += len(data) - (row[0] if row else 0)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (key, path, size, model, prompt, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, path, len(data), model, prompt[:500], now, now),
+            )
+            self._evict()
+        return path
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        self._total = total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, path, size in self._conn.execute(
+            "SELECT key, path, size FROM artifacts ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self._conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+        self._total = total
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# ==============================
+# Shared Instance
+# ==============================
+_store = None
+_store_lock = threading.Lock()
+
+def GetArtifactStore() -> ArtifactStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
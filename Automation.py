@@ -4,165 +4,17 @@
 
 from AppOpener import close, open as appopen
 from webbrowser import open as webopen
-from pywhatkit import search, playonyt
+from pywhatkit import playonyt
 from dotenv import dotenv_values
-from bs4 import BeautifulSoup
 from rich import print
 import subprocess
-import requests
-import asyncio
-import os
-
-# ==============================
-# Load Environment Variables
-# ==============================
-env = dotenv_values(".env")
-HuggingFaceAPIKey = env.get("HuggingFaceAPIKey")  # ✅ Changed to HuggingFace
-Username = env.get("Username", "User")
-
-# ==============================
-# HuggingFace Setup
-# ==============================
-messages = []
-
-SystemChatBot = [
-    {
-        "role": "system",
-        "content": (
-            f"You are {Username}'s helpful AI assistant. "
-            "You write content like letters, notes, emails, applications, and poems when asked."
-        ),
-    }
-]
-
-# ==============================
-# Content Writer (on-demand only)
-# ==============================
-def Content(topic: str):
-    def OpenNotepad(file):
-        subprocess.Popen(["Notepad", file])
-
-    def ContentWriterAI(prompt: str) -> str:
-        messages.append({"role": "user", "content": prompt})
-
-        payload = {
-            "inputs": SystemChatBot + messages,
-            "parameters": {
-                "max_new_tokens": 2048,
-                "temperature": 0.7,
-                "top_p": 1,
-            },
-        }
-
-        response = requests.post(
-            "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.2",  # ✅ HuggingFace Model
-            headers={
-                "Authorization": f"Bearer {HuggingFaceAPIKey}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-        )
-
-        response.raise_for_status()
-        result = response.json()
-
-        # ✅ HuggingFace returns generated_text
-        if isinstance(result, list) and "generated_text" in result[0]:
-            Answer = result[0]["generated_text"]
-        else:
-            Answer = str(result)
-
-        messages.append({"role": "assistant", "content": Answer})
-        return Answer.strip()
-
-    topic_clean = topic.strip()
-    ContentByAI = ContentWriterAI(topic_clean)
-
-    filepath = rf"Data\{topic_clean.lower().replace(' ', '_')}.txt"
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(ContentByAI)
-
-    OpenNotepad(filepath)
-    return True
-
-# ==============================
-# Other Automation Functions
-# ==============================
-def GoogleSearch(query: str):
-    url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
-    webopen(url)
-
-def YoutubeSearch(query: str):
-    url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
-    webopen(url)
-
-def OpenWebsite(url: str):
-    if not url.startswith("http"):
-        url = "https://" + url
-    webopen(url)
-
-def OpenApplication(app: str):
-    appopen(app, match_closest=True, output=True)
-
-def CloseApplication(app: str):
-    close(app, match_closest=True, output=True)
-
-# ==============================
-# Async Command Executor
-# ==============================
-async def TranslateAndExecute(commands: list[str]):
-    funcs = []
-    for command in commands:
-        cmd = command.lower()
-
-        if cmd.startswith("content "):
-            fun = asyncio.to_thread(Content, cmd.removeprefix("content "))
-            funcs.append(fun)
-
-        elif cmd.startswith("google "):
-            fun = asyncio.to_thread(GoogleSearch, cmd.removeprefix("google "))
-            funcs.append(fun)
-
-        elif cmd.startswith("youtube "):
-            fun = asyncio.to_thread(YoutubeSearch, cmd.removeprefix("youtube "))
-            funcs.append(fun)
-
-        elif cmd.startswith("open website "):
-            fun = asyncio.to_thread(OpenWebsite, cmd.removeprefix("open website "))
-            funcs.append(fun)
-
-        elif cmd.startswith("open app "):
-            fun = asyncio.to_thread(OpenApplication, cmd.removeprefix("open app "))
-            funcs.append(fun)
-
-        elif cmd.startswith("close app "):
-            fun = asyncio.to_thread(CloseApplication, cmd.removeprefix("close app "))
-            funcs.append(fun)
-
-    results = await asyncio.gather(*funcs)
-    for result in results:
-        yield result
-
-async def Automation(commands: list[str]):
-    async for _ in TranslateAndExecute(commands):
-        pass
-    return True
-
-# ==============================
-# Test Run
-# ==============================
-if __name__ == "__main__":# ==================================
-# Automation.py
-# ==================================
-
- from AppOpener import close, open as appopen
-from webbrowser import open as webopen
-from dotenv import dotenv_values
-from rich import print
-import subprocess
-import requests
+import threading
+import time
+from Backend.Resilience import ResilientCall, GetBackend, LatencyHistogram
+from Backend.HttpClient import GetSession, HuggingFaceModelURL
+from Backend.ArtifactStore import GetArtifactStore, ArtifactKey, ReuseArtifacts
+from Backend.Reminders import GetReminderScheduler, DescribeWhen
+from Backend.IntentClassifier import SplitDecisions
 import asyncio
 import os
 
@@ -172,6 +24,7 @@ import os
 env = dotenv_values(".env")
 HuggingFaceAPIKey = env.get("HuggingFaceAPIKey")  # ✅ HuggingFace Key
 Username = env.get("Username", "User")
+SystemBackendName = env.get("SystemBackend", "keyboard")  # "stub" records tasks without touching the OS
 
 # ==============================
 # HuggingFace Setup
@@ -188,6 +41,13 @@ SystemChatBot = [
     }
 ]
 
+CONTENT_MODEL = "mistralai/Mistral-7B-Instruct-v0.2"
+CONTENT_PARAMETERS = {
+    "max_new_tokens": 2048,
+    "temperature": 0.7,
+    "top_p": 1,
+}
+
 # ==============================
 # Content Writer (on-demand only)
 # ==============================
@@ -200,24 +60,28 @@ def Content(topic: str):
 
         payload = {
             "inputs": SystemChatBot + messages,
-            "parameters": {
-                "max_new_tokens": 2048,
-                "temperature": 0.7,
-                "top_p": 1,
-            },
+            "parameters": CONTENT_PARAMETERS,
         }
 
-        response = requests.post(
-            "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.2",
-            headers={
-                "Authorization": f"Bearer {HuggingFaceAPIKey}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-        )
-
-        response.raise_for_status()
-        result = response.json()
+        def Post():
+            # ✅ Pooled keep-alive session shared with image generation
+            response = GetSession().post(
+                HuggingFaceModelURL(CONTENT_MODEL),
+                headers={
+                    "Authorization": f"Bearer {HuggingFaceAPIKey}",
+                    "Content-Type": "application/json",
+                },
+                json=payload,
+                timeout=GetBackend("huggingface").timeout,
+            )
+            response.raise_for_status()
+            return response.json()
+
+        # ✅ Deadline, capped retries and circuit breaker; None if HuggingFace is down
+        result = ResilientCall("huggingface", Post, fallback=None)
+        if result is None:
+            messages.pop()
+            return ""
 
         # ✅ HuggingFace returns generated_text
         if isinstance(result, list) and "generated_text" in result[0]:
@@ -229,7 +93,21 @@ def Content(topic: str):
         return Answer.strip()
 
     topic_clean = topic.strip()
-    ContentByAI = ContentWriterAI(topic_clean)
+
+    # ✅ Same model, topic and parameters -> same content address
+    store = GetArtifactStore()
+    key = ArtifactKey(CONTENT_MODEL, topic_clean.lower(), CONTENT_PARAMETERS)
+    cached = store.get(key) if ReuseArtifacts else None
+
+    if cached is not None:
+        print(f"[cyan]Reusing previous content for '{topic_clean}'.[/cyan]")
+        ContentByAI = cached.decode("utf-8")
+    else:
+        ContentByAI = ContentWriterAI(topic_clean)
+        if not ContentByAI:
+            print(f"[red]Could not write content for '{topic_clean}'.[/red]")
+            return False
+        store.put(key, ContentByAI.encode("utf-8"), ".txt", model=CONTENT_MODEL, prompt=topic_clean)
 
     filepath = rf"Data\{topic_clean.lower().replace(' ', '_')}.txt"
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
@@ -256,58 +134,279 @@ def OpenWebsite(url: str):
         url = "https://" + url
     webopen(url)
 
-def OpenApplication(app: str):
+# Returns True if the app was opened, False if it fell back to a web search.
+def OpenApplication(app: str) -> bool:
     try:
         print(f"[cyan]Trying to open {app}...[/cyan]")
-        appopen(app, match_closest=True, output=True)
+        appopen(app, match_closest=True, output=True, throw_error=True)
+        return True
     except Exception as e:
         print(f"[red]App '{app}' not found. Searching online...[/red]")
         # ✅ If app not installed → search online
         GoogleSearch(app)
+        return False
 
-def CloseApplication(app: str):
+def CloseApplication(app: str) -> bool:
     try:
-        close(app, match_closest=True, output=True)
+        close(app, match_closest=True, output=True, throw_error=True)
+        return True
     except Exception:
         print(f"[yellow]Could not close {app}. Maybe it is not running.[/yellow]")
+        return False
+
+def PlayYoutube(query: str):
+    playonyt(query)
 
 # ==============================
-# Async Command Executor
+# System Backends
 # ==============================
-async def TranslateAndExecute(commands: list[str]):
-    funcs = []
-    for command in commands:
-        cmd = command.lower()
+# `system` tasks and how they are spoken in the summary.
+SYSTEM_TASKS = {
+    "mute": "muting",
+    "unmute": "unmuting",
+    "volume up": "turning up",
+    "volume down": "turning down",
+}
+
+# Presses the media keys through the `keyboard` package.
+class KeyboardSystemBackend:
+    KEYS = {
+        "mute": "volume mute",
+        "unmute": "volume mute",
+        "volume up": "volume up",
+        "volume down": "volume down",
+    }
 
-        if cmd.startswith("content "):
-            fun = asyncio.to_thread(Content, cmd.removeprefix("content "))
-            funcs.append(fun)
+    def __init__(self):
+        import keyboard  # only needed (and only importable with permissions) when actually used
+        self._keyboard = keyboard
+
+    def run(self, task: str) -> bool:
+        self._keyboard.press_and_release(self.KEYS[task])
+        return True
+
+# Records tasks instead of performing them (tests, headless machines).
+class StubSystemBackend:
+    def __init__(self):
+        self.calls = []
+
+    def run(self, task: str) -> bool:
+        self.calls.append(task)
+        return True
+
+SYSTEM_BACKENDS = {
+    "keyboard": KeyboardSystemBackend,
+    "stub": StubSystemBackend,
+}
+
+_system_backend = None
+_system_backend_lock = threading.Lock()
+
+def GetSystemBackend():
+    global _system_backend
+    with _system_backend_lock:
+        if _system_backend is None:
+            _system_backend = SYSTEM_BACKENDS.get(SystemBackendName, KeyboardSystemBackend)()
+        return _system_backend
+
+def SetSystemBackend(backend):
+    global _system_backend
+    _system_backend = backend
+
+def System(task: str) -> bool:
+    task = task.strip()
+    if task not in SYSTEM_TASKS:
+        print(f"[yellow]Unknown system task '{task}'.[/yellow]")
+        return False
+    return GetSystemBackend().run(task)
 
-        elif cmd.startswith("google "):
-            fun = asyncio.to_thread(GoogleSearch, cmd.removeprefix("google "))
-            funcs.append(fun)
+# ==============================
+# Command Registry
+# ==============================
+# Every automation verb FirstLayerDMM can emit maps to one handler. Verbs are
+# one or two words ("open", "google search"), so finding the handler for a
+# command is at most two dict lookups however many verbs are registered.
+# general, realtime, generate image and exit are answered by Main.py.
+#
+# Handlers take the text after the verb and return (ok, verb, target), which
+# feeds the spoken summary ("opening" + "chrome"). Commands in the same lane
+# run one after another in the order given; `per_target` gives each target
+# its own lane (opening then closing the same app).
+COMMANDS = {}  # verb -> (name, handler, lane, per_target)
+CommandLatency = {}  # name -> LatencyHistogram
+CommandFailures = {}  # name -> count
+
+def Command(name: str, *verbs: str, lane: str | None = None, per_target: bool = False):
+    def register(handler):
+        for verb in (name,) + verbs:
+            COMMANDS[verb] = (name, handler, lane, per_target)
+        CommandLatency[name] = LatencyHistogram()
+        CommandFailures[name] = 0
+        return handler
+    return register
+
+# Returns (name, handler, lane, per_target), argument; the entry is None for unknown verbs.
+def ParseCommand(command: str):
+    words = command.lower().split(maxsplit=2)
+    if len(words) >= 2 and f"{words[0]} {words[1]}" in COMMANDS:
+        return COMMANDS[f"{words[0]} {words[1]}"], (words[2] if len(words) > 2 else "").strip()
+    if words and words[0] in COMMANDS:
+        return COMMANDS[words[0]], " ".join(words[1:]).strip()
+    return None, command.lower().strip()
+
+def IsCommand(command: str) -> bool:
+    return ParseCommand(command)[0] is not None
+
+# Known websites open in the browser; any other "open X" is treated as an app.
+WEBSITES = {
+    "youtube": "https://www.youtube.com",
+    "google": "https://www.google.com",
+    "twitter": "https://twitter.com",
+    "instagram": "https://www.instagram.com",
+    "facebook": "https://www.facebook.com",
+    "github": "https://github.com",
+}
+
+@Command("open", "open app", lane="app", per_target=True)
+def HandleOpen(target: str):
+    if target in WEBSITES:
+        OpenWebsite(WEBSITES[target])
+        return True, "opening", target
+    if OpenApplication(target):
+        return True, "opening", target
+    return False, "searching online for", target  # app not installed
+
+@Command("open website")
+def HandleOpenWebsite(url: str):
+    OpenWebsite(url)
+    return True, "opening", url
+
+@Command("close", "close app", lane="app", per_target=True)
+def HandleClose(target: str):
+    ok = CloseApplication(target)
+    return ok, "closing" if ok else "failed to close", target
+
+@Command("play", lane="play")
+def HandlePlay(song: str):
+    PlayYoutube(song)
+    return True, "playing", song
+
+@Command("system", lane="system")
+def HandleSystem(task: str):
+    if System(task):
+        return True, SYSTEM_TASKS[task.strip()], "the volume"
+    return False, "can't do", task
+
+@Command("content", lane="content")
+def HandleContent(topic: str):
+    ok = Content(topic)
+    return ok, "writing" if ok else "failed to write", topic
+
+@Command("google search", "google")
+def HandleGoogleSearch(query: str):
+    GoogleSearch(query)
+    return True, "searching Google for", query
+
+@Command("youtube search", "youtube")
+def HandleYoutubeSearch(query: str):
+    YoutubeSearch(query)
+    return True, "searching YouTube for", query
+
+@Command("reminder")
+def HandleReminder(details: str):
+    try:
+        reminder = GetReminderScheduler().add_from_text(details)
+    except ValueError as e:
+        print(f"[yellow]{e}[/yellow]")
+        return False, "couldn't understand the reminder", details
+    return True, "setting a reminder for", f"{reminder['message']} {DescribeWhen(reminder['due'])}"
+
+# Runs one decision and returns (command, ok, verb, target).
+def ExecuteCommand(command: str):
+    entry, argument = ParseCommand(command)
+    if entry is None:
+        return (command, False, "can't handle", command.lower().strip())
+
+    name, handler, _, _ = entry
+    started = time.perf_counter()
+    try:
+        ok, verb, target = handler(argument)
+    except Exception as e:
+        print(f"[red]Error running '{command}': {e}[/red]")
+        ok, verb, target = False, "failed to run", command.lower().strip()
+    CommandLatency[name].observe((time.perf_counter() - started) * 1000)
+    if not ok:
+        CommandFailures[name] += 1
+    return (command, ok, verb, target)
+
+def CommandStats() -> dict:
+    return {
+        name: {"failures": CommandFailures[name], "latency": histogram.snapshot()}
+        for name, histogram in CommandLatency.items() if histogram.count
+    }
 
-        elif cmd.startswith("youtube "):
-            fun = asyncio.to_thread(YoutubeSearch, cmd.removeprefix("youtube "))
-            funcs.append(fun)
+def Lane(command: str, index: int):
+    entry, argument = ParseCommand(command)
+    if entry is None or entry[2] is None:
+        return index
+    _, _, lane, per_target = entry
+    return (lane, argument) if per_target else lane
+
+def JoinWords(words: list[str], last: str = " and ") -> str:
+    if len(words) < 2:
+        return "".join(words)
+    return ", ".join(words[:-1]) + last + words[-1]
+
+# One sentence for the whole batch: "Opening facebook and telegram, and closing whatsapp."
+def SummarizeResults(results) -> str:
+    grouped = {}
+    for _, _, verb, target in results:
+        grouped.setdefault(verb, []).append(target)
+    parts = [f"{verb} {JoinWords(targets)}" for verb, targets in grouped.items()]
+    if not parts:
+        return ""
+    sentence = JoinWords(parts, ", and " if len(parts) > 2 or any(" and " in p for p in parts) else " and ")
+    return sentence[0].upper() + sentence[1:] + "."
 
-        elif cmd.startswith("open website "):
-            fun = asyncio.to_thread(OpenWebsite, cmd.removeprefix("open website "))
-            funcs.append(fun)
+# ==============================
+# Async Command Executor
+# ==============================
+async def TranslateAndExecute(commands: list[str] | str):
+    if isinstance(commands, str):
+        commands = [commands]
+    # A run-on decision ("open facebook, open telegram") is several commands.
+    commands = [part for command in commands for part in SplitDecisions(command)]
+
+    lanes = {}
+    for index, command in enumerate(commands):
+        lanes.setdefault(Lane(command, index), []).append((index, command))
 
-        elif cmd.startswith("open app "):
-            fun = asyncio.to_thread(OpenApplication, cmd.removeprefix("open app "))
-            funcs.append(fun)
+    async def RunLane(lane):
+        return [(index, await asyncio.to_thread(ExecuteCommand, command)) for index, command in lane]
 
-        elif cmd.startswith("close app "):
-            fun = asyncio.to_thread(CloseApplication, cmd.removeprefix("close app "))
-            funcs.append(fun)
+    results = {}
+    for finished in await asyncio.gather(*(RunLane(lane) for lane in lanes.values())):
+        results.update(finished)
 
-    results = await asyncio.gather(*funcs)
-    for result in results:
-        yield result
+    # Yield in the order the commands were given.
+    for index in sorted(results):
+        yield results[index]
 
-async def Automation(commands: list[str]):
+async def Automation(commands: list[str] | str):
     async for _ in TranslateAndExecute(commands):
         pass
     return True
+
+# Runs every decision and returns one spoken summary of what was done.
+async def RunDecisions(commands: list[str] | str) -> str:
+    results = [result async for result in TranslateAndExecute(commands)]
+    return SummarizeResults(results)
+
+# ==============================
+# Test Run
+# ==============================
+if __name__ == "__main__":
+    while True:
+        commands = [c.strip() for c in input(">>> ").split(",") if c.strip()]
+        print(asyncio.run(RunDecisions(commands)))
+        print(CommandStats())
@@ -0,0 +1,147 @@
+# ==================================
+# Cache.py
+# ==================================
+
+from collections import OrderedDict
+import threading
+import atexit
+import json
+import time
+import os
+
+# ==============================
+# LRU + TTL Cache
+# ==============================
+# An OrderedDict in recency order gives O(1) get/put/evict. Each entry keeps
+# its own expiry so callers can give fresher data a shorter lifetime. With a
+# path the cache is saved as JSON (written to a temp file, then renamed, so a
+# crash never leaves a half-written file) and reloaded on start. Saving is
+# debounced: changes mark the cache dirty and one write happens `save_delay`
+# seconds later (and at exit), on a timer thread, so put() never does disk I/O.
+class TTLCache:
+    def __init__(self, maxsize: int = 256, ttl: float = 3600, path: str | None = None, save_delay: float = 2.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.save_delay = save_delay
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # one writer of the temp file at a time
+        self._dirty = False
+        self._timer = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saves = 0
+        if path:
+            self._load()
+            atexit.register(self.flush)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, ttl: float | None = None):
+        with self._lock:
+            self._data[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        self._mark_dirty()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[0] >= time.time()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    # Live keys, least recently used first.
+    def keys(self) -> list:
+        with self._lock:
+            now = time.time()
+            return [key for key, (expires_at, _) in self._data.items() if expires_at >= now]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        if not self.path:
+            return
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # Writes pending changes now (called by the timer and at exit).
+    def flush(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if dirty:
+            self.save()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "saves": self.saves,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def save(self):
+        with self._lock:
+            now = time.time()
+            entries = [[key, expires_at, value] for key, (expires_at, value) in self._data.items() if expires_at >= now]
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with self._save_lock:
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f)
+                os.replace(temp_path, self.path)
+                self.saves += 1
+            except (OSError, TypeError) as e:
+                print(f"⚠️ Could not save cache {self.path}: {e}")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable cache {self.path}: {e}")
+            return
+        now = time.time()
+        for key, expires_at, value in entries[-self.maxsize:]:
+            if expires_at >= now:
+                self._data[key] = (expires_at, value)
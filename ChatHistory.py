@@ -0,0 +1,204 @@
+# ==================================
+# ChatHistory.py
+# ==================================
+
+import sqlite3
+import threading
+import json
+import time
+import sys
+import os
+
+# ==============================
+# Paths
+# ==============================
+DATABASE_PATH = os.path.join("Data", "ChatLog.db")
+LEGACY_JSON_PATH = os.path.join("Data", "ChatLog.json")  # old whole-file log, migrated once
+
+# ==============================
+# Chat History Store
+# ==============================
+# Every message is one row, so a turn costs one INSERT no matter how long the
+# history is. SQLite's WAL journal makes each write atomic: after a crash the
+# log is either before or after the last turn, never half written.
+class ChatHistory:
+    def __init__(self, path: str = DATABASE_PATH, legacy_json: str = LEGACY_JSON_PATH):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "role TEXT NOT NULL, "
+            "content TEXT NOT NULL, "
+            "created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        if legacy_json:
+            self.migrate_from_json(legacy_json)
+
+    def _insert(self, rows):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO messages (role, content, created) VALUES (?, ?, ?)",
+                    [(role, content, now) for role, content in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def append(self, role: str, content: str):
+        self._insert([(role, content)])
+
+    # ✅ Question and answer are committed together, so a crash can't leave
+    # an unanswered user message in the log.
+    def append_turn(self, user: str, assistant: str):
+        self._insert([("user", user), ("assistant", assistant)])
+
+    def last(self, n: int, with_ids: bool = False) -> list[dict]:
+        if n <= 0:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, role, content FROM messages ORDER BY id DESC LIMIT ?", (n,)
+            ).fetchall()
+        return [self._row(row, with_ids) for row in reversed(rows)]
+
+    # Messages with after_id < id < before_id, oldest first.
+    def between(self, after_id: int, before_id: int, with_ids: bool = False) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, role, content FROM messages WHERE id > ? AND id < ? ORDER BY id",
+                (after_id, before_id),
+            ).fetchall()
+        return [self._row(row, with_ids) for row in rows]
+
+    @staticmethod
+    def _row(row, with_ids: bool) -> dict:
+        message = {"role": row[1], "content": row[2]}
+        if with_ids:
+            message["id"] = row[0]
+        return message
+
+    def last_turns(self, n: int) -> list[dict]:
+        return self.last(2 * n)
+
+    def all(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT role, content FROM messages ORDER BY id").fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM messages")
+
+    def get_meta(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # Imports the old Data/ChatLog.json once. The JSON file is left in place.
+    # force=True re-imports it, replacing the rows the previous import added
+    # (delete and insert in one transaction). It refuses when the log also
+    # holds other turns, since the re-imported history would land after them.
+    def migrate_from_json(self, json_path: str, force: bool = False) -> int:
+        if not os.path.exists(json_path):
+            return 0
+        if self.get_meta("migrated_from") and not force:
+            return 0
+
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not migrate {json_path}: {e}")
+            return 0
+
+        rows = [
+            (entry["role"], entry["content"])
+            for entry in entries
+            if isinstance(entry, dict) and entry.get("role") and isinstance(entry.get("content"), str)
+        ]
+        imported = self.get_meta("migrated_ids", "")
+        first, last = map(int, imported.split(",")) if imported else (1, 0)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if force:
+                    others = self._conn.execute(
+                        "SELECT COUNT(*) FROM messages WHERE id < ? OR id > ?", (first, last)
+                    ).fetchone()[0]
+                    if others:
+                        self._conn.execute("ROLLBACK")
+                        print(f"⚠️ Not migrating {json_path}: {self.path} already has {others} messages it did not import")
+                        return 0
+                    self._conn.execute("DELETE FROM messages WHERE id BETWEEN ? AND ?", (first, last))
+
+                newest = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()[0]
+                self._conn.executemany(
+                    "INSERT INTO messages (role, content, created) VALUES (?, ?, ?)",
+                    [(role, content, now) for role, content in rows],
+                )
+                first, last = self._conn.execute(
+                    "SELECT COALESCE(MIN(id), 1), COALESCE(MAX(id), 0) FROM messages WHERE id > ?", (newest,)
+                ).fetchone()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [("migrated_from", os.path.abspath(json_path)), ("migrated_ids", f"{first},{last}")],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        print(f"✅ Migrated {len(rows)} messages from {json_path}")
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ==============================
+# Shared Instance
+# ==============================
+_history = None
+_history_lock = threading.Lock()
+
+def GetChatHistory() -> ChatHistory:
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = ChatHistory()
+        return _history
+
+
+# ==============================
+# Migration Entry Point
+# ==============================
+if __name__ == "__main__":
+    # python ChatHistory.py [path/to/ChatLog.json]
+    source = sys.argv[1] if len(sys.argv) > 1 else LEGACY_JSON_PATH
+    store = ChatHistory(legacy_json=None)
+    store.migrate_from_json(source, force=True)
+    print(f"{store.count()} messages in {store.path}")
@@ -1,8 +1,9 @@
 from groq import Groq  # Importing the Groq library to use its API
-from json import load, dump  # For saving and loading chat history
+from Backend.ChatHistory import GetChatHistory  # For saving and loading chat history
+from Backend.ContextWindow import GetContextWindow  # Keeps each request within a token budget
+from Backend.Resilience import ResilientCall, GetBackend, OperationCancelled  # Deadlines, retries, cancellation
 import datetime  # For real-time info
 from dotenv import dotenv_values  # To load API keys from .env
-import os
 
 # === Load Environment Variables ===
 env_vars = dotenv_values(".env")
@@ -11,15 +12,11 @@ Assistantname = env_vars.get("Assistantname", "Jarvis")
 GroqAPIKey = env_vars.get("GroqAPIKey")
 
 # === Initialize Groq client ===
-client = Groq(api_key=GroqAPIKey)
+client = Groq(api_key=GroqAPIKey, timeout=GetBackend("groq").timeout)
 
-# === Ensure ChatLog file exists ===
-if not os.path.exists("Data"):
-    os.makedirs("Data")
-
-if not os.path.exists(r"Data\ChatLog.json"):
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump([], f)
+# === Chat history store (migrates Data\ChatLog.json on first use) ===
+History = GetChatHistory()
+Context = GetContextWindow()
 
 # === System instructions ===
 System = f"""
@@ -50,45 +47,92 @@ def AnswerModifier(answer: str) -> str:
     return "\n".join(lines)
 
 # === Chatbot function ===
-def ChatBot(Query: str):
+def ChatBot(Query: str, cancel=None):
     try:
-        # Load old messages
-        with open(r"Data\ChatLog.json", "r") as f:
-            messages = load(f)
-
-        # Append user query
-        messages.append({"role": "user", "content": Query})
+        # System prompt, summary of older turns, newest turns and the query
+        messages = Context.build(
+            SystemChatBot + [{"role": "system", "content": RealtimeInformation()}], Query, reply_tokens=1024
+        )
 
         # Get response (non-streaming for stability)
-        completion = client.chat.completions.create(
+        completion = ResilientCall(
+            "groq",
+            client.chat.completions.create,
             model="llama-3.3-70b-versatile",  # ✅ Updated model
-            messages=SystemChatBot + [{"role": "system", "content": RealtimeInformation()}] + messages,
+            messages=messages,
             max_tokens=1024,
             temperature=0.7,
             top_p=1,
-            stream=False  # ✅ Non-streaming for stable output
+            stream=False,  # ✅ Non-streaming for stable output
+            cancel=cancel
         )
 
         # ✅ FIXED: Access message content correctly
         Answer = completion.choices[0].message.content
         Answer = Answer.replace("</s>", "")
 
-        # Append assistant response
-        messages.append({"role": "assistant", "content": Answer})
-
-        # Save updated log
-        with open(r"Data\ChatLog.json", "w") as f:
-            dump(messages, f, indent=4)
+        # Save the turn (the log is left untouched if anything above failed)
+        History.append_turn(Query, Answer)
 
         return AnswerModifier(Answer)
 
+    except OperationCancelled:
+        return ""  # interrupted by the user; nothing to say or save
+
     except Exception as e:
         print(f"Error: {e}")
-        # Reset chat log on error
-        with open(r"Data\ChatLog.json", "w") as f:
-            dump([], f, indent=4)
         return "⚠️ Something went wrong. Please try again."
 
+# === Streaming chatbot function ===
+# Yields the answer piece by piece as Groq generates it, so speech can start
+# before the reply is complete. The chat log is saved once the stream ends.
+# Cancelling the token closes the stream; an interrupted reply is not saved.
+def ChatBotStream(Query: str, cancel=None):
+    unregister = None
+    try:
+        messages = Context.build(
+            SystemChatBot + [{"role": "system", "content": RealtimeInformation()}], Query, reply_tokens=1024
+        )
+
+        # Only opening the stream is retried; a reply that already started isn't.
+        completion = ResilientCall(
+            "groq",
+            client.chat.completions.create,
+            model="llama-3.3-70b-versatile",
+            messages=messages,
+            max_tokens=1024,
+            temperature=0.7,
+            top_p=1,
+            stream=True,
+            cancel=cancel
+        )
+        if cancel is not None:
+            unregister = cancel.on_cancel(completion.close)
+
+        Answer = ""
+        for chunk in completion:
+            if cancel is not None and cancel.cancelled:
+                return
+            piece = chunk.choices[0].delta.content
+            if piece:
+                piece = piece.replace("</s>", "")
+                Answer += piece
+                yield piece
+
+        if cancel is not None and cancel.cancelled:
+            return
+        History.append_turn(Query, Answer)
+
+    except Exception as e:
+        if cancel is not None and cancel.cancelled:
+            return  # closing the stream from another thread lands here
+        print(f"Error: {e}")
+        yield "⚠️ Something went wrong. Please try again."
+
+    finally:
+        if unregister:
+            unregister()
+
 # === Main Program ===
 if __name__ == "__main__":
     while True:
@@ -0,0 +1,153 @@
+# ==================================
+# ContextWindow.py
+# ==================================
+
+from Backend.ChatHistory import GetChatHistory
+from dotenv import dotenv_values
+from collections import deque
+import threading
+import math
+import re
+
+# ==============================
+# Load Environment Variables
+# ==============================
+env_vars = dotenv_values(".env")
+ContextTokenBudget = int(env_vars.get("ContextTokenBudget", 6000))  # prompt + reply
+SummaryTokenBudget = int(env_vars.get("SummaryTokenBudget", 600))
+MaxRecentMessages = int(env_vars.get("MaxRecentMessages", 200))
+
+# ==============================
+# Token Counting
+# ==============================
+# Llama's tokenizer isn't available locally, so this approximates it: one
+# token per punctuation mark and roughly one per four characters of a word.
+# It errs slightly high, which keeps requests safely inside the budget.
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+MESSAGE_OVERHEAD = 4  # role markers and separators per chat message
+
+def CountTokens(text: str) -> int:
+    return sum(math.ceil(len(piece) / 4) for piece in TOKEN_PATTERN.findall(text))
+
+def CountMessageTokens(messages: list[dict]) -> int:
+    return sum(CountTokens(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+
+# ==============================
+# Rolling Summary
+# ==============================
+SUMMARY_HEADER = "Summary of the earlier conversation:\n"
+SUMMARY_WORDS_PER_MESSAGE = 30
+
+def SummarizeMessage(message: dict) -> str:
+    text = " ".join(message["content"].split())
+    first_sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    words = first_sentence.split()
+    if len(words) > SUMMARY_WORDS_PER_MESSAGE:
+        first_sentence = " ".join(words[:SUMMARY_WORDS_PER_MESSAGE]) + " ..."
+    speaker = "User" if message["role"] == "user" else "Assistant"
+    return f"- {speaker}: {first_sentence}"
+
+# ==============================
+# Context Window Manager
+# ==============================
+# Builds the message list for one request: the fixed system messages, the
+# newest turns that fit the token budget, and a rolling extractive summary of
+# everything older. The summary lives in the history store's meta table, so
+# turns are folded into it once and it survives restarts.
+class ContextWindow:
+    def __init__(self, history=None, budget: int = ContextTokenBudget,
+                 summary_budget: int = SummaryTokenBudget, max_recent: int = MaxRecentMessages):
+        self.history = history or GetChatHistory()
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.max_recent = max_recent
+        self._lock = threading.Lock()
+        self._requests = deque(maxlen=200)
+
+    def _load_summary(self):
+        lines = self.history.get_meta("summary", "")
+        upto = int(self.history.get_meta("summary_upto", 0))
+        return [line for line in lines.split("\n") if line], upto
+
+    def _fold_into_summary(self, before_id: int) -> list[str]:
+        lines, upto = self._load_summary()
+        if before_id - 1 <= upto:
+            return lines
+
+        for message in self.history.between(upto, before_id):
+            lines.append(SummarizeMessage(message))
+
+        # Oldest lines fall off first once the summary outgrows its budget.
+        while lines and CountTokens(SUMMARY_HEADER + "\n".join(lines)) > self.summary_budget:
+            lines.pop(0)
+
+        self.history.set_meta("summary", "\n".join(lines))
+        self.history.set_meta("summary_upto", str(before_id - 1))
+        return lines
+
+    def build(self, system: list[dict], query: str, reply_tokens: int = 1024) -> list[dict]:
+        with self._lock:
+            query_message = {"role": "user", "content": query}
+            fixed_tokens = CountMessageTokens(system + [query_message])
+            available = self.budget - reply_tokens - fixed_tokens - self.summary_budget
+
+            _, summary_upto = self._load_summary()
+            recent = []
+            used = 0
+            for message in reversed(self.history.last(self.max_recent, with_ids=True)):
+                cost = CountTokens(message["content"]) + MESSAGE_OVERHEAD
+                if message["id"] <= summary_upto or used + cost > available:
+                    break
+                recent.append(message)
+                used += cost
+            recent.reverse()
+
+            # Everything older than the window goes into the summary.
+            if recent:
+                window_start = recent[0]["id"]
+            else:
+                newest = self.history.last(1, with_ids=True)
+                window_start = newest[0]["id"] + 1 if newest else 1
+            summary_lines = self._fold_into_summary(window_start)
+
+            messages = list(system)
+            if summary_lines:
+                messages.append({"role": "system", "content": SUMMARY_HEADER + "\n".join(summary_lines)})
+            messages += [{"role": m["role"], "content": m["content"]} for m in recent]
+            messages.append(query_message)
+
+            self._requests.append({
+                "tokens": CountMessageTokens(messages),
+                "recent_messages": len(recent),
+                "summary_lines": len(summary_lines),
+            })
+            return messages
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = list(self._requests)
+        if not requests:
+            return {"requests": 0}
+        tokens = [r["tokens"] for r in requests]
+        return {
+            "requests": len(requests),
+            "last_tokens": tokens[-1],
+            "mean_tokens": sum(tokens) / len(tokens),
+            "max_tokens": max(tokens),
+            "budget": self.budget,
+            "last": requests[-1],
+        }
+
+
+# ==============================
+# Shared Instance
+# ==============================
+_context = None
+_context_lock = threading.Lock()
+
+def GetContextWindow() -> ContextWindow:
+    global _context
+    with _context_lock:
+        if _context is None:
+            _context = ContextWindow()
+        return _context
@@ -0,0 +1,263 @@
+# ==================================
+# Crawler.py
+# ==================================
+
+from Backend.WebSearch import QueryTokens
+from Backend.Cache import TTLCache
+from dotenv import dotenv_values
+from bs4 import BeautifulSoup
+from urllib.parse import urlsplit
+import threading
+import asyncio
+import math
+import time
+import re
+import os
+
+# ==============================
+# Load Environment Variables
+# ==============================
+env_vars = dotenv_values(".env")
+
+# Deep mode: besides titles and descriptions, fetch the top result pages and
+# hand the passages most relevant to the question to the LLM.
+DeepSearch = env_vars.get("DeepSearch", "False").strip().lower() == "true"
+DeepSearchPages = int(env_vars.get("DeepSearchPages", 3))  # top-k result pages fetched
+DeepSearchPassages = int(env_vars.get("DeepSearchPassages", 6))  # passages kept across all pages
+DeepSearchChars = int(env_vars.get("DeepSearchChars", 3000))  # extract budget in the prompt
+CrawlerConnections = int(env_vars.get("CrawlerConnections", 8))  # open connections overall
+CrawlerPerHost = int(env_vars.get("CrawlerPerHost", 2))  # open connections per host
+CrawlerTimeout = float(env_vars.get("CrawlerTimeout", 4))  # seconds for the whole fetch
+CrawlerMaxBytes = int(env_vars.get("CrawlerMaxBytes", 2 * 1024 * 1024))  # larger pages are cut off
+PageCacheTTL = float(env_vars.get("PageCacheTTL", 3600))  # served without asking the server
+PAGE_CACHE_PATH = os.path.join("Data", "PageCache.json")
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+# ==============================
+# Text Extraction
+# ==============================
+# Chrome (menus, scripts, footers, cookie banners) is removed, <article> or
+# <main> is preferred when the page has one, and only blocks that read like
+# prose are kept as passages.
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "svg", "iframe", "form",
+                    "nav", "header", "footer", "aside", "button"]
+BLOCK_TAGS = ["p", "li", "h1", "h2", "h3", "h4", "td", "blockquote", "pre", "dd"]
+MIN_PASSAGE_WORDS = 8
+WHITESPACE = re.compile(r"\s+")
+WORD = re.compile(r"[\w']+")
+
+def ExtractPassages(html: str) -> list[str]:
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    root = soup.find("article") or soup.find("main") or soup.body or soup
+
+    passages = []
+    for block in root.find_all(BLOCK_TAGS):
+        if block.find(BLOCK_TAGS):
+            continue  # the inner blocks are read on their own
+        text = WHITESPACE.sub(" ", block.get_text(" ")).strip()
+        if len(text.split()) >= MIN_PASSAGE_WORDS:
+            passages.append(text)
+    if not passages:
+        text = WHITESPACE.sub(" ", root.get_text(" ")).strip()
+        passages = [text] if text else []
+    return passages
+
+# ==============================
+# Passage Ranking
+# ==============================
+# BM25 over the passages of all fetched pages, so words that appear
+# everywhere (the site name, the topic itself) count for little and the
+# passage that actually answers the question wins.
+def RankPassages(passages: list[tuple[str, str]], query: str, limit: int = DeepSearchPassages,
+                 budget: int = DeepSearchChars, k1: float = 1.2, b: float = 0.75) -> list[tuple[str, str]]:
+    terms = QueryTokens(query)
+    if not passages or not terms:
+        return []
+    counts = [WORD.findall(text.lower()) for _, text in passages]
+    average = sum(len(words) for words in counts) / len(counts) or 1
+    document_frequency = {term: sum(term in words for words in map(set, counts)) for term in terms}
+
+    scored = []
+    for (url, text), words in zip(passages, counts):
+        score = 0.0
+        for term in terms:
+            frequency = words.count(term)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(passages) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * len(words) / average))
+        if score > 0:
+            scored.append((score, url, text))
+
+    ranked, used = [], 0
+    for score, url, text in sorted(scored, key=lambda item: item[0], reverse=True):
+        if len(ranked) >= limit:
+            break
+        if ranked and used + len(text) > budget:
+            continue
+        if any(text == kept for _, kept in ranked):
+            continue  # the same passage syndicated on another page
+        ranked.append((url, text[:budget]))
+        used += len(text)
+    return ranked
+
+# ==============================
+# Page Cache
+# ==============================
+# Extracted passages are cached by URL together with the page's ETag and
+# Last-Modified. Within PageCacheTTL they are used as is; after that the page
+# is revalidated with a conditional GET, and a 304 keeps the cached passages.
+# put() only marks the cache dirty; the JSON file is written later on the
+# cache's timer thread, so storing a page never blocks the event loop.
+_pages = None
+_pages_lock = threading.Lock()
+
+def GetPageCache() -> TTLCache:
+    global _pages
+    with _pages_lock:
+        if _pages is None:
+            _pages = TTLCache(maxsize=512, ttl=7 * 24 * 3600, path=PAGE_CACHE_PATH)
+        return _pages
+
+# ==============================
+# Async Fetcher
+# ==============================
+# One aiohttp session per batch: connections are capped overall and per host
+# (so five results from the same site queue instead of hammering it), and
+# the whole batch shares one deadline. A page that fails or times out is
+# simply left out.
+class PageFetcher:
+    def __init__(self, cache: TTLCache | None = None, connections: int = CrawlerConnections,
+                 per_host: int = CrawlerPerHost, timeout: float = CrawlerTimeout, max_bytes: int = CrawlerMaxBytes,
+                 ttl: float = PageCacheTTL):
+        self.cache = GetPageCache() if cache is None else cache
+        self.ttl = ttl
+        self.connections = connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.fetched = 0
+        self.fresh_hits = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.bytes = 0
+
+    async def _fetch(self, session, url: str) -> list[str]:
+        cached = self.cache.get(url)
+        if cached is not None and cached["fresh_until"] >= time.time():
+            self.fresh_hits += 1
+            return cached["passages"]
+
+        headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            async with session.get(url, headers=headers, allow_redirects=True) as response:
+                if response.status == 304 and cached is not None:
+                    self.not_modified += 1
+                    passages = cached["passages"]
+                elif response.status == 200 and "html" in response.headers.get("Content-Type", "html"):
+                    body = await response.content.read(self.max_bytes)
+                    self.fetched += 1
+                    self.bytes += len(body)
+                    html = body.decode(response.charset or "utf-8", errors="replace")
+                    passages = await asyncio.to_thread(ExtractPassages, html)
+                else:
+                    self.errors += 1
+                    return []
+                self.cache.put(url, {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "fresh_until": time.time() + self.ttl,
+                    "passages": passages,
+                })
+                return passages
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Could not fetch {urlsplit(url).netloc}: {type(e).__name__} {e}")
+            return cached["passages"] if cached is not None else []
+
+    async def fetch_all(self, urls: list[str]) -> dict[str, list[str]]:
+        import aiohttp  # only needed in deep mode
+        connector = aiohttp.TCPConnector(limit=self.connections, limit_per_host=self.per_host)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={"User-Agent": USER_AGENT}) as session:
+            pages = await asyncio.gather(*(self._fetch(session, url) for url in urls))
+        return dict(zip(urls, pages))
+
+    # For synchronous callers (the realtime search runs on a worker thread).
+    def fetch(self, urls: list[str]) -> dict[str, list[str]]:
+        return asyncio.run(self.fetch_all(list(dict.fromkeys(urls))))
+
+    def stats(self) -> dict:
+        return {
+            "fetched": self.fetched,
+            "fresh_hits": self.fresh_hits,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "bytes": self.bytes,
+        }
+
+# ==============================
+# Deep Context
+# ==============================
+# Fetches the top `pages` results and returns the most relevant passages as
+# (url, text) pairs, best first.
+def DeepPassages(query: str, results: list[dict], pages: int = DeepSearchPages,
+                 fetcher: PageFetcher | None = None) -> list[tuple[str, str]]:
+    urls = [result["url"] for result in results if result.get("url", "").startswith("http")][:pages]
+    if not urls:
+        return []
+    fetched = (fetcher or PageFetcher()).fetch(urls)
+    passages = [(url, text) for url, texts in fetched.items() for text in texts]
+    return RankPassages(passages, query)
+
+# ==============================
+# Self Check
+# ==============================
+# Serves three pages from a local MockServer: one with boilerplate around an
+# article, one slow page on the same host, and one that answers conditional
+# requests with 304.
+if __name__ == "__main__":
+    from Backend.HttpClient import MockServer
+
+    ARTICLE = """<html><head><title>Paris</title><script>var tracking = 1;</script></head><body>
+    <nav><ul><li>Home</li><li>News</li><li>Weather</li><li>Sport</li></ul></nav>
+    <article><h1>Paris weather this week</h1>
+    <p>Paris will see light rain on Tuesday with temperatures around 14 degrees, clearing by the evening.</p>
+    <p>The city hosted more than thirty million visitors last year, according to the tourism office.</p>
+    <p>Forecasters expect the weather in Paris to turn sunny and warm by the weekend, reaching 22 degrees.</p>
+    </article><footer><p>Copyright Example News, all rights reserved, terms and privacy policy apply here.</p></footer>
+    </body></html>"""
+    OTHER = """<html><body><main><p>The Eiffel Tower was completed in 1889 and is 330 metres tall including antennas.</p>
+    <p>Paris weather in spring is mild, but showers are common and an umbrella is a good idea.</p></main></body></html>"""
+
+    def Revalidated(path, body, headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return (304, "text/html", b"", {"ETag": '"v1"'})
+        return (200, "text/html; charset=utf-8", OTHER, {"ETag": '"v1"'})
+
+    with MockServer({"/article": (200, "text/html; charset=utf-8", ARTICLE),
+                     "/slow": (200, "text/html", OTHER),
+                     "/etag": Revalidated}, delay=0.2) as server:
+        results = [{"url": f"{server.url}{path}"} for path in ("/article", "/slow", "/etag", "/missing")]
+        fetcher = PageFetcher(cache=TTLCache(maxsize=16), per_host=2, ttl=0)  # ttl=0: revalidate every time
+
+        started = time.perf_counter()
+        passages = DeepPassages("what is the weather in paris this weekend", results, pages=4, fetcher=fetcher)
+        print(f"cold: {time.perf_counter() - started:.2f}s, at most {server.max_in_flight} requests at once "
+              f"(limit 2 per host), {fetcher.stats()}")
+        for url, text in passages:
+            print(f"  [{urlsplit(url).path}] {text}")
+
+        started = time.perf_counter()
+        DeepPassages("paris weather", results, pages=4, fetcher=fetcher)
+        print(f"revalidated: {time.perf_counter() - started:.2f}s, {fetcher.stats()}")
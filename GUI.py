@@ -6,15 +6,23 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import (
     QIcon, QMovie, QColor, QTextCharFormat, QFont, QPixmap, QTextBlockFormat
 )
-from PyQt5.QtCore import Qt, QSize, QTimer
+from PyQt5.QtCore import Qt, QSize, QTimer, QObject, pyqtSignal
 from dotenv import dotenv_values
 import sys
+import threading
+import time
 from pathlib import Path
 
 # Load environment variables
 env_vars = dotenv_values(".env")
 Assistantname = env_vars.get("Assistantname", "Assistant")
 
+# "bus" keeps mic/status/responses in memory and pushes changes through Qt
+# signals. "file" also mirrors them to Frontend/Files/*.data and polls those
+# files, for frontends running in another process.
+FrontendMode = env_vars.get("FrontendMode", "bus").strip().lower()
+FilePollInterval = 500  # ms, file mode only
+
 # Directory paths
 current_dir = Path.cwd()
 TempDirPath = current_dir / "Frontend" / "Files"
@@ -67,28 +75,83 @@ def QueryModifier(query: str) -> str:
             new_query = new_query.rstrip(".!?") + "."
     return new_query[0].upper() + new_query[1:] if new_query else new_query
 
+# ---------------- State bus ----------------
+class StateBus(QObject):
+    micChanged = pyqtSignal(str)
+    statusChanged = pyqtSignal(str)
+    responsesChanged = pyqtSignal(str)
+
+    def __init__(self, file_backed: bool = False):
+        super().__init__()
+        self.file_backed = file_backed
+        self._cond = threading.Condition()
+        self._state = {"Mic.data": "False", "Status.data": "Idle", "Responses.data": ""}
+        self._signals = {
+            "Mic.data": self.micChanged,
+            "Status.data": self.statusChanged,
+            "Responses.data": self.responsesChanged,
+        }
+
+    def set(self, key: str, value: str) -> None:
+        with self._cond:
+            changed = self._state[key] != value
+            self._state[key] = value
+            self._cond.notify_all()
+        if self.file_backed:
+            safe_write(temp_path(key), value)
+        # Signals emitted from worker threads are queued onto the GUI thread.
+        if changed:
+            self._signals[key].emit(value)
+
+    def get(self, key: str) -> str:
+        if self.file_backed:
+            return safe_read(temp_path(key))
+        with self._cond:
+            return self._state[key]
+
+    def wait_for(self, key: str, value: str, timeout=None) -> bool:
+        if self.file_backed:
+            # Another process may write the file, so there is nothing to wait on.
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self.get(key) != value:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.2)
+            return True
+        with self._cond:
+            return self._cond.wait_for(lambda: self._state[key] == value, timeout)
+
+Bus = StateBus(file_backed=(FrontendMode == "file"))
+
 def SetMicrophoneStatus(command: str):
-    safe_write(temp_path("Mic.data"), command)
+    Bus.set("Mic.data", command)
 
 def GetMicrophoneStatus() -> str:
-    return safe_read(temp_path("Mic.data"))
+    return Bus.get("Mic.data")
+
+def WaitForMicrophoneStatus(command: str, timeout=None) -> bool:
+    return Bus.wait_for("Mic.data", command, timeout)
 
 def SetAssistantStatus(status: str):
-    safe_write(temp_path("Status.data"), status)
+    Bus.set("Status.data", status)
 
 def GetAssistantStatus() -> str:
-    return safe_read(temp_path("Status.data"))
+    return Bus.get("Status.data")
 
 def ShowTextToScreen(text: str):
-    safe_write(temp_path("Responses.data"), text)
+    Bus.set("Responses.data", text)
+
+def GetTextOnScreen() -> str:
+    return Bus.get("Responses.data")
 
 # Initialize files if missing
-if not Path(temp_path("Mic.data")).exists():
-    SetMicrophoneStatus("False")
-if not Path(temp_path("Status.data")).exists():
-    SetAssistantStatus("Idle")
-if not Path(temp_path("Responses.data")).exists():
-    ShowTextToScreen("")
+if Bus.file_backed:
+    if not Path(temp_path("Mic.data")).exists():
+        SetMicrophoneStatus("False")
+    if not Path(temp_path("Status.data")).exists():
+        SetAssistantStatus("Idle")
+    if not Path(temp_path("Responses.data")).exists():
+        ShowTextToScreen("")
 
 # ---------------- UI Classes ----------------
 class ChatSection(QWidget):
@@ -119,14 +182,18 @@ class ChatSection(QWidget):
         layout.addWidget(self.chat_text_edit)
         layout.addWidget(self.gif_label, alignment=Qt.AlignRight)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadMessages)
-        self.timer.start(500)
-
         self._last_messages = ""
 
-    def loadMessages(self):
-        content = safe_read(temp_path("Responses.data"))
+        self.loadMessages()
+        Bus.responsesChanged.connect(self.loadMessages)
+        if Bus.file_backed:
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(self.loadMessages)
+            self.timer.start(FilePollInterval)
+
+    def loadMessages(self, content=None):
+        if content is None:
+            content = GetTextOnScreen()
         if content and content != self._last_messages:
             modified = AnswerModifier(content)
             self.chat_text_edit.clear()
@@ -157,7 +224,7 @@ class InitialScreen(QWidget):
             self.gif_label.setMovie(movie)
             movie.start()
 
-        self.status_label = QLabel("")
+        self.status_label = QLabel(GetAssistantStatus())
         self.status_label.setStyleSheet("color: white; font-size:16px;")
         self.status_label.setAlignment(Qt.AlignCenter)
 
@@ -180,13 +247,19 @@ class InitialScreen(QWidget):
         self.setLayout(content_layout)
         self.setStyleSheet("background-color: black;")
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.refresh_ui)
-        self.timer.start(500)
+        Bus.statusChanged.connect(self.status_label.setText)
+        Bus.micChanged.connect(self.on_mic_changed)
+        if Bus.file_backed:
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(self.refresh_ui)
+            self.timer.start(FilePollInterval)
 
     def refresh_ui(self):
         self.status_label.setText(GetAssistantStatus())
-        current_state = (GetMicrophoneStatus().lower() == "true")
+        self.on_mic_changed(GetMicrophoneStatus())
+
+    def on_mic_changed(self, status: str):
+        current_state = (status.lower() == "true")
         if current_state != self.toggled:
             self.toggled = current_state
             self.update_mic_icon()
@@ -210,7 +283,7 @@ class MessageScreen(QWidget):
         layout = QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
 
-        self.status_label = QLabel("")
+        self.status_label = QLabel(GetAssistantStatus())
         self.status_label.setStyleSheet("color: white; font-size:16px;")
         self.status_label.setAlignment(Qt.AlignCenter)
 
@@ -219,9 +292,11 @@ class MessageScreen(QWidget):
         self.chat_section = ChatSection()
         layout.addWidget(self.chat_section)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_status)
-        self.timer.start(500)
+        Bus.statusChanged.connect(self.status_label.setText)
+        if Bus.file_backed:
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(self.update_status)
+            self.timer.start(FilePollInterval)
 
         self.setLayout(layout)
         self.setStyleSheet("background-color: black;")
@@ -326,10 +401,14 @@ class MainWindow(QMainWindow):
         self.resize(1000, 700)
         self.setStyleSheet("background-color: black;")
 
-def GraphicalUserInterface():
+# on_shown runs on the GUI thread as soon as the event loop starts, i.e. with
+# the window already on screen.
+def GraphicalUserInterface(on_shown=None):
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    if on_shown:
+        QTimer.singleShot(0, on_shown)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
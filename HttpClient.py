@@ -0,0 +1,157 @@
+# ==================================
+# HttpClient.py
+# ==================================
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from dotenv import dotenv_values
+import threading
+import requests
+import json
+import time
+
+# ==============================
+# Load Environment Variables
+# ==============================
+env_vars = dotenv_values(".env")
+HttpPoolSize = int(env_vars.get("HttpPoolSize", 8))  # keep-alive connections per host
+HttpPoolHosts = int(env_vars.get("HttpPoolHosts", 4))  # hosts with a cached pool
+
+# Lets tests point the HuggingFace calls at a local MockServer.
+HuggingFaceBaseURL = env_vars.get("HuggingFaceBaseURL", "https://api-inference.huggingface.co").rstrip("/")
+
+# ==============================
+# Pooled Session
+# ==============================
+# One Session shared by content and image generation: DNS, TCP and TLS setup
+# is paid once per pooled connection instead of once per request. Retries are
+# left to Resilience.ResilientCall, so the adapter never retries on its own.
+def CreateSession(pool_size: int = HttpPoolSize, pool_hosts: int = HttpPoolHosts) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+_session = None
+_session_lock = threading.Lock()
+
+def GetSession() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = CreateSession()
+        return _session
+
+def HuggingFaceModelURL(model: str) -> str:
+    return f"{HuggingFaceBaseURL}/models/{model}"
+
+# ==============================
+# Local Mock Server
+# ==============================
+# A keep-alive HTTP/1.1 server on 127.0.0.1 for exercising the HTTP paths
+# offline. Routes map a path to (status, content type, body) or to a callable
+# taking (path, body bytes, request headers) and returning that tuple; either
+# may add a fourth item, a dict of extra response headers. Every request and
+# every new TCP connection is recorded, as is the highest number of requests
+# handled at once. `delay` (seconds) is added to every response.
+class MockServer:
+    def __init__(self, routes: dict | None = None, default=(404, "application/json", b'{"error": "not found"}'),
+                 delay: float = 0.0):
+        self.routes = routes or {}
+        self.default = default
+        self.delay = delay
+        self.requests = []
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with mock._lock:
+                    mock.connections += 1
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length) if length else b""
+                with mock._lock:
+                    mock.requests.append((self.command, self.path, body))
+                    mock.in_flight += 1
+                    mock.max_in_flight = max(mock.max_in_flight, mock.in_flight)
+                try:
+                    if mock.delay:
+                        time.sleep(mock.delay)
+                    route = mock.routes.get(self.path.split("?", 1)[0], mock.default)
+                    status, content_type, payload, *extra = route(self.path, body, self.headers) if callable(route) else route
+                finally:
+                    with mock._lock:
+                        mock.in_flight -= 1
+                if isinstance(payload, (dict, list)):
+                    payload = json.dumps(payload).encode()
+                elif isinstance(payload, str):
+                    payload = payload.encode()
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (extra[0] if extra else {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ==============================
+# Self Check
+# ==============================
+if __name__ == "__main__":
+    # 40 requests from 4 threads should need at most 4 TCP connections.
+    with MockServer({"/models/test": (200, "application/json", [{"generated_text": "ok"}])}) as server:
+        session = CreateSession(pool_size=4)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            statuses = list(pool.map(
+                lambda _: session.post(f"{server.url}/models/test", json={"inputs": "hi"}, timeout=5).status_code,
+                range(40),
+            ))
+        print(f"{len(statuses)} requests, {statuses.count(200)} OK, {server.connections} TCP connections")
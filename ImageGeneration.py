@@ -1,18 +1,25 @@
 import asyncio
+import itertools
+import threading
+import multiprocessing
 from random import randint
 from PIL import Image
-import requests
 from dotenv import get_key
 import os
 from time import sleep
 import subprocess
 import platform
+from Backend.Resilience import ResilientCall, GetBackend
+from Backend.HttpClient import GetSession, HuggingFaceModelURL
+from Backend.ArtifactStore import GetArtifactStore, ArtifactKey, ReuseArtifacts
 
 # === CONFIGURATION ===
 FOLDER_PATH = r"Data"  # Folder where images will be stored
 os.makedirs(FOLDER_PATH, exist_ok=True)  # ✅ Ensure folder exists
 
-API_URL = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0"
+IMAGE_MODEL = "stabilityai/stable-diffusion-xl-base-1.0"
+IMAGE_SUFFIX = "quality=4K, sharpness=maximum, Ultra High details, high resolution"
+API_URL = HuggingFaceModelURL(IMAGE_MODEL)
 headers = {"Authorization": f"Bearer {get_key('.env', 'HuggingFaceAPIKey')}"}
 
 
@@ -46,29 +53,60 @@ def open_images(prompt: str):
 
 
 # === ASYNC FUNCTION TO CALL HUGGINGFACE API ===
-async def query(payload: dict):
-    response = await asyncio.to_thread(
-        requests.post, API_URL, headers=headers, json=payload
-    )
+def post(payload: dict) -> bytes:
+    # ✅ The four parallel requests share the pooled keep-alive session
+    response = GetSession().post(API_URL, headers=headers, json=payload, timeout=GetBackend("huggingface").timeout)
+    response.raise_for_status()
     return response.content
 
+async def query(payload: dict):
+    # ✅ Deadline, capped retries and circuit breaker; empty bytes if it keeps failing
+    return await asyncio.to_thread(ResilientCall, "huggingface", post, payload, fallback=b"")
+
 
 # === ASYNC FUNCTION TO GENERATE IMAGES ===
-async def generate_images(prompt: str):
+# Returns how many of the four images were saved.
+async def generate_images(prompt: str, on_progress=None) -> int:
     tasks = []
     safe_prompt = prompt.replace(" ", "_")
+    finished = 0
+    saved = 0
 
-    for _ in range(4):
-        payload = {
-            "inputs": f"{prompt}, quality=4K, sharpness=maximum, Ultra High details, high resolution, seed={randint(0, 1000000)}"
-        }
-        tasks.append(asyncio.create_task(query(payload)))
+    store = GetArtifactStore()
+
+    async def fetch(variant: int):
+        nonlocal finished
+        # ✅ Each of the four variants has its own content address
+        key = ArtifactKey(IMAGE_MODEL, prompt, {"suffix": IMAGE_SUFFIX, "variant": variant})
+        image_bytes = store.get(key) if ReuseArtifacts else None
+
+        if image_bytes is None:
+            payload = {
+                "inputs": f"{prompt}, {IMAGE_SUFFIX}, seed={randint(0, 1000000)}"
+            }
+            image_bytes = await query(payload)
+            if image_bytes and not image_bytes.startswith(b"{"):
+                store.put(key, image_bytes, ".jpg", model=IMAGE_MODEL, prompt=prompt)
+        else:
+            print(f"♻️ Reusing cached image {variant} for '{prompt}'")
+
+        finished += 1
+        if on_progress:
+            on_progress(finished, 4)
+        return image_bytes
+
+    for i in range(1, 5):
+        tasks.append(asyncio.create_task(fetch(i)))
 
     image_bytes_list = await asyncio.gather(*tasks)
 
     for i, image_bytes in enumerate(image_bytes_list, start=1):
         file_path = os.path.join(FOLDER_PATH, f"{safe_prompt}{i}.jpg")
 
+        if not image_bytes:
+            print(f"⚠️ Image {i} could not be generated.")
+            continue
+
         # ✅ Check if HuggingFace returned an error JSON
         if image_bytes.startswith(b"{"):
             print("⚠️ API returned error JSON instead of image:")
@@ -78,38 +116,145 @@ async def generate_images(prompt: str):
         with open(file_path, "wb") as f:
             f.write(image_bytes)
 
+        saved += 1
         print(f"✅ Saved {os.path.abspath(file_path)}")
 
+    return saved
+
 
 # === WRAPPER FUNCTION ===
 def GenerateImages(prompt: str):
-    asyncio.run(generate_images(prompt))  # Generate
-    open_images(prompt)  # Open
+    if asyncio.run(generate_images(prompt)):  # Generate
+        open_images(prompt)  # Open
+
+
+# === LONG-LIVED WORKER PROCESS ===
+MAX_CONCURRENT_JOBS = 2  # prompts generated at the same time inside the worker
+
+
+# Runs in the worker process: takes (job_id, prompt) jobs and reports
+# (job_id, event, detail) back, where event is started/progress/completed/failed.
+def worker_main(jobs, events):
+    async def run_job(job_id: int, prompt: str, slots: asyncio.Semaphore):
+        async with slots:
+            events.put((job_id, "started", prompt))
+            try:
+                saved = await generate_images(
+                    prompt, on_progress=lambda done, total: events.put((job_id, "progress", f"{done}/{total}"))
+                )
+                if not saved:
+                    events.put((job_id, "failed", f"no image could be generated for '{prompt}'"))
+                    return
+                await asyncio.to_thread(open_images, prompt)
+                events.put((job_id, "completed", prompt))
+            except Exception as e:
+                events.put((job_id, "failed", str(e)))
+
+    async def serve():
+        slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+        running = set()
+        while True:
+            job = await asyncio.to_thread(jobs.get)
+            if job is None:
+                break
+            task = asyncio.create_task(run_job(*job, slots))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        if running:
+            await asyncio.wait(running)
+
+    asyncio.run(serve())
+
+
+# Lives in the main process. The worker is spawned once and reused for every
+# prompt; submit() returns a job id immediately and callbacks receive events.
+class ImageWorker:
+    def __init__(self):
+        context = multiprocessing.get_context("spawn")
+        self._jobs = context.Queue()
+        self._events = context.Queue()
+        self._process = context.Process(target=worker_main, args=(self._jobs, self._events), daemon=True)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self.jobs = {}  # job_id -> last event
+
+    def start(self):
+        self._process.start()
+        threading.Thread(target=self._dispatch_events, daemon=True).start()
+        return self
+
+    def submit(self, prompt: str, callback=None) -> int:
+        with self._lock:
+            job_id = next(self._ids)
+            self.jobs[job_id] = "queued"
+            if callback:
+                self._callbacks[job_id] = callback
+        self._jobs.put((job_id, prompt))
+        return job_id
+
+    def status(self, job_id: int) -> str | None:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _dispatch_events(self):
+        while True:
+            try:
+                job_id, event, detail = self._events.get()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                self.jobs[job_id] = event
+                callback = self._callbacks.get(job_id)
+                if event in ("completed", "failed"):
+                    self._callbacks.pop(job_id, None)
+            if callback:
+                try:
+                    callback(job_id, event, detail)
+                except Exception as e:
+                    print(f"⚠️ Image job callback error: {e}")
+
+    def stop(self):
+        self._jobs.put(None)
+        self._process.join(timeout=5)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def GetImageWorker() -> ImageWorker:
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = ImageWorker().start()
+        return _worker
 
 
 # === MAIN LOOP TO LISTEN FOR REQUESTS ===
-while True:
-    try:
-        with open(r"Frontend\Files\ImageGeneration.data", "r") as f:
-            Data: str = f.read().strip()
+# Kept for out-of-process use: polls the signal file and handles one prompt.
+if __name__ == "__main__":
+    while True:
+        try:
+            with open(r"Frontend\Files\ImageGeneration.data", "r") as f:
+                Data: str = f.read().strip()
 
-        if not Data:
-            sleep(1)
-            continue
+            if not Data:
+                sleep(1)
+                continue
 
-        Prompt, Status = Data.split(",")
+            Prompt, Status = Data.split(",")
 
-        if Status.strip() == "True":
-            print("🎨 Generating Images ...")
-            GenerateImages(prompt=Prompt)
+            if Status.strip() == "True":
+                print("🎨 Generating Images ...")
+                GenerateImages(prompt=Prompt)
 
-            with open(r"Frontend\Files\ImageGeneration.data", "w") as f:
-                f.write("False,False")
+                with open(r"Frontend\Files\ImageGeneration.data", "w") as f:
+                    f.write("False,False")
 
-            break
-        else:
-            sleep(1)
+                break
+            else:
+                sleep(1)
 
-    except Exception as e:
-        print(f"⚠️ Error: {e}")
-        sleep(1)
+        except Exception as e:
+            print(f"⚠️ Error: {e}")
+            sleep(1)
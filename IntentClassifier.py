@@ -0,0 +1,475 @@
+# ==================================
+# IntentClassifier.py
+# ==================================
+
+from collections import Counter, defaultdict
+import threading
+import math
+import time
+import sys
+import re
+
+# ==============================
+# Rules
+# ==============================
+# Each rule turns one clause into a decision in the same format FirstLayerDMM
+# returns ("open chrome", "system volume up", "exit", ...). Rules only fire on
+# clauses they fully understand; everything else goes to the trained model.
+SYSTEM_TASKS = {
+    "mute": "mute", "unmute": "unmute",
+    "volume up": "volume up", "increase volume": "volume up", "increase the volume": "volume up",
+    "turn up the volume": "volume up", "raise the volume": "volume up",
+    "volume down": "volume down", "decrease volume": "volume down", "decrease the volume": "volume down",
+    "turn down the volume": "volume down", "lower the volume": "volume down",
+}
+
+# Apps and sites Jarvis is usually asked to open or close. "launch", "start",
+# "quit", "exit" and "kill" also take other objects ("quit smoking tips",
+# "kill the lights", "start the timer"), so with those verbs a rule is only
+# confident when every target is one of these; otherwise Cohere decides.
+KNOWN_TARGETS = {
+    "chrome", "google chrome", "firefox", "edge", "microsoft edge", "brave", "opera", "notepad", "calculator",
+    "paint", "word", "excel", "powerpoint", "outlook", "teams", "vs code", "vscode", "visual studio code",
+    "spotify", "vlc", "telegram", "whatsapp", "discord", "slack", "zoom", "skype", "steam", "obs",
+    "facebook", "instagram", "twitter", "youtube", "netflix", "gmail", "linkedin", "reddit", "github",
+    "file explorer", "explorer", "settings", "control panel", "task manager", "command prompt", "terminal",
+    "camera", "photos", "clock", "calendar", "maps", "mail",
+}
+
+RULE_CONFIDENCE = 0.99
+WEAK_RULE_CONFIDENCE = 0.5  # below LocalIntentThreshold, so the clause goes to Cohere
+
+def TargetConfidence(match) -> float:
+    items = [item.strip() for item in LIST_SPLIT.split(match["arg"]) if item.strip()]
+    known = all(item.removeprefix("the ").removeprefix("my ") in KNOWN_TARGETS for item in items)
+    return RULE_CONFIDENCE if known else WEAK_RULE_CONFIDENCE
+
+# (pattern, decision builder, confidence or a function of the match)
+RULES = [
+    (re.compile(r"^(?:ok |okay |thanks |thank you )?(?:bye|goodbye|good bye|see you|see you later|exit|quit|shut down)(?: jarvis)?$"),
+     lambda m: "exit", RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?open (?P<arg>.+)$"),
+     lambda m: f"open {m['arg']}", RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?(?:launch|start) (?P<arg>.+)$"),
+     lambda m: f"open {m['arg']}", TargetConfidence),
+    (re.compile(r"^(?:please )?close (?P<arg>.+)$"),
+     lambda m: f"close {m['arg']}", RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?(?:quit|exit|kill) (?P<arg>.+)$"),
+     lambda m: f"close {m['arg']}", TargetConfidence),
+    # Only the explicit forms are confident. A bare "youtube ...", "google ..."
+    # or "play ..." is often about something else ("youtube is down", "google
+    # stock price today", "play with my dog"), so Cohere decides those.
+    (re.compile(r"^(?:please )?(?:search (?:on )?youtube (?:for )?|youtube search (?:for )?)(?P<arg>.+)$"),
+     lambda m: f"youtube search {m['arg']}", RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?search (?:for )?(?P<arg>.+) on youtube$"),
+     lambda m: f"youtube search {m['arg']}", RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?(?:on )?youtube (?:for )?(?P<arg>.+)$"),
+     lambda m: f"youtube search {m['arg']}", WEAK_RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?play (?P<arg>.+) on youtube$"),
+     lambda m: f"play {m['arg']}", RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?play (?P<arg>.+)$"),
+     lambda m: f"play {m['arg']}", WEAK_RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?(?:search (?:on )?google (?:for )?|google search (?:for )?)(?P<arg>.+)$"),
+     lambda m: f"google search {m['arg']}", RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?search (?:for )?(?P<arg>.+) on google$"),
+     lambda m: f"google search {m['arg']}", RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?(?:on )?google (?:for )?(?P<arg>.+)$"),
+     lambda m: f"google search {m['arg']}", WEAK_RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?(?:generate|create|make|draw) (?:an? )?(?:image|picture|photo) (?:of )?(?P<arg>.+)$"),
+     lambda m: f"generate image {m['arg']}", RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?(?:can you )?write (?:me )?(?:an? )?(?P<arg>(?:application|letter|email|poem|essay|note|code|story|song|leave application)\b.*)$"),
+     lambda m: f"content {m['arg']}", RULE_CONFIDENCE),
+    (re.compile(r"^(?:please )?(?P<arg>" + "|".join(sorted(SYSTEM_TASKS, key=len, reverse=True)) + r")$"),
+     lambda m: f"system {SYSTEM_TASKS[m['arg']]}", RULE_CONFIDENCE),
+    # The preamble answers time/date and pronoun-only questions as general.
+    (re.compile(r"^(?P<arg>(?:what(?:'s| is) (?:the |today's |the current )?(?:time|date|day|month|year)|what time is it|what day is it)\b.*)$"),
+     lambda m: f"general {m['arg']}", RULE_CONFIDENCE),
+    (re.compile(r"^(?P<arg>(?:who|what|where|how old)(?:'s| is| was| are| were) (?:he|she|it|they|him|her|his)\b.*)$"),
+     lambda m: f"general {m['arg']}", RULE_CONFIDENCE),
+]
+
+# Verbs whose arguments can be listed: "open chrome and firefox".
+LISTABLE = ("open", "close", "play")
+
+# Reminders need the model to normalise the date, so they always fall back.
+REMOTE_ONLY = re.compile(r"\b(?:remind|reminder|alarm)\b")
+
+# A new clause starts at ", " or " and " when the next word begins a new intent.
+CLAUSE_STARTS = (
+    "open", "launch", "start", "close", "play", "search", "google", "youtube", "generate", "create",
+    "write", "mute", "unmute", "volume", "increase", "decrease", "tell", "what", "what's", "who",
+    "where", "when", "why", "how", "which", "can", "could", "remind", "set", "bye", "goodbye",
+)
+CLAUSE_SPLIT = re.compile(r"(?:,\s*|\s+and\s+|\s+then\s+)(?:and\s+|then\s+|by the way\s+)?(?=(?:" + "|".join(CLAUSE_STARTS) + r")\b)")
+LIST_SPLIT = re.compile(r",\s*|\s+and\s+")
+
+# ==============================
+# Decision Parsing
+# ==============================
+# Cohere answers with one line listing every decision, separated by ", "
+# ("open facebook, open telegram, close whatsapp") or sometimes by ". " or
+# newlines. A separator only splits when the next word starts a decision, so
+# commas inside a query ("general compare rome, paris and london") stay put.
+DECISION_VERBS = [
+    "exit", "general", "realtime", "open", "close", "play",
+    "generate image", "system", "content", "google search",
+    "youtube search", "reminder",
+]
+DECISION_SPLIT = re.compile(
+    r"\n+|(?<=[,.;?!*])\s+(?=(?:" + "|".join(sorted(DECISION_VERBS, key=len, reverse=True)) + r")\b)"
+)
+
+def SplitDecisions(text: str) -> list[str]:
+    parts = (part.strip().rstrip(",;.*").strip() for part in DECISION_SPLIT.split(text))
+    return [part for part in parts if part]
+
+# Only the parts that start with a known decision verb.
+def ParseDecisions(text: str) -> list[str]:
+    return [part for part in SplitDecisions(text) if part.lower().startswith(tuple(DECISION_VERBS))]
+
+# ==============================
+# Labelled Data
+# ==============================
+# Training utterances for the TF-IDF model. Decisions for general/realtime are
+# the utterance itself, so the model only has to pick the label.
+TRAINING_SET = [
+    ("general", "how are you"), ("general", "do you like pizza"), ("general", "who was akbar"),
+    ("general", "how can i study more effectively"), ("general", "can you help me with this math problem"),
+    ("general", "thanks i really liked it"), ("general", "what is python programming language"),
+    ("general", "chat with me"), ("general", "tell me a joke"), ("general", "what is the capital of france"),
+    ("general", "explain quantum physics in simple words"), ("general", "who wrote hamlet"),
+    ("general", "what is photosynthesis"), ("general", "tell me about mahatma gandhi"),
+    ("general", "how do i make pasta"), ("general", "what is the meaning of life"),
+    ("general", "who invented the telephone"), ("general", "how does a computer work"),
+    ("general", "give me some motivation"), ("general", "what is machine learning"),
+    ("general", "translate hello into spanish"), ("general", "what is two plus two"),
+    ("general", "why is the sky blue"), ("general", "tell me a fun fact"),
+    ("general", "what are you doing"), ("general", "who are you"), ("general", "what can you do"),
+    ("general", "how to learn coding"), ("general", "summarize the french revolution"),
+    ("general", "what is the difference between python and java"), ("general", "good morning"),
+    ("general", "i am feeling sad today"), ("general", "recommend me a good book"),
+    ("general", "what is an algorithm"), ("general", "explain the theory of relativity"),
+    ("general", "who discovered gravity"), ("general", "how many continents are there"),
+    ("general", "what does dna stand for"), ("general", "write a short poem in your reply"),
+    ("general", "tell me more about him"), ("general", "what's his networth"), ("general", "who is he"),
+    ("general", "what is the speed of sound"), ("general", "what is the boiling point of water"),
+    ("general", "what is the largest planet in the solar system"), ("general", "what is the tallest mountain"),
+    ("general", "what is the formula for the area of a circle"), ("general", "what is the square root of 144"),
+    ("general", "what is the chemical symbol for gold"), ("general", "what is the longest river in the world"),
+    ("general", "explain how rainbows form"), ("general", "what is gravity"),
+    ("realtime", "who is indian prime minister"), ("realtime", "tell me about facebook's recent update"),
+    ("realtime", "tell me news about coronavirus"), ("realtime", "who is akshay kumar"),
+    ("realtime", "what is today's news"), ("realtime", "what is today's headline"),
+    ("realtime", "what is the weather today"), ("realtime", "what is the price of bitcoin right now"),
+    ("realtime", "who won the match yesterday"), ("realtime", "latest news on the stock market"),
+    ("realtime", "what is the current temperature in delhi"), ("realtime", "who is elon musk"),
+    ("realtime", "what is the latest iphone"), ("realtime", "current president of the united states"),
+    ("realtime", "who is the richest person in the world"), ("realtime", "what is the score of the cricket match"),
+    ("realtime", "tell me about the latest movies"), ("realtime", "what is trending on twitter"),
+    ("realtime", "what's happening in the world today"), ("realtime", "who is virat kohli"),
+    ("realtime", "what is the dollar to rupee exchange rate"), ("realtime", "recent updates on chatgpt"),
+    ("realtime", "who is sundar pichai"), ("realtime", "what are the top headlines"),
+    ("realtime", "is it going to rain tomorrow"), ("realtime", "what is the stock price of tesla"),
+    ("realtime", "latest news about india"), ("realtime", "who is taylor swift"),
+    ("realtime", "when is the next ipl match"), ("realtime", "what happened in the election"),
+    ("open", "open chrome"), ("open", "launch notepad"), ("open", "open youtube"),
+    ("open", "start spotify"), ("open", "open facebook and instagram"), ("open", "open the calculator"),
+    ("close", "close notepad"), ("close", "close chrome"), ("close", "shut whatsapp"),
+    ("close", "kill telegram"), ("close", "close all windows"),
+    ("play", "play let her go"), ("play", "play afsanay by ys"), ("play", "play some music"),
+    ("play", "play a song by arijit singh"), ("play", "play despacito on youtube"),
+    ("system", "mute"), ("system", "unmute the system"), ("system", "volume up"),
+    ("system", "turn the volume down"), ("system", "increase the volume"), ("system", "mute the sound"),
+    ("content", "write an application for leave"), ("content", "write a letter to my teacher"),
+    ("content", "write an email to my boss"), ("content", "write a poem about love"),
+    ("content", "write code for a calculator"), ("content", "draft an essay on pollution"),
+    ("google search", "search google for python tutorials"), ("google search", "google best laptops"),
+    ("google search", "search the web for pizza places"), ("google search", "look up flights on google"),
+    ("youtube search", "search youtube for cooking videos"), ("youtube search", "youtube search lofi music"),
+    ("youtube search", "find funny cat videos on youtube"),
+    ("generate image", "generate image of a lion"), ("generate image", "create a picture of a sunset"),
+    ("generate image", "draw a cat"), ("generate image", "make an image of a dragon"),
+    ("reminder", "remind me to call mom at 5pm"), ("reminder", "set a reminder for my meeting tomorrow"),
+    ("reminder", "set an alarm for 6am"), ("reminder", "remind me about the dentist appointment"),
+    ("exit", "bye jarvis"), ("exit", "goodbye"), ("exit", "see you later"), ("exit", "exit"),
+]
+
+# Held-out utterances (none of them in TRAINING_SET) with the decision list
+# the Cohere model should produce.
+EVALUATION_SET = [
+    ("open microsoft edge", ["open microsoft edge"]),
+    ("ok bye", ["exit"]),
+    ("raise the volume", ["system volume up"]),
+    ("please mute", ["system mute"]),
+    ("open chrome and firefox", ["open chrome", "open firefox"]),
+    ("open facebook, telegram and close whatsapp", ["open facebook", "open telegram", "close whatsapp"]),
+    ("close excel", ["close excel"]),
+    ("play perfect by ed sheeran", ["play perfect by ed sheeran"]),
+    ("generate image of a tiger in the snow", ["generate image a tiger in the snow"]),
+    ("write an application for sick leave", ["content application for sick leave"]),
+    ("search youtube for guitar lessons", ["youtube search guitar lessons"]),
+    ("google search python decorators", ["google search python decorators"]),
+    ("what's the time", ["general what's the time"]),
+    ("what is today's date", ["general what is today's date"]),
+    ("what was his name", ["general what was his name"]),
+    ("how is your day going", ["general how is your day going"]),
+    ("tell me a riddle", ["general tell me a riddle"]),
+    ("what is object oriented programming", ["general what is object oriented programming"]),
+    ("who was ashoka the great", ["general who was ashoka the great"]),
+    ("how can i improve my memory", ["general how can i improve my memory"]),
+    ("what is the speed of light", ["general what is the speed of light"]),
+    ("explain black holes", ["general explain black holes"]),
+    ("who is the chief minister of maharashtra", ["realtime who is the chief minister of maharashtra"]),
+    ("what are today's sports headlines", ["realtime what are today's sports headlines"]),
+    ("who is shah rukh khan", ["realtime who is shah rukh khan"]),
+    ("what is the weather in mumbai today", ["realtime what is the weather in mumbai today"]),
+    ("latest news about space exploration", ["realtime latest news about space exploration"]),
+    ("what is the price of gold today", ["realtime what is the price of gold today"]),
+    ("open chrome and tell me about mahatma gandhi", ["open chrome", "general tell me about mahatma gandhi"]),
+    ("remind me at 9pm to take medicine", ["reminder 9:00pm take medicine"]),
+    ("see you", ["exit"]),
+    ("launch spotify", ["open spotify"]),
+    ("decrease the volume", ["system volume down"]),
+    ("write a poem about the ocean", ["content poem about the ocean"]),
+    ("play shape of you", ["play shape of you"]),
+    ("launch telegram", ["open telegram"]),
+    # Verbs that usually mean open/close, used about something else.
+    ("quit smoking tips", ["general quit smoking tips"]),
+    ("kill the lights", ["general kill the lights"]),
+    ("start the timer", ["general start the timer"]),
+    ("youtube is down", ["realtime youtube is down"]),
+    ("play with my dog", ["general play with my dog"]),
+    ("google stock price today", ["realtime google stock price today"]),
+    ("play believer on youtube", ["play believer"]),
+    ("google search for cheap flights", ["google search cheap flights"]),
+]
+
+# ==============================
+# TF-IDF + Logistic Regression
+# ==============================
+# Small enough to train at first use (a few milliseconds) with no extra
+# dependency; a prediction is a handful of dictionary lookups.
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+def Features(text: str) -> list[str]:
+    words = WORD_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+class TfidfLogisticRegression:
+    def __init__(self, epochs: int = 30, learning_rate: float = 0.5, l2: float = 1e-3):
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.idf = {}
+        self.labels = []
+        self.weights = {}
+        self.bias = {}
+
+    def vectorize(self, text: str) -> dict:
+        counts = Counter(f for f in Features(text) if f in self.idf)
+        vector = {f: (1 + math.log(c)) * self.idf[f] for f, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {f: v / norm for f, v in vector.items()}
+
+    def fit(self, samples):
+        documents = len(samples)
+        frequency = Counter(f for _, text in samples for f in set(Features(text)))
+        self.idf = {f: math.log((1 + documents) / (1 + df)) + 1 for f, df in frequency.items()}
+        self.labels = sorted({label for label, _ in samples})
+        self.weights = {label: defaultdict(float) for label in self.labels}
+        self.bias = {label: 0.0 for label in self.labels}
+
+        vectors = [(label, self.vectorize(text)) for label, text in samples]
+        for epoch in range(self.epochs):
+            rate = self.learning_rate / (1 + epoch * 0.1)
+            for label, vector in vectors:
+                probabilities = self._softmax(vector)
+                for candidate in self.labels:
+                    gradient = probabilities[candidate] - (1.0 if candidate == label else 0.0)
+                    weights = self.weights[candidate]
+                    for feature, value in vector.items():
+                        weights[feature] -= rate * (gradient * value + self.l2 * weights[feature])
+                    self.bias[candidate] -= rate * gradient
+        return self
+
+    def _softmax(self, vector: dict) -> dict:
+        scores = {
+            label: self.bias[label] + sum(self.weights[label].get(f, 0.0) * v for f, v in vector.items())
+            for label in self.labels
+        }
+        top = max(scores.values())
+        exps = {label: math.exp(score - top) for label, score in scores.items()}
+        total = sum(exps.values())
+        return {label: value / total for label, value in exps.items()}
+
+    def predict(self, text: str):
+        probabilities = self._softmax(self.vectorize(text))
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
+
+# ==============================
+# Classifier
+# ==============================
+class IntentClassifier:
+    def __init__(self, training_set=TRAINING_SET):
+        self.model = TfidfLogisticRegression().fit(training_set)
+        self._lock = threading.Lock()
+        self.counters = Counter()
+
+    @staticmethod
+    def _clean(text: str) -> str:
+        text = " ".join(text.lower().strip().split())
+        return text.rstrip(".!").strip()
+
+    def _classify_clause(self, clause: str, previous: str | None):
+        if REMOTE_ONLY.search(clause):
+            return [], 0.0
+
+        for pattern, build, confidence in RULES:
+            match = pattern.match(clause)
+            if match:
+                decision = build(match)
+                if callable(confidence):
+                    confidence = confidence(match)
+                verb = decision.split(" ", 1)[0]
+                if verb in LISTABLE:
+                    items = [item.strip() for item in LIST_SPLIT.split(decision[len(verb) + 1:]) if item.strip()]
+                    return [f"{verb} {item}" for item in items], confidence
+                return [decision], confidence
+
+        # "..., telegram" right after "open facebook" continues the list.
+        if previous in LISTABLE and len(clause.split()) <= 3:
+            return [f"{previous} {clause}"], RULE_CONFIDENCE
+
+        label, confidence = self.model.predict(clause)
+        if label not in ("general", "realtime"):
+            return [], 0.0  # a task the rules couldn't parse
+        return [f"{label} {clause}"], confidence
+
+    # Returns (decisions, confidence). Confidence is the weakest clause's.
+    def classify(self, text: str):
+        text = self._clean(text)
+        if not text:
+            return [], 0.0
+
+        decisions = []
+        confidence = 1.0
+        previous = None
+        for clause in CLAUSE_SPLIT.split(text):
+            clause = clause.strip(" ,")
+            if not clause:
+                continue
+            clause_decisions, clause_confidence = self._classify_clause(clause, previous)
+            if not clause_decisions:
+                return [], 0.0
+            decisions += clause_decisions
+            confidence = min(confidence, clause_confidence)
+            previous = clause_decisions[-1].split(" ", 1)[0]
+        return decisions, confidence
+
+    def record(self, local: bool):
+        with self._lock:
+            self.counters["local" if local else "remote"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        total = sum(counters.values())
+        counters["local_rate"] = counters.get("local", 0) / total if total else 0.0
+        return counters
+
+
+# ==============================
+# Shared Instance
+# ==============================
+_classifier = None
+_classifier_lock = threading.Lock()
+
+def GetIntentClassifier() -> IntentClassifier:
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = IntentClassifier()
+        return _classifier
+
+def ClassifyIntent(text: str):
+    return GetIntentClassifier().classify(text)
+
+
+# ==============================
+# Benchmark
+# ==============================
+def NormalizeDecisions(decisions) -> list[str]:
+    return [" ".join(d.lower().strip(" .?!").split()) for d in decisions]
+
+def Benchmark(threshold: float = 0.8, remote: bool = False):
+    classifier = GetIntentClassifier()
+    local_correct = local_answered = 0
+    remote_correct = 0
+    local_times = []
+    remote_times = []
+
+    if remote:
+        from Backend.Model import RemoteFirstLayerDMM
+
+    overlap = {text for _, text in TRAINING_SET} & {utterance for utterance, _ in EVALUATION_SET}
+    if overlap:
+        raise ValueError(f"EVALUATION_SET is not held out, also in TRAINING_SET: {sorted(overlap)}")
+
+    for utterance, expected in EVALUATION_SET:
+        started = time.perf_counter()
+        decisions, confidence = classifier.classify(utterance)
+        local_times.append((time.perf_counter() - started) * 1000)
+
+        if decisions and confidence >= threshold:
+            local_answered += 1
+            if NormalizeDecisions(decisions) == NormalizeDecisions(expected):
+                local_correct += 1
+            else:
+                print(f"[local miss] {utterance!r}: {decisions} (expected {expected})")
+
+        if remote:
+            started = time.perf_counter()
+            remote_decisions = RemoteFirstLayerDMM(utterance)
+            remote_times.append((time.perf_counter() - started) * 1000)
+            if NormalizeDecisions(remote_decisions) == NormalizeDecisions(expected):
+                remote_correct += 1
+
+    total = len(EVALUATION_SET)
+    local_times.sort()
+    print(f"Local:  answered {local_answered}/{total} ({local_answered / total:.0%}), "
+          f"precision {local_correct / max(local_answered, 1):.0%}, "
+          f"p50 {local_times[total // 2]:.2f} ms, max {local_times[-1]:.2f} ms")
+    if remote:
+        remote_times.sort()
+        print(f"Remote: accuracy {remote_correct / total:.0%}, "
+              f"p50 {remote_times[total // 2]:.0f} ms, max {remote_times[-1]:.0f} ms")
+
+
+# Raw Cohere replies and the decisions FirstLayerDMM should get from them.
+PARSING_CASES = [
+    ("open facebook, open telegram, close whatsapp", ["open facebook", "open telegram", "close whatsapp"]),
+    ("open chrome, general tell me about mahatma gandhi.", ["open chrome", "general tell me about mahatma gandhi"]),
+    ("general what is today's date, reminder 11:00pm 5th aug dancing performance",
+     ["general what is today's date", "reminder 11:00pm 5th aug dancing performance"]),
+    ("general who is he? open chrome", ["general who is he?", "open chrome"]),
+    ("open notepad\ncontent leave application", ["open notepad", "content leave application"]),
+    ("general compare rome, paris and london", ["general compare rome, paris and london"]),
+    ("generate image a cat, generate image a dog", ["generate image a cat", "generate image a dog"]),
+    ("Sure! open chrome", ["open chrome"]),
+]
+
+def CheckParsing() -> bool:
+    failures = [(text, ParseDecisions(text), expected) for text, expected in PARSING_CASES
+                if ParseDecisions(text) != expected]
+    for text, got, expected in failures:
+        print(f"[parse miss] {text!r}: {got} (expected {expected})")
+    print(f"Parsing: {len(PARSING_CASES) - len(failures)}/{len(PARSING_CASES)} Cohere replies split correctly")
+    return not failures
+
+
+if __name__ == "__main__":
+    # python IntentClassifier.py [--remote]
+    parsed = CheckParsing()
+    Benchmark(remote="--remote" in sys.argv)
+    sys.exit(0 if parsed else 1)
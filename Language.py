@@ -0,0 +1,212 @@
+# ==================================
+# Language.py
+# ==================================
+
+from langdetect import DetectorFactory, LangDetectException
+from langdetect import detector_factory
+from Backend.Resilience import ResilientCall
+from Backend.Cache import TTLCache
+from dotenv import dotenv_values
+import threading
+import time
+import sys
+import os
+
+# ==============================
+# Load Environment Variables
+# ==============================
+env_vars = dotenv_values(".env")
+DetectMinWords = int(env_vars.get("DetectMinWords", 4))  # shorter ASCII text is taken as English
+DetectCacheSize = int(env_vars.get("DetectCacheSize", 1024))
+TranslationCacheSize = int(env_vars.get("TranslationCacheSize", 2048))
+TranslationCacheTTL = float(env_vars.get("TranslationCacheTTL", 30 * 24 * 3600))
+TRANSLATION_CACHE_PATH = os.path.join("Data", "TranslationCache.json")
+
+# Fix random results from langdetect
+DetectorFactory.seed = 0
+
+# Separates the sentences of a batch; the translator keeps line breaks.
+BATCH_SEPARATOR = "\n"
+
+# ==============================
+# Detection
+# ==============================
+# langdetect reads ~55 language profiles from disk on first use. They are
+# loaded once here, when this module is imported (by the background warm-up,
+# not on the first utterance), and every detection reuses the factory.
+_factory_lock = threading.Lock()
+
+def GetDetectorFactory():
+    with _factory_lock:
+        detector_factory.init_factory()
+        return detector_factory._factory
+
+GetDetectorFactory()
+
+_detected = TTLCache(maxsize=DetectCacheSize, ttl=24 * 3600)
+_detect_stats = {"detections": 0, "skipped": 0}
+
+def DetectLanguage(text: str, default: str = "en") -> str:
+    text = text.strip()
+    # Short ASCII-only text ("open chrome", "thanks") is English here, and
+    # langdetect is unreliable on a handful of characters anyway.
+    if not text or (text.isascii() and len(text.split()) < DetectMinWords):
+        _detect_stats["skipped"] += 1
+        return default
+
+    cached = _detected.get(text)
+    if cached is not None:
+        return cached
+
+    _detect_stats["detections"] += 1
+    try:
+        detector = GetDetectorFactory().create()
+        detector.append(text)
+        language = detector.detect()
+    except LangDetectException:
+        language = default
+    _detected.put(text, language)
+    return language
+
+# ==============================
+# Translation
+# ==============================
+# Translations are cached by (source, target, text) and saved to disk, so a
+# repeated phrase never goes back to the network. Batches send every uncached
+# sentence in a single request.
+_translations = TTLCache(maxsize=TranslationCacheSize, ttl=TranslationCacheTTL, path=TRANSLATION_CACHE_PATH)
+_translate_stats = {"requests": 0, "sentences": 0}
+
+def TranslationKey(text: str, target: str, source: str) -> str:
+    return f"{source}>{target}:{text}"
+
+def RemoteTranslate(text: str, target: str, source: str) -> str:
+    import mtranslate  # heavy; only needed once something is not cached
+    return mtranslate.translate(text, target, source)
+
+_translator = RemoteTranslate
+
+# Swaps the network translator, e.g. for an offline benchmark.
+def SetTranslator(function):
+    global _translator
+    _translator = function
+
+def _Translate(text: str, target: str, source: str) -> str | None:
+    _translate_stats["requests"] += 1
+    return ResilientCall("translate", _translator, text, target, source, fallback=None)
+
+def TranslateBatch(texts: list[str], target: str = "en", source: str = "auto") -> list[str]:
+    results = [_translations.get(TranslationKey(text, target, source)) for text in texts]
+    missing = list(dict.fromkeys(
+        text for text, result in zip(texts, results) if result is None and text.strip()
+    ))
+
+    if missing:
+        _translate_stats["sentences"] += len(missing)
+        # Line breaks inside a sentence would shift the split below.
+        joined = BATCH_SEPARATOR.join(" ".join(text.split()) for text in missing)
+        translated = _Translate(joined, target, source)
+        parts = translated.split(BATCH_SEPARATOR) if translated else [None] * len(missing)
+        if len(parts) != len(missing):
+            # The service merged or split lines; translate one by one instead.
+            parts = [_Translate(text, target, source) for text in missing]
+
+        fresh = {}
+        for text, part in zip(missing, parts):
+            if part:
+                fresh[text] = part.strip()
+                _translations.put(TranslationKey(text, target, source), fresh[text])
+        results = [fresh.get(text) if result is None else result for text, result in zip(texts, results)]
+
+    # Offline: keep the original text rather than fail the request.
+    return [text if result is None else result for text, result in zip(texts, results)]
+
+def Translate(text: str, target: str = "en", source: str = "auto") -> str:
+    return TranslateBatch([text], target, source)[0]
+
+def LanguageStats() -> dict:
+    return {
+        "detect": {**_detect_stats, "cache": _detected.stats()},
+        "translate": {**_translate_stats, "cache": _translations.stats()},
+    }
+
+# ==============================
+# Benchmark
+# ==============================
+# Detection and translation throughput, before and after the service:
+#   python Language.py [--simulate MS]
+# --simulate replaces the network translator with a fixed delay, so batching
+# and caching can be measured offline.
+SAMPLE_TEXTS = [
+    "open chrome", "thanks", "what time is it", "play some music",
+    "what is the weather like in Mumbai today",
+    "tell me about the history of the Roman empire",
+    "quel temps fait-il à Paris aujourd'hui",
+    "wie spät ist es gerade in Berlin",
+    "¿cuál es la capital de Australia?",
+    "आज मौसम कैसा है",
+    "मुझे एक गाना सुनाओ",
+    "आज का समाचार बताओ",
+    "இன்று வானிலை எப்படி இருக்கிறது",
+    "как дела у тебя сегодня",
+]
+
+def Benchmark(rounds: int = 20, simulate_ms: float | None = None) -> dict:
+    from langdetect import detect
+
+    texts = SAMPLE_TEXTS * rounds
+    started = time.perf_counter()
+    for text in texts:
+        try:
+            detect(text)
+        except LangDetectException:
+            pass
+    naive = time.perf_counter() - started
+
+    _detected.clear()
+    started = time.perf_counter()
+    for text in texts:
+        DetectLanguage(text)
+    cached = time.perf_counter() - started
+    print(f"detect: langdetect {len(texts) / naive:,.0f}/s, service {len(texts) / cached:,.0f}/s "
+          f"({_detect_stats['skipped']} skipped as short ASCII, {_detected.stats()['hits']} cache hits)")
+
+    if simulate_ms is not None:
+        def SimulatedTranslate(text, target, source):
+            time.sleep(simulate_ms / 1000)
+            return text.upper()
+        SetTranslator(SimulatedTranslate)
+
+    # A fresh in-memory cache: the run starts cold and never touches the saved one.
+    global _translations
+    _translations = TTLCache(maxsize=TranslationCacheSize, ttl=TranslationCacheTTL)
+    sentences = [text for text in SAMPLE_TEXTS if not text.isascii()]
+
+    requests_before = _translate_stats["requests"]
+    started = time.perf_counter()
+    for text in sentences:
+        _Translate(text, "en", "auto")
+    one_by_one = time.perf_counter() - started
+    one_by_one_requests = _translate_stats["requests"] - requests_before
+
+    requests_before = _translate_stats["requests"]
+    started = time.perf_counter()
+    TranslateBatch(sentences)
+    batched = time.perf_counter() - started
+    batched_requests = _translate_stats["requests"] - requests_before
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        TranslateBatch(sentences)
+    warm = (time.perf_counter() - started) / rounds
+
+    print(f"translate {len(sentences)} sentences: one by one {one_by_one * 1000:.0f} ms "
+          f"({one_by_one_requests} requests), batched {batched * 1000:.0f} ms ({batched_requests} request), "
+          f"cached {warm * 1000:.2f} ms")
+    return LanguageStats()
+
+if __name__ == "__main__":
+    simulate = None
+    if "--simulate" in sys.argv:
+        simulate = float(sys.argv[sys.argv.index("--simulate") + 1])
+    Benchmark(simulate_ms=simulate)
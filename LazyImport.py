@@ -0,0 +1,164 @@
+# ==================================
+# LazyImport.py
+# ==================================
+
+from dotenv import dotenv_values
+import subprocess
+import importlib
+import threading
+import time
+import sys
+import re
+
+# ==============================
+# Load Environment Variables
+# ==============================
+env_vars = dotenv_values(".env")
+
+# Budget for importing Main (everything before the window can appear).
+StartupImportBudgetMs = float(env_vars.get("StartupImportBudgetMs", 1500))
+
+# Packages that take seconds to import (or open devices / the network on
+# import) and must stay out of the startup path.
+HEAVY_MODULES = [
+    "cohere", "groq", "pywhatkit", "AppOpener", "selenium", "edge_tts", "pygame",
+    "speech_recognition", "matplotlib", "mtranslate", "googlesearch", "PIL", "langdetect",
+    "aiohttp", "bs4",
+]
+
+# ==============================
+# Lazy References
+# ==============================
+# Stands in for a function or class from a module that hasn't been imported
+# yet. The first call (or attribute access) imports the module and every
+# later use goes straight to the real object. All references are remembered
+# so WarmUp() can import them ahead of time.
+_references = []
+ImportTimes = {}  # module -> seconds spent importing it (first import only)
+
+def ImportModule(name: str):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    ImportTimes.setdefault(name, time.perf_counter() - started)
+    return module
+
+class LazyReference:
+    def __init__(self, module: str, name: str):
+        self._module = module
+        self._name = name
+        self._target = None
+        _references.append(self)
+
+    def resolve(self):
+        if self._target is None:
+            self._target = getattr(ImportModule(self._module), self._name)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, item):
+        return getattr(self.resolve(), item)
+
+    def __repr__(self):
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<lazy {self._module}.{self._name} ({state})>"
+
+# Lazy("Backend.Model", "FirstLayerDMM") -> one reference; several names -> a tuple.
+def Lazy(module: str, *names: str):
+    references = tuple(LazyReference(module, name) for name in names)
+    return references[0] if len(references) == 1 else references
+
+# ==============================
+# Warm-Up
+# ==============================
+# Imports every module behind a lazy reference, in the order they were
+# declared, then calls on_done. Meant to run once the window is showing, so
+# the first request usually finds its backends already loaded.
+def WarmUp(on_done=None):
+    started = time.perf_counter()
+    for module in dict.fromkeys(reference._module for reference in list(_references)):
+        try:
+            ImportModule(module)
+        except Exception as e:
+            print(f"⚠️ Could not preload {module}: {e}")  # retried (and reported) on first use
+    for reference in list(_references):
+        try:
+            reference.resolve()
+        except Exception:
+            pass
+    print(f"🔥 Backends warmed up in {time.perf_counter() - started:.2f}s")
+    if on_done:
+        on_done()
+
+def WarmUpInBackground(on_done=None) -> threading.Thread:
+    thread = threading.Thread(target=WarmUp, args=(on_done,), daemon=True, name="warm-up")
+    thread.start()
+    return thread
+
+def ImportStats() -> dict:
+    return {module: round(seconds * 1000, 1) for module, seconds in
+            sorted(ImportTimes.items(), key=lambda item: item[1], reverse=True)}
+
+# ==============================
+# Startup Benchmark
+# ==============================
+# Imports `module` in a fresh interpreter with -X importtime and fails if it
+# pulls in any HEAVY_MODULES or takes longer than the budget.
+#   python LazyImport.py [module] [--budget MS]
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+def MeasureImport(module: str = "Main") -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    # Children are listed before their parent, so everything up to `site` is
+    # interpreter startup rather than our import.
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        if match.group(3) == "site":
+            cumulative.clear()
+            continue
+        cumulative[match.group(3)] = int(match.group(2))
+    total_us = cumulative.get(module, 0)
+    top_level = {name.split(".")[0] for name in cumulative}
+    return {
+        "total_ms": total_us / 1000,
+        "heavy": [name for name in HEAVY_MODULES if name in top_level],
+        "slowest": sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:15],
+    }
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    budget = StartupImportBudgetMs
+    if "--budget" in args:
+        index = args.index("--budget")
+        budget = float(args[index + 1])
+        del args[index:index + 2]
+    module = args[0] if args else "Main"
+
+    report = MeasureImport(module)
+    print(f"import {module}: {report['total_ms']:.0f} ms (budget {budget:.0f} ms)")
+    for name, micros in report["slowest"]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if report["heavy"]:
+        failures.append(f"heavy modules imported at startup: {', '.join(report['heavy'])}")
+    if report["total_ms"] > budget:
+        failures.append(f"startup import took {report['total_ms']:.0f} ms, over the {budget:.0f} ms budget")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Startup imports within budget")
+    sys.exit(1 if failures else 0)
@@ -6,24 +6,37 @@ from Frontend.GUI import (
     AnswerModifier,
     QueryModifier,
     GetMicrophoneStatus,
-    GetAssistantStatus
+    GetAssistantStatus,
+    WaitForMicrophoneStatus
 )
-from Backend.Model import FirstLayerDMM
-from Backend.RealtimeSearchEngine import RealtimeSearchEngine
-from Backend.Automation import Automation
-from Backend.SpeechToText import recognize_speech
-from Backend.Chatbot import ChatBot
-from Backend.TextToSpeech import TextToSpeech
+from Backend.LazyImport import Lazy, WarmUpInBackground
+from Backend.ChatHistory import GetChatHistory
+from Backend.Resilience import CancellationToken, OperationCancelled
+from Backend.Reminders import GetReminderScheduler, ReminderAnnouncement
 from dotenv import dotenv_values
 from asyncio import run
-from time import sleep
-import subprocess
+import asyncio
 import threading
-import json
+import queue
 import os
-import sys
-import webbrowser
-from AppOpener import open as appopen, close as appclose  # ✅ for app control
+
+# ------------------------------
+# Backends (imported on first use, or by the warm-up once the window is shown)
+# ------------------------------
+recognize_speech, BargeInMonitor, GetSpeechBackend = Lazy(
+    "Backend.SpeechToText", "recognize_speech", "BargeInMonitor", "GetSpeechBackend"
+)
+FirstLayerDMM, SpeculateDecision = Lazy("Backend.Model", "FirstLayerDMM", "SpeculateDecision")
+ChatBot, ChatBotStream = Lazy("Backend.Chatbot", "ChatBot", "ChatBotStream")
+TextToSpeech, StreamingTextToSpeech, PrewarmAudioCache, Player = Lazy(
+    "Backend.TextToSpeech", "TextToSpeech", "StreamingTextToSpeech", "PrewarmAudioCache", "Player"
+)
+RealtimeSearchEngine, RealtimeSearchEngineStream = Lazy(
+    "Backend.RealtimeSearchEngine", "RealtimeSearchEngine", "RealtimeSearchEngineStream"
+)
+RunDecisions, IsCommand = Lazy("Backend.Automation", "RunDecisions", "IsCommand")
+GetImageWorker = Lazy("Backend.ImageGeneration", "GetImageWorker")
+WaitForWakeWord = Lazy("Backend.WakeWord", "WaitForWakeWord")
 
 # ------------------------------
 # Temporary fix for missing import
@@ -40,30 +53,33 @@ Assistantname = env_vars.get("Assistantname")
 DefaultMessage = f'''{Username} : Hello {Assistantname}, How are you?
 {Assistantname} : Welcome {Username}. I am doing well. How may i help you?'''
 
-subprocesses = []
-Functions = ["open", "close", "play", "system", "content", "google search", "youtube search"]
+# Speak answers sentence by sentence while the LLM is still generating them.
+StreamingMode = env_vars.get("StreamingMode", "True").strip().lower() == "true"
 
-# ------------------------------
-# Image Generation Config
-# ------------------------------
-BASE_DIR = os.getcwd()  # ✅ dynamic project root
-IMAGE_SIGNAL_DIR = os.path.join("Frontend", "Files")
-IMAGE_SIGNAL_FILE = os.path.join(IMAGE_SIGNAL_DIR, "imagegeneration.data")
-IMAGE_SCRIPT_PATH = os.path.join(BASE_DIR, "Backend", "imagegeneration.py")  # ✅ fixed path
+# Keep listening while answering: talking over Jarvis stops the reply and
+# cancels the pending Cohere/Groq call, and the new request is handled next.
+FullDuplex = env_vars.get("FullDuplex", "False").strip().lower() == "true"
+
+# Run independent decisions concurrently (see Orchestrator); False restores
+# the one-request-at-a-time loop.
+PipelineMode = env_vars.get("PipelineMode", "True").strip().lower() == "true"
+
+# Wait for the wake word (detected locally, see WakeWord.py) before running
+# full speech recognition, instead of transcribing everything the mic hears.
+WakeWordMode = env_vars.get("WakeWordMode", "False").strip().lower() == "true"
+
+subprocesses = []
 
 # ------------------------------
 # Functions
 # ------------------------------
 def ShowDefaultChatIfNoChats():
-    with open(r'Data\ChatLog.json', "r", encoding='utf-8') as File:
-        if len(File.read()) < 5:
-            with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
-                file.write("")
+    if GetChatHistory().count() == 0:
+        with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
+            file.write("")
 
 def ReadChatLogJson():
-    with open(r'Data\ChatLog.json', 'r', encoding='utf-8') as file:
-        chatlog_data = json.load(file)
-    return chatlog_data
+    return GetChatHistory().all()
 
 def ChatLogIntegration():
     json_data = ReadChatLogJson()
@@ -86,8 +102,26 @@ def ShowChatsOnGUI():
     if len(Data) > 0:
         lines = Data.split('\n')
         result = '\n'.join(lines)
-        with open(TempDirectoryPath('Responses.data'), "w", encoding='utf-8') as File:
-            File.write(result)
+        ShowTextToScreen(result)
+
+def AnswerAndSpeak(StreamFunction, Function, Query, Cancel=None):
+    if StreamingMode:
+        SetAssistantStatus("Answering ... ")
+        Answer = StreamingTextToSpeech(
+            StreamFunction(Query, Cancel),
+            on_text=lambda Text: ShowTextToScreen(f"{Assistantname} : {AnswerModifier(Text)}"),
+            cancel=Cancel
+        )
+        ShowTextToScreen(f"{Assistantname} : {AnswerModifier(Answer)}")
+        return Answer
+
+    Answer = Function(Query, Cancel)
+    if Cancel is not None:
+        Cancel.raise_if_cancelled()
+    ShowTextToScreen(f"{Assistantname} : {Answer}")
+    SetAssistantStatus("Answering ... ")
+    TextToSpeech(Answer, cancel=Cancel)
+    return Answer
 
 def InitialExecution():
     SetMicrophoneStatus("False")
@@ -96,34 +130,90 @@ def InitialExecution():
     ChatLogIntegration()
     ShowChatsOnGUI()
 
+# Called from the image worker's event thread.
+def OnImageEvent(JobId, Event, Detail):
+    if Event == "progress":
+        print(f"Image job {JobId}: {Detail} images ready")
+    elif Event == "completed":
+        DoneMessage = "Your image has been generated successfully."
+        ShowTextToScreen(f"{Assistantname} : {DoneMessage}")
+        TextToSpeech(DoneMessage)
+    elif Event == "failed":
+        print("Image generation error:", Detail)
+        ShowTextToScreen(f"{Assistantname} : Sorry, I couldn't generate that image.")
+
+def Say(Text, Cancel=None):
+    ShowTextToScreen(f"{Assistantname} : {Text}")
+    TextToSpeech(Text, cancel=Cancel)
+
+# Runs every automation decision (in parallel where safe) and returns one
+# summary to speak, e.g. "Opening facebook and telegram, and closing whatsapp."
+def RunTasks(Queries):
+    print(f"Running automation for: {Queries}")
+    return run(RunDecisions(Queries))
+
+# Hands the prompt to the long-lived image worker and returns the reply.
+def StartImageGeneration(Query):
+    GetImageWorker().submit(Query, callback=OnImageEvent)
+    return f"Okay {Username}, I am generating your image now. Please wait..."
+
+# Interim transcript from a streaming speech backend: show it, and let the
+# decision model start on it in case it turns out to be the final text.
+def OnPartialTranscript(Text):
+    ShowTextToScreen(f"{Username} : {Text} ...")
+    SpeculateDecision(Text)
+
+# Called by the reminder scheduler in the sequential (PipelineMode=False) loop.
+def SpeakReminder(Reminder):
+    threading.Thread(target=Say, args=(ReminderAnnouncement(Reminder),), daemon=True).start()
+
 # ------------------------------
 # Main execution
 # ------------------------------
-def MainExecution():
-    TaskExecution = False
-    ImageExecution = False
-    ImageGenerationQuery = ""
-
+# Listens for one request and handles it. With FullDuplex a BargeInMonitor
+# runs meanwhile; if the user talks over the reply, the turn is cancelled and
+# the recorded interruption is returned, to be handled by the next call.
+def MainExecution(Audio=None):
+    if Audio is None and WakeWordMode:
+        if not WaitForWakeWord(SetAssistantStatus, should_stop=lambda: GetMicrophoneStatus() != "True"):
+            return None
     SetAssistantStatus("Listening ... ")
-    Query = recognize_speech()
+    Query = recognize_speech(SetAssistantStatus, Audio, OnPartialTranscript)
 
     # If nothing was heard, don’t spam
     if not Query.strip():
         SetAssistantStatus("Available ... ")
-        return
+        return None
+
+    Cancel = CancellationToken()
+    Monitor = None
+    if FullDuplex:
+        Monitor = BargeInMonitor(on_speech=lambda: Cancel.cancel("barge-in"), is_playing=Player.is_busy).start()
+    try:
+        HandleQuery(Query, Cancel)
+    except OperationCancelled:
+        print("✋ Interrupted, listening to the new request")
+    finally:
+        Interruption = Monitor.stop() if Monitor else None
+    return Interruption
+
+def HandleQuery(Query, Cancel=None):
+    ImageExecution = False
+    ImageGenerationQuery = ""
 
     ShowTextToScreen(f"{Username} : {Query}")
     SetAssistantStatus("Thinking ... ")
-    Decision = FirstLayerDMM(Query)
+    Decision = FirstLayerDMM(Query, Cancel)
 
     print(f"\nDecision : {Decision}\n")
 
     G = any(i.startswith("general") for i in Decision)
     R = any(i.startswith("realtime") for i in Decision)
 
-    Mearged_query = " and ".join(
-        " ".join(i.split()[1:]) for i in Decision if i.startswith("general") or i.startswith("realtime")
-    )
+    # Each general/realtime part is searched on its own (concurrently) and answered together.
+    SubQueries = [
+        QueryModifier(" ".join(i.split()[1:])) for i in Decision if i.startswith("general") or i.startswith("realtime")
+    ]
 
     # Check for image generation
     for queries in Decision:
@@ -131,156 +221,330 @@ def MainExecution():
             ImageGenerationQuery = str(queries)
             ImageExecution = True
 
-    # Execute automation tasks
-    for queries in Decision:
-        if not TaskExecution:
-            if any(queries.startswith(func) for func in Functions):
-                try:
-                    clean_query = queries.strip().lower()
-                    print(f"Running automation for: {clean_query}")
-
-                    # ✅ Smart open/close handling
-                    if clean_query.startswith("open "):
-                        target = clean_query.replace("open ", "").strip()
-
-                        # Known websites dictionary
-                        websites = {
-                            "youtube": "https://www.youtube.com",
-                            "google": "https://www.google.com",
-                            "twitter": "https://twitter.com",
-                            "instagram": "https://www.instagram.com",
-                            "facebook": "https://www.facebook.com",
-                            "github": "https://github.com"
-                        }
-
-                        if target in websites:
-                            url = websites[target]
-                            webbrowser.get().open(url)  # ✅ open in default browser
-                            ShowTextToScreen(f"{Assistantname} : Opening {target}")
-                            TextToSpeech(f"Opening {target}")
-                        else:
-                            try:
-                                appopen(target, match_closest=True)
-                                ShowTextToScreen(f"{Assistantname} : Opening {target}")
-                                TextToSpeech(f"Opening {target}")
-                            except Exception:
-                                webbrowser.open(f"https://www.google.com/search?q={target}")
-                                ShowTextToScreen(f"{Assistantname} : I couldn't find {target} app, searching online instead.")
-                                TextToSpeech(f"I couldn't find {target} app, searching online instead.")
-                        TaskExecution = True
-
-                    elif clean_query.startswith("close "):
-                        app_name = clean_query.replace("close ", "")
-                        appclose(app_name, match_closest=True)
-                        ShowTextToScreen(f"{Assistantname} : Closing {app_name}")
-                        TextToSpeech(f"Closing {app_name}")  
-                        TaskExecution = True
-
-                    else:
-                        run(Automation(clean_query))
-                        TaskExecution = True
-
-                except Exception as e:
-                    print(f"Automation error: {e}")
-
-    # Execute image generation properly
-    if ImageExecution:
+    # Execute all automation tasks and report them in one sentence
+    Tasks = [queries for queries in Decision if IsCommand(queries)]
+    if Tasks:
         try:
-            os.makedirs(IMAGE_SIGNAL_DIR, exist_ok=True)
-            with open(IMAGE_SIGNAL_FILE, "w", encoding="utf-8") as file:
-                file.write(f"{ImageGenerationQuery},True")
+            Message = RunTasks(Tasks)
+            if Message:
+                Say(Message, Cancel)
 
-            # Tell user it's working
-            Answer = f"Okay {Username}, I am generating your image now. Please wait..."
-            ShowTextToScreen(f"{Assistantname} : {Answer}")
-            SetAssistantStatus("Answering ... ")
-            TextToSpeech(Answer)
-
-            # Run synchronously
-            p1 = subprocess.Popen(
-                [sys.executable, IMAGE_SCRIPT_PATH],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                stdin=subprocess.PIPE,
-                shell=False
-            )
-            stdout, stderr = p1.communicate()
+        except Exception as e:
+            print(f"Automation error: {e}")
 
-            if stderr:
-                print("Image generation error:", stderr.decode())
+    if Cancel is not None:
+        Cancel.raise_if_cancelled()
 
-            DoneMessage = "Your image has been generated successfully."
-            ShowTextToScreen(f"{Assistantname} : {DoneMessage}")
+    # Hand image generation to the long-lived worker and keep going
+    if ImageExecution:
+        try:
             SetAssistantStatus("Answering ... ")
-            TextToSpeech(DoneMessage)
+            Say(StartImageGeneration(ImageGenerationQuery), Cancel)
 
         except Exception as e:
             print(f"Error starting image generation: {e}")
 
-    # Handle general and realtime queries
+    # Handle general and realtime queries (all of them, in order)
     if G and R:
         SetAssistantStatus("Searching ... ")
-        Answer = RealtimeSearchEngine(QueryModifier(Mearged_query))
-        ShowTextToScreen(f"{Assistantname} : {Answer}")
-        SetAssistantStatus("Answering ... ")
-        TextToSpeech(Answer)
-        return True
+        AnswerAndSpeak(RealtimeSearchEngineStream, RealtimeSearchEngine, SubQueries, Cancel)
     else:
         for Queries in Decision:
-            if "general" in Queries:
+            if Queries.startswith("general"):
                 SetAssistantStatus("Thinking ... ")
                 QueryFinal = Queries.replace("general ", "")
-                Answer = ChatBot(QueryModifier(QueryFinal))  # ✅ ChatBot now uses HuggingFace
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ... ")
-                TextToSpeech(Answer)
-                return True
-            elif "realtime" in Queries:
+                AnswerAndSpeak(ChatBotStream, ChatBot, QueryModifier(QueryFinal), Cancel)
+            elif Queries.startswith("realtime"):
                 SetAssistantStatus("Searching ... ")
                 QueryFinal = Queries.replace("realtime ", "")
-                Answer = RealtimeSearchEngine(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ... ")
-                TextToSpeech(Answer)
-                return True
-            elif "exit" in Queries:
-                QueryFinal = "Okay, Bye!"
-                Answer = ChatBot(QueryModifier(QueryFinal))  # ✅ HuggingFace
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ... ")
-                TextToSpeech(Answer)
-                SetAssistantStatus("Answering ... ")
-                os._exit(1)
+                AnswerAndSpeak(RealtimeSearchEngineStream, RealtimeSearchEngine, QueryModifier(QueryFinal), Cancel)
+
+    if any(Queries.startswith("exit") for Queries in Decision):
+        QueryFinal = "Okay, Bye!"
+        Answer = ChatBot(QueryModifier(QueryFinal))  # ✅ HuggingFace
+        ShowTextToScreen(f"{Assistantname} : {Answer}")
+        SetAssistantStatus("Answering ... ")
+        TextToSpeech(Answer)
+        SetAssistantStatus("Answering ... ")
+        os._exit(1)
+    return True
+
+# ------------------------------
+# Pipelined execution
+# ------------------------------
+# Splits a turn's decisions into independent jobs, in the order they should
+# be spoken. Automation tasks form one job with a single summary, and general
+# and realtime parts become one realtime job over all of them (one search per
+# part) when both are present, as in HandleQuery. Exit always goes last, so
+# everything else asked in the same turn finishes and is spoken first.
+def PlanDecisions(Decision):
+    Jobs = []
+    Tasks = []
+    Exit = None
+    Answered = False
+    Mixed = any(i.startswith("general") for i in Decision) and any(i.startswith("realtime") for i in Decision)
+
+    for Queries in Decision:
+        if "generate " in Queries.lower():
+            Jobs.append(("image", Queries))
+        elif IsCommand(Queries):
+            if not Tasks:
+                Jobs.append(("tasks", Tasks))  # all tasks run together, summarized once
+            Tasks.append(Queries)
+        elif Queries.startswith("general") or Queries.startswith("realtime"):
+            if not Mixed:
+                Kind, _, QueryFinal = Queries.partition(" ")
+                Jobs.append((Kind, QueryFinal))
+            elif not Answered:
+                Jobs.append(("realtime", [
+                    " ".join(i.split()[1:]) for i in Decision if i.startswith("general") or i.startswith("realtime")
+                ]))
+                Answered = True
+        elif Queries.startswith("exit"):
+            Exit = Exit or Queries
+    if Exit:
+        Jobs.append(("exit", Exit))
+    return Jobs
+
+# Runs a (blocking) LLM stream on its own thread from now on, so the reply is
+# being generated while earlier output is still being spoken.
+def Prefetch(chunks):
+    Buffer = queue.Queue()
+
+    def Pump():
+        try:
+            for chunk in chunks:
+                Buffer.put(chunk)
+        finally:
+            Buffer.put(None)
+
+    threading.Thread(target=Pump, daemon=True).start()
+    return iter(Buffer.get, None)
+
+class Turn:
+    def __init__(self, Query):
+        self.Query = Query
+        self.Cancel = CancellationToken()
+        self.Slots = asyncio.Queue()  # one future per job, in speaking order; None ends the turn
+        self.Task = None
+
+# Listens, decides and acts concurrently; only speech is serialized. Every
+# turn's jobs start as soon as its decision is known (launching an app and
+# calling the LLM at the same time), while the speaker plays their results
+# turn by turn, job by job. The microphone stays open while jobs run; while
+# speech plays it is only used for barge-in (FullDuplex), and a capture that
+# was still recording when speech started is dropped, so Jarvis doesn't
+# transcribe its own voice.
+class Orchestrator:
+    def __init__(self):
+        self.Turns = asyncio.Queue()
+        self.Active = set()
+        self.Speaking = threading.Event()
+        self.SpeechCount = 0  # bumped every time speech starts, to spot captures that overlapped it
+
+    async def Run(self):
+        await asyncio.gather(self.Listen(), self.Speak(), GetReminderScheduler().run(self.OnReminder))
+
+    # Queues something to say that isn't an answer to a request (e.g. a reminder).
+    def Announce(self, Text):
+        turn = Turn(None)
+        Slot = asyncio.get_running_loop().create_future()
+        Slot.set_result(("text", Text))
+        turn.Slots.put_nowait(Slot)
+        turn.Slots.put_nowait(None)
+        self.Active.add(turn)
+        self.Turns.put_nowait(turn)
+
+    def OnReminder(self, Reminder):
+        self.Announce(ReminderAnnouncement(Reminder))
+
+    # Called from the barge-in monitor thread.
+    def Interrupt(self):
+        for turn in list(self.Active):
+            turn.Cancel.cancel("barge-in")
+
+    def ListenForBargeIn(self):
+        Monitor = BargeInMonitor(on_speech=self.Interrupt, is_playing=Player.is_busy).start()
+        while self.Speaking.is_set() and not Monitor.triggered.wait(0.1):
+            pass
+        return Monitor.stop()
+
+    async def Listen(self):
+        while True:
+            if GetMicrophoneStatus() != "True":
+                if "Available ... " not in GetAssistantStatus():
+                    SetAssistantStatus("Available ... ")
+                await asyncio.to_thread(WaitForMicrophoneStatus, "True", 1.0)
+                continue
+
+            Audio = None
+            if self.Speaking.is_set():
+                if not FullDuplex:
+                    await asyncio.sleep(0.1)
+                    continue
+                Audio = await asyncio.to_thread(self.ListenForBargeIn)
+                if Audio is None:
+                    continue
+            elif WakeWordMode:
+                Heard = await asyncio.to_thread(
+                    WaitForWakeWord, SetAssistantStatus,
+                    should_stop=lambda: GetMicrophoneStatus() != "True" or self.Speaking.is_set(),
+                )
+                if not Heard:
+                    continue
+
+            if not self.Active:
+                SetAssistantStatus("Listening ... ")
+            SpeechCount = self.SpeechCount
+            Query = await asyncio.to_thread(recognize_speech, SetAssistantStatus, Audio, OnPartialTranscript)
+            if not Query.strip():
+                continue
+
+            # A normal capture that was still recording when a reply started
+            # playing may hold Jarvis's own voice; drop it rather than treat it
+            # as a new request. (Barge-in audio was recorded on purpose.)
+            if Audio is None and (self.SpeechCount != SpeechCount or self.Speaking.is_set()):
+                print(f"🔇 Dropped a capture that overlapped speech: {Query!r}")
+                continue
+
+            turn = Turn(Query)
+            self.Active.add(turn)
+            await self.Turns.put(turn)
+            turn.Task = asyncio.create_task(self.Handle(turn))
+
+    async def Handle(self, turn):
+        try:
+            ShowTextToScreen(f"{Username} : {turn.Query}")
+            SetAssistantStatus("Thinking ... ")
+            Decision = await asyncio.to_thread(FirstLayerDMM, turn.Query, turn.Cancel)
+            print(f"\nDecision : {Decision}\n")
+
+            for Job in PlanDecisions(Decision):
+                await turn.Slots.put(asyncio.ensure_future(self.Execute(Job, turn.Cancel)))
+        except OperationCancelled:
+            pass
+        except Exception as e:
+            print(f"Error handling '{turn.Query}': {e}")
+        finally:
+            await turn.Slots.put(None)
+
+    # Returns what to say as ("text" | "stream" | "exit", payload), or None.
+    async def Execute(self, Job, Cancel):
+        Kind, Query = Job
+        try:
+            if Kind == "tasks":
+                Message = await RunDecisions(Query)
+                return ("text", Message) if Message else None
+
+            if Kind == "image":
+                return ("text", StartImageGeneration(Query))
+
+            if Kind in ("general", "realtime"):
+                SetAssistantStatus("Thinking ... " if Kind == "general" else "Searching ... ")
+                Prompt = [QueryModifier(Q) for Q in Query] if isinstance(Query, list) else QueryModifier(Query)
+                if StreamingMode:
+                    StreamFunction = ChatBotStream if Kind == "general" else RealtimeSearchEngineStream
+                    return ("stream", Prefetch(StreamFunction(Prompt, Cancel)))
+                Function = ChatBot if Kind == "general" else RealtimeSearchEngine
+                return ("text", await asyncio.to_thread(Function, Prompt, Cancel))
+
+            if Kind == "exit":
+                return ("exit", await asyncio.to_thread(ChatBot, QueryModifier("Okay, Bye!")))
+
+        except OperationCancelled:
+            return None
+        except Exception as e:
+            print(f"Error running {Kind} '{Query}': {e}")
+        return None
+
+    async def Speak(self):
+        while True:
+            turn = await self.Turns.get()
+            while True:
+                Slot = await turn.Slots.get()
+                if Slot is None:
+                    break
+                Item = await Slot
+                if Item is None or turn.Cancel.cancelled:
+                    continue
+                self.SpeechCount += 1
+                self.Speaking.set()
+                try:
+                    await asyncio.to_thread(self.Say, Item, turn.Cancel)
+                finally:
+                    self.Speaking.clear()
+            self.Active.discard(turn)
+            if not self.Active:
+                SetAssistantStatus("Available ... ")
+
+    def Say(self, Item, Cancel):
+        Kind, Payload = Item
+        SetAssistantStatus("Answering ... ")
+        if Kind == "stream":
+            Answer = StreamingTextToSpeech(
+                Payload,
+                on_text=lambda Text: ShowTextToScreen(f"{Assistantname} : {AnswerModifier(Text)}"),
+                cancel=Cancel
+            )
+            ShowTextToScreen(f"{Assistantname} : {AnswerModifier(Answer)}")
+            return
+
+        Say(Payload, Cancel)
+        if Kind == "exit":
+            os._exit(1)
 
 # ------------------------------
 # Threads
 # ------------------------------
 def FirstThread():
+    if PipelineMode:
+        run(Orchestrator().Run())
+        return
+
+    Interruption = None  # a barge-in recording waiting to be handled
     while True:
         CurrentStatus = GetMicrophoneStatus()
         if CurrentStatus == "True":
-            MainExecution()
+            Interruption = MainExecution(Interruption)
         else:
+            Interruption = None
             AIStatus = GetAssistantStatus()
-            if "Available ... " in AIStatus:
-                sleep(0.2)  # prevent spamming
-            else:
+            if "Available ... " not in AIStatus:
                 SetAssistantStatus("Available ... ")
+            WaitForMicrophoneStatus("True")  # ✅ blocks until the mic is switched on
 
 def SecondThread():
-    GraphicalUserInterface()
+    GraphicalUserInterface(on_shown=OnWindowShown)
 
-# ------------------------------
-# Run Threads
-# ------------------------------
-thread2 = threading.Thread(target=FirstThread, daemon=True)
-thread2.start()
-SecondThread()
+# Runs on the GUI thread once the window is up: show the chat log, then load
+# the backends in the background.
+def OnWindowShown():
+    InitialExecution()
+    WarmUpInBackground(on_done=StartBackgroundServices)
+
+def StartBackgroundServices():
+    # Load the speech model (Vosk takes a moment) before the first request.
+    GetSpeechBackend()
+
+    # Start the image worker now so its startup cost is paid once, off the voice loop.
+    GetImageWorker()
+
+    # Synthesize the fixed phrases ahead of time so they play without a network call.
+    threading.Thread(
+        target=PrewarmAudioCache,
+        args=([f"Okay {Username}, I am generating your image now. Please wait..."],),
+        daemon=True
+    ).start()
 
 # ------------------------------
-# Initial execution
+# Run Threads
 # ------------------------------
-InitialExecution()
-
+# Guarded so the image worker (a spawned process) can import this module safely.
 if __name__ == "__main__":
-    pass
+    # The orchestrator runs reminders on its own loop; the sequential loop needs a thread for them.
+    if not PipelineMode:
+        threading.Thread(target=lambda: run(GetReminderScheduler().run(SpeakReminder)), daemon=True).start()
+
+    thread2 = threading.Thread(target=FirstThread, daemon=True)
+    thread2.start()
+    SecondThread()  # initial execution and warm-up run from OnWindowShown
@@ -1,6 +1,14 @@
 import cohere  # Import the Cohere library for AI services.
 from rich import print  # Import the Rich library to enhance terminal outputs.
 from dotenv import dotenv_values  # Import dotenv to load environment variables from a .env file.
+from Backend.IntentClassifier import GetIntentClassifier, ParseDecisions  # Local fast-path classifier and decision parsing.
+from Backend.TextUtils import QueryModifier  # Shared lowercasing/punctuation rules.
+from Backend.Cache import TTLCache  # LRU + TTL cache for repeated queries.
+from Backend.Resilience import ResilientCall, GetBackend  # Deadlines, retries and circuit breaking.
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import threading
+import os
+import re
 
 # Load environment variables from the .env file.
 env_vars = dotenv_values(".env")
@@ -8,15 +16,26 @@ env_vars = dotenv_values(".env")
 # Retrieve API key.
 CohereAPIKey = env_vars.get("CohereAPIKey")
 
-# Create a Cohere client using the provided API key.
-co = cohere.Client(api_key=CohereAPIKey)
+# Local decisions at or above this confidence skip the Cohere round-trip.
+LocalIntentThreshold = float(env_vars.get("LocalIntentThreshold", 0.8))
 
-# Define a list of recognized function keywords for task categorization.
-funcs = [
-    "exit", "general", "realtime", "open", "close", "play",
-    "generate image", "system", "content", "google search",
-    "youtube search", "reminder"
-]
+# Cache remote decisions for repeated commands. Decisions that contain
+# 'realtime' expire sooner; set DecisionCachePath to empty to keep it in memory only.
+DecisionCacheSize = int(env_vars.get("DecisionCacheSize", 256))
+DecisionCacheTTL = float(env_vars.get("DecisionCacheTTL", 24 * 60 * 60))
+RealtimeDecisionTTL = float(env_vars.get("RealtimeDecisionTTL", 60))
+DecisionCachePath = env_vars.get("DecisionCachePath", os.path.join("Data", "DecisionCache.json")) or None
+DecisionCache = TTLCache(maxsize=DecisionCacheSize, ttl=DecisionCacheTTL, path=DecisionCachePath)
+
+# How long a partial transcript must stay unchanged before its decision is
+# fetched speculatively (see SpeculateDecision).
+SpeculateAfterMs = float(env_vars.get("SpeculateAfterMs", 300))
+
+# Maximum number of times to re-ask the model when it answers with a placeholder.
+MaxDecisionAttempts = int(env_vars.get("MaxDecisionAttempts", 3))
+
+# Create a Cohere client using the provided API key.
+co = cohere.Client(api_key=CohereAPIKey, timeout=GetBackend("cohere").timeout)
 
 # Initialize an empty list to store user messages.
 messages = []
@@ -58,11 +77,8 @@ ChatHistory = [
     {"role": "Chatbot", "message": "general chat with me."}
 ]
 
-# Define the main function for decision-making on queries.
-def FirstLayerDMM(prompt: str = "test"):
-    # Add the user's query to the messages list.
-    messages.append({"role": "user", "content": f"{prompt}"})
-
+# Make one streaming Cohere request and return the raw decision text.
+def CohereDecision(prompt: str, cancel=None) -> str:
     # Create a streaming chat session with the Cohere model.
     stream = co.chat_stream(
         model='command-a-03-2025',  # Specify the Cohere model to use.
@@ -79,34 +95,134 @@ def FirstLayerDMM(prompt: str = "test"):
 
     # Iterate over events in the stream and capture text generation events.
     for event in stream:
+        if cancel is not None and cancel.cancelled:
+            break  # nobody is waiting for this answer any more
         if event.event_type == "text-generation":
             response += event.text  # Append generated text to the response.
 
-    # Remove newline characters and split responses into individual tasks.
-    response = response.replace("\n", "*")
-    response = response.split(".")
-
-    # Strip leading and trailing whitespaces from each task.
-    response = [i.strip() for i in response]
-
-    # Initialize an empty list to filter valid tasks.
-    temp = []
-
-    # Filter the tasks based on recognized function keywords.
-    for task in response:
-        for func in funcs:
-            if task.startswith(func):
-                temp.append(task)
+    return response
 
-    # Update the response with the filtered list of tasks.
-    response = temp
+# Returns the model's decisions, or None if Cohere could not be reached.
+# Raises OperationCancelled if the cancel token fires while waiting.
+def AskCohere(prompt: str, cancel=None):
+    # Add the user's query to the messages list.
+    messages.append({"role": "user", "content": f"{prompt}"})
 
-    # If '(query)' is in the response, recursively call the function for further clarification.
-    if "(query)" in response:
-        newresponse = FirstLayerDMM(prompt=prompt)
-        return newresponse
-    else:
-        return response
+    # Ask again (a bounded number of times) if the model echoes '(query)' back.
+    for attempt in range(MaxDecisionAttempts):
+        # Deadline, capped retries and circuit breaker come from the resilience layer.
+        response = ResilientCall("cohere", CohereDecision, prompt, cancel, fallback=None, cancel=cancel)
+        if response is None:
+            break
+
+        # Split the reply into individual decisions ("open facebook, open telegram,
+        # close whatsapp" is three) and keep those starting with a known function.
+        response = ParseDecisions(response)
+
+        if not any("(query)" in task for task in response):
+            return response
+
+    return None
+
+# Define the remote (Cohere) function for decision-making on queries.
+def RemoteFirstLayerDMM(prompt: str = "test"):
+    response = AskCohere(prompt)
+    if response is None:
+        # Cohere is unavailable or undecided: fall back to the preamble's default.
+        return [f"general {prompt}"]
+    return response
+
+# Build the cache key: QueryModifier's lowercasing and punctuation, then
+# drop remaining punctuation so "Open YouTube!" and "open youtube" match.
+def NormalizeQuery(prompt: str) -> str:
+    text = QueryModifier(prompt).lower()
+    text = re.sub(r"[^\w\s']", " ", text)
+    return " ".join(text.split())
+
+# Cached or Cohere decision for a query the local classifier wasn't sure about.
+def RemoteDecision(prompt: str, key: str, cancel=None):
+    cached = DecisionCache.get(key)
+    if cached is not None:
+        return list(cached)
+
+    decisions = AskCohere(prompt, cancel)
+    if decisions is None:
+        # Don't cache the fallback; the next attempt should reach Cohere again.
+        return [f"general {prompt}"]
+
+    if decisions:
+        ttl = RealtimeDecisionTTL if any("realtime" in d for d in decisions) else None
+        DecisionCache.put(key, decisions, ttl=ttl)
+    return decisions
+
+# ==============================
+# Speculative decisions
+# ==============================
+# Streaming speech backends report partial transcripts while the user is
+# still talking. Once a partial has been stable for SpeculateAfterMs (the
+# user paused), its decision is requested in the background; if the final
+# transcript turns out the same, FirstLayerDMM picks up that request instead
+# of starting a new one. One speculative request runs at a time.
+_speculation_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculate")
+_speculative = {}  # normalized query -> Future
+_speculation_lock = threading.Lock()
+_speculation_timer = None
+
+def SpeculateDecision(partial: str):
+    global _speculation_timer
+    with _speculation_lock:
+        if _speculation_timer is not None:
+            _speculation_timer.cancel()
+        _speculation_timer = threading.Timer(SpeculateAfterMs / 1000, _StartSpeculation, args=(partial,))
+        _speculation_timer.daemon = True
+        _speculation_timer.start()
+
+def _StartSpeculation(partial: str):
+    decisions, confidence = GetIntentClassifier().classify(partial)
+    if decisions and confidence >= LocalIntentThreshold:
+        return  # answered locally in microseconds anyway
+
+    key = NormalizeQuery(partial)
+    with _speculation_lock:
+        if key in _speculative or any(not f.done() for f in _speculative.values()):
+            return
+        _speculative.clear()  # finished guesses nobody asked for
+        _speculative[key] = _speculation_pool.submit(RemoteDecision, partial, key)
+
+def _TakeSpeculation(key: str, cancel=None):
+    with _speculation_lock:
+        future = _speculative.pop(key, None)
+    if future is None:
+        return None
+    while True:
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        try:
+            return list(future.result(timeout=0.1))
+        except FutureTimeout:
+            continue
+        except Exception:
+            return None  # ask again below
+
+# Define the main function: answer locally when confident, otherwise ask Cohere.
+def FirstLayerDMM(prompt: str = "test", cancel=None):
+    classifier = GetIntentClassifier()
+    decisions, confidence = classifier.classify(prompt)
+
+    if decisions and confidence >= LocalIntentThreshold:
+        classifier.record(local=True)
+        return decisions
+
+    key = NormalizeQuery(prompt)
+    cached = DecisionCache.get(key)
+    if cached is not None:
+        return list(cached)
+
+    classifier.record(local=False)
+    speculated = _TakeSpeculation(key, cancel)
+    if speculated is not None:
+        return speculated
+    return RemoteDecision(prompt, key, cancel)
 
 
 # Entry point for the script.
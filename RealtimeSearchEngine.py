@@ -1,6 +1,9 @@
-from googlesearch import search
 from groq import Groq  # Importing the Groq library to use its API.
-from json import load, dump  # Importing functions to read and write JSON files.
+from Backend.ChatHistory import GetChatHistory  # Importing the chat history store.
+from Backend.ContextWindow import GetContextWindow  # Importing the token-budgeted context builder.
+from Backend.Resilience import ResilientCall, GetBackend  # Importing deadlines, retries, circuit breaking and cancellation.
+from Backend.WebSearch import SearchMany, MergeResults  # Importing the cached, deduplicated web search.
+from Backend.Crawler import DeepSearch, DeepPassages  # Importing the page fetcher for deep mode.
 import datetime  # Importing the datetime module for real-time date and time information.
 from dotenv import dotenv_values  # Importing dotenv_values to read environment variables from a .env file.
 
@@ -13,27 +16,30 @@ Assistantname = env_vars.get("Assistantname")
 GroqAPIKey = env_vars.get("GroqAPIKey")
 
 # Initialize the Groq client with the provided API key.
-client = Groq(api_key=GroqAPIKey)
+client = Groq(api_key=GroqAPIKey, timeout=GetBackend("groq").timeout)
 
 # Define the system instructions for the chatbot.
 System = "*"
 
-# Try to load the chat log from a JSON file, or create an empty one if it doesn't exist.
-try:
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-except FileNotFoundError:
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump([], f)
-    messages = []
+# Open the chat history store (the old JSON log is migrated on first use).
+History = GetChatHistory()
+Context = GetContextWindow()
 
-# Function to perform a Google search and format the results.
+# Function to perform a Google search and format the results. Follow-up
+# questions on the same topic are answered from the search cache. Several
+# sub-queries are searched concurrently and merged into one ranked block.
 def GoogleSearch(query):
-    results = list(search(query, advanced=True, num_results=5))
-    Answer = f"The search results for '{query}' are:\n[start]\n"
+    queries = [query] if isinstance(query, str) else list(query)
+    results = MergeResults(SearchMany(queries))
+    Answer = f"The search results for '{' and '.join(queries)}' are:\n[start]\n"
 
     for i in results:
-        Answer += f"Title: {i.title}\nDescription: {i.description}\n\n"
+        Answer += f"Title: {i['title']}\nDescription: {i['description']}\n\n"
+
+    # In deep mode, add the most relevant passages from the top result pages.
+    if DeepSearch:
+        for url, passage in DeepPassages(" ".join(queries), results):
+            Answer += f"Extract ({url}): {passage}\n\n"
 
     Answer += "[end]"
     return Answer
@@ -45,12 +51,14 @@ def AnswerModifier(Answer):
     modified_answer = '\n'.join(non_empty_lines)
     return modified_answer
 
-# Predefined chatbot conversation system messages.
-SystemChatBot = [
+# Predefined chatbot conversation system messages. A tuple, and never modified:
+# every request copies it (see BuildMessages), so concurrent searches can't
+# see each other's results.
+SystemChatBot = (
     {"role": "system", "content": System},
     {"role": "user", "content": "Hi"},
-    {"role": "assistant", "content": "Hello, how can I help you?"}
-]
+    {"role": "assistant", "content": "Hello, how can I help you?"},
+)
 
 # Function to get real-time information like the current date and time.
 def Information():
@@ -71,48 +79,78 @@ def Information():
     data += f"Time: {hour} hours, {minute} minutes, {second} seconds.\n"
     return data
 
-# Function to handle real-time search and response generation.
-def RealtimeSearchEngine(prompt):
-    global SystemChatBot, messages
-
-    # Load the chat log from the JSON file.
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-
-    messages.append({"role": "user", "content": f"{prompt}"})
-
-    # Add Google search results to the system chatbot messages.
-    SystemChatBot.append({"role": "system", "content": GoogleSearch(prompt)})
-
-    # Generate a response using the Groq client.
-    completion = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=SystemChatBot + [{"role": "system", "content": Information()}] + messages,
-        temperature=0.7,
-        max_tokens=2048,
-        top_p=1,
-        stream=True,
-        stop=None
-    )
-
-    Answer = ""
-
-    # Concatenate response chunks from the streaming output.
-    for chunk in completion:
-        if chunk.choices[0].delta.content:
-            Answer += chunk.choices[0].delta.content
-
-    # Clean up the response.
-    Answer = Answer.strip().replace("</s>", "")
-    messages.append({"role": "assistant", "content": Answer})
-
-    # Save the updated chat log back to the JSON file.
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump(messages, f, indent=4)
-
-    # Remove the most recent system message from the chatbot conversation.
-    SystemChatBot.pop()
-
+# Function to build the messages for one request from fresh copies of the fixed parts.
+def BuildMessages(prompt, search_results):
+    system = [dict(message) for message in SystemChatBot]
+    system.append({"role": "system", "content": search_results})
+    system.append({"role": "system", "content": Information()})
+
+    # Fit the recent chat log (and a summary of older turns) into the token budget.
+    return Context.build(system, prompt, reply_tokens=2048)
+
+# Function to handle real-time search and stream the response as it is generated.
+# `prompt` may be a list of sub-queries, each searched separately and answered together.
+# Cancelling the token closes the stream; an interrupted reply is not saved.
+# Nothing shared is modified, so any number of these can run at once; `client`
+# swaps the Groq client and save=False keeps the turn out of the chat log.
+def RealtimeSearchEngineStream(prompt, cancel=None, client=client, save=True):
+    unregister = None
+    queries = prompt
+    if not isinstance(prompt, str):
+        prompt = " and ".join(prompt)
+
+    try:
+        # Add Google search results to the system chatbot messages.
+        messages = BuildMessages(prompt, GoogleSearch(queries))
+
+        # Generate a response using the Groq client (opening the stream is retried).
+        completion = ResilientCall(
+            "groq",
+            client.chat.completions.create,
+            model="llama-3.3-70b-versatile",
+            messages=messages,
+            temperature=0.7,
+            max_tokens=2048,
+            top_p=1,
+            stream=True,
+            stop=None,
+            cancel=cancel
+        )
+        if cancel is not None:
+            unregister = cancel.on_cancel(completion.close)
+
+        Answer = ""
+
+        # Hand each response chunk to the caller as soon as it arrives.
+        for chunk in completion:
+            if cancel is not None and cancel.cancelled:
+                return
+            if chunk.choices[0].delta.content:
+                piece = chunk.choices[0].delta.content.replace("</s>", "")
+                Answer += piece
+                yield piece
+    except Exception as e:
+        if cancel is not None and cancel.cancelled:
+            return  # interrupted by the user (or its stream was closed under it)
+        # Fallback response; the failed turn is not written to the chat log.
+        print(f"Error: {e}")
+        yield "⚠️ Something went wrong. Please try again."
+        return
+    finally:
+        if unregister:
+            unregister()
+
+    if cancel is not None and cancel.cancelled:
+        return
+
+    # Clean up the response and append the turn to the history store.
+    Answer = Answer.strip()
+    if save:
+        History.append_turn(prompt, Answer)
+
+# Function to handle real-time search and return the complete response.
+def RealtimeSearchEngine(prompt, cancel=None, client=client, save=True):
+    Answer = "".join(RealtimeSearchEngineStream(prompt, cancel, client, save)).strip()
     return AnswerModifier(Answer=Answer)
 
 # Main entry point of the program for interactive querying.
@@ -0,0 +1,324 @@
+# ==================================
+# Reminders.py
+# ==================================
+
+from dotenv import dotenv_values
+from datetime import datetime, timedelta
+from collections import deque
+import threading
+import asyncio
+import inspect
+import heapq
+import json
+import time
+import sys
+import re
+import os
+
+# ==============================
+# Load Environment Variables
+# ==============================
+env_vars = dotenv_values(".env")
+ReminderPath = env_vars.get("ReminderPath", os.path.join("Data", "Reminders.json"))
+DefaultReminderHour = int(env_vars.get("DefaultReminderHour", 9))  # when only a date is given
+
+# The scheduler sleeps until the next deadline, but never longer than this,
+# so a suspended laptop or a changed system clock is noticed within the hour.
+MaxSleepSeconds = 3600
+
+# Reminders this late (e.g. while Jarvis was off) are announced as missed.
+MissedAfterSeconds = 60
+
+# ==============================
+# Parsing
+# ==============================
+# Understands what FirstLayerDMM emits ("9:00pm 25th june business meeting",
+# "11:00pm 5th aug dancing performance") plus "june 25", "today",
+# "tomorrow" and "in 10 minutes". Whatever is left is the message.
+MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+MONTH = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+ORDINAL = r"(\d{1,2})(?:st|nd|rd|th)?"
+
+TIME_12H = re.compile(r"\b(\d{1,2})(?:[:.](\d{2}))?\s*([ap])\.?\s?m\.?(?![a-z])", re.I)
+TIME_24H = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b")
+DAY_MONTH = re.compile(rf"\b{ORDINAL}\s+(?:of\s+)?{MONTH}(?:,?\s+(\d{{4}}))?(?![a-z])", re.I)
+MONTH_DAY = re.compile(rf"\b{MONTH}\s+{ORDINAL}\b(?:,?\s+(\d{{4}}))?", re.I)
+RELATIVE = re.compile(r"\bin\s+(\d+)\s*(seconds?|secs?|minutes?|mins?|hours?|hrs?|days?)\b", re.I)
+DAY_WORD = re.compile(r"\b(today|tonight|tomorrow)\b", re.I)
+# Whole words only: "meeting", "presentation" and "attend" keep their letters.
+FILLER = re.compile(r"^(?:\s|,|\b(?:at|on|for|to|that|about|remind me|me)\b)+|(?:\s|,|\b(?:at|on|for|to)\b)+$", re.I)
+
+def ParseReminder(text: str, now: datetime | None = None) -> tuple[datetime, str]:
+    now = now or datetime.now()
+    rest = text.strip()
+    due_time = None
+    due_date = None
+
+    def cut(match):
+        nonlocal rest
+        rest = (rest[:match.start()] + " " + rest[match.end():]).strip()
+
+    match = RELATIVE.search(rest)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2).lower()
+        seconds = {"s": 1, "m": 60, "h": 3600, "d": 86400}[unit[0]]
+        cut(match)
+        return now + timedelta(seconds=amount * seconds), Tidy(rest, text)
+
+    match = TIME_12H.search(rest)
+    if match:
+        hour, minute, half = int(match.group(1)) % 12, int(match.group(2) or 0), match.group(3).lower()
+        due_time = (hour + (12 if half == "p" else 0), minute)
+        cut(match)
+    else:
+        match = TIME_24H.search(rest)
+        if match:
+            due_time = (int(match.group(1)), int(match.group(2)))
+            cut(match)
+
+    year_given = False
+    match = DAY_MONTH.search(rest) or MONTH_DAY.search(rest)
+    if match:
+        if match.re is DAY_MONTH:
+            day, month, year = match.group(1), match.group(2), match.group(3)
+        else:
+            month, day, year = match.group(1), match.group(2), match.group(3)
+        year_given = year is not None
+        try:
+            due_date = datetime(int(year or now.year), MONTHS.index(month[:3].lower()) + 1, int(day)).date()
+        except ValueError as e:
+            raise ValueError(f"Invalid date in reminder: {match.group(0)}") from e
+        cut(match)
+    else:
+        match = DAY_WORD.search(rest)
+        if match:
+            due_date = (now + timedelta(days=1 if match.group(1).lower() == "tomorrow" else 0)).date()
+            if match.group(1).lower() == "tonight" and due_time is None:
+                due_time = (21, 0)
+            cut(match)
+
+    if due_time is None and due_date is None:
+        raise ValueError(f"No time or date in reminder: {text}")
+
+    hour, minute = due_time or (DefaultReminderHour, 0)
+    due = datetime.combine(due_date or now.date(), datetime.min.time()).replace(hour=hour, minute=minute)
+
+    # Times without a date mean the next occurrence; dates without a year too.
+    if due <= now and due_date is None:
+        due += timedelta(days=1)
+    elif due <= now and not year_given and due.date() < now.date():
+        due = due.replace(year=due.year + 1)
+    return due, Tidy(rest, text)
+
+def Tidy(rest: str, original: str) -> str:
+    message = FILLER.sub("", " ".join(rest.split()))
+    return message or original.strip()
+
+def DescribeWhen(due: float) -> str:
+    moment = datetime.fromtimestamp(due)
+    clock = moment.strftime("%I:%M %p").lstrip("0").replace(":00 ", " ")
+    if moment.date() == datetime.now().date():
+        return f"at {clock} today"
+    if moment.date() == (datetime.now() + timedelta(days=1)).date():
+        return f"at {clock} tomorrow"
+    return f"at {clock} on {moment.day} {moment.strftime('%B')}"
+
+def ReminderAnnouncement(reminder: dict) -> str:
+    if time.time() - reminder["due"] > MissedAfterSeconds:
+        return f"You missed a reminder {DescribeWhen(reminder['due'])}: {reminder['message']}"
+    return f"Reminder: {reminder['message']}"
+
+# ==============================
+# Scheduler
+# ==============================
+# A min-heap of (due, id). run() sleeps on an asyncio.Event with the time
+# left until the earliest deadline as its timeout, so nothing polls: add()
+# and cancel() (from any thread) just wake it to re-check the head. Cancelled
+# reminders stay in the heap and are skipped when they reach the top.
+# Every change is written to JSON (temp file, then rename) so pending
+# reminders survive a restart.
+class ReminderScheduler:
+    def __init__(self, path: str | None = ReminderPath):
+        self.path = path
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # one writer of the temp file at a time
+        self._heap = []  # (due, id)
+        self._reminders = {}  # id -> {"id", "due", "message", "created"}
+        self._next_id = 1
+        self._loop = None
+        self._wakeup = None
+        self.fired = 0
+        self.lateness_ms = deque(maxlen=1000)  # how late the latest reminders fired, for the self-check
+        if path:
+            self._load()
+
+    def add(self, due: datetime | float, message: str) -> dict:
+        due = due.timestamp() if isinstance(due, datetime) else float(due)
+        with self._lock:
+            reminder = {"id": self._next_id, "due": due, "message": message, "created": time.time()}
+            self._next_id += 1
+            self._reminders[reminder["id"]] = reminder
+            heapq.heappush(self._heap, (due, reminder["id"]))
+        self._save()
+        self._wake()
+        return reminder
+
+    def add_from_text(self, text: str) -> dict:
+        due, message = ParseReminder(text)
+        return self.add(due, message)
+
+    def cancel(self, reminder_id: int) -> bool:
+        with self._lock:
+            removed = self._reminders.pop(reminder_id, None) is not None
+        if removed:
+            self._save()
+            self._wake()
+        return removed
+
+    def pending(self) -> list[dict]:
+        with self._lock:
+            return sorted(self._reminders.values(), key=lambda r: r["due"])
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._reminders)
+        return {"pending": pending, "fired": self.fired}
+
+    def _wake(self):
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    # Runs forever on the caller's event loop. on_due(reminder) may be a plain
+    # function or a coroutine function.
+    async def run(self, on_due):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            due_reminder = None
+            with self._lock:
+                while self._heap and self._heap[0][1] not in self._reminders:
+                    heapq.heappop(self._heap)  # cancelled
+                if self._heap:
+                    delay = self._heap[0][0] - time.time()
+                    if delay <= 0:
+                        _, reminder_id = heapq.heappop(self._heap)
+                        due_reminder = self._reminders.pop(reminder_id)
+                else:
+                    delay = None
+
+            if due_reminder is None:
+                timeout = MaxSleepSeconds if delay is None else min(delay, MaxSleepSeconds)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._save()
+            self.fired += 1
+            self.lateness_ms.append((time.time() - due_reminder["due"]) * 1000)
+            try:
+                result = on_due(due_reminder)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"⚠️ Reminder callback failed: {e}")
+
+    # add() and cancel() save from automation threads while run() saves on the
+    # loop thread. The snapshot is taken under the save lock, so the file
+    # always ends up with the newest one.
+    def _save(self):
+        if not self.path:
+            return
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with self._save_lock:
+            with self._lock:
+                reminders = sorted(self._reminders.values(), key=lambda r: r["due"])
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(reminders, f, indent=2)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                print(f"⚠️ Could not save reminders {self.path}: {e}")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                reminders = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable reminders {self.path}: {e}")
+            return
+        for reminder in reminders:
+            self._reminders[reminder["id"]] = reminder
+            heapq.heappush(self._heap, (reminder["due"], reminder["id"]))
+            self._next_id = max(self._next_id, reminder["id"] + 1)
+
+# ==============================
+# Shared Instance
+# ==============================
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def GetReminderScheduler() -> ReminderScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ReminderScheduler()
+        return _scheduler
+
+# ==============================
+# Self Check
+# ==============================
+if __name__ == "__main__":
+    now = datetime(2025, 6, 20, 18, 30)
+    EXAMPLES = [
+        ("9:00pm 25th june business meeting", "2025-06-25 21:00", "business meeting"),
+        ("11:00pm 5th aug dancing performance", "2025-08-05 23:00", "dancing performance"),
+        ("tomorrow call mom", "2025-06-21 09:00", "call mom"),
+        ("in 10 minutes take the pizza out", "2025-06-20 18:40", "take the pizza out"),
+        ("june 1st renew passport", "2026-06-01 09:00", "renew passport"),
+        ("7:15 am gym", "2025-06-21 07:15", "gym"),
+        # Filler words are only stripped as whole words.
+        ("tomorrow meeting with boss", "2025-06-21 09:00", "meeting with boss"),
+        ("9pm project presentation", "2025-06-20 21:00", "project presentation"),
+        ("10am attend standup", "2025-06-21 10:00", "attend standup"),
+        ("at 8pm to the tailor for alterations", "2025-06-20 20:00", "the tailor for alterations"),
+    ]
+    failures = 0
+    for example, expected_due, expected_message in EXAMPLES:
+        due, message = ParseReminder(example, now)
+        ok = f"{due:%Y-%m-%d %H:%M}" == expected_due and message == expected_message
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {example!r:45} -> {due:%Y-%m-%d %H:%M}  {message!r}")
+
+    # 200 reminders over ~1s: each should fire once, in order, within a few ms.
+    async def check():
+        scheduler = ReminderScheduler(path=None)
+        fired = []
+        start = time.time()
+        for i in range(200):
+            scheduler.add(start + 0.2 + (i * 37 % 200) / 250, f"r{i}")
+        scheduler.cancel(5)
+        done = asyncio.Event()
+
+        def on_due(reminder):
+            fired.append(reminder["due"])
+            if len(fired) == 199:
+                done.set()
+
+        runner = asyncio.create_task(scheduler.run(on_due))
+        await asyncio.wait_for(done.wait(), 5)
+        runner.cancel()
+        late = sorted(scheduler.lateness_ms)
+        print(f"fired {len(fired)}, in order: {fired == sorted(fired)}, "
+              f"lateness p50 {late[len(late) // 2]:.1f} ms, max {late[-1]:.1f} ms")
+
+    asyncio.run(check())
+    sys.exit(1 if failures else 0)
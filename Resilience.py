@@ -0,0 +1,366 @@
+# ==================================
+# Resilience.py
+# ==================================
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dotenv import dotenv_values
+from bisect import bisect_left
+import threading
+import random
+import time
+import sys
+
+# ==============================
+# Load Environment Variables
+# ==============================
+env_vars = dotenv_values(".env")
+
+# name -> (.env prefix, per-call deadline in seconds, retries after the first attempt, worker threads)
+BACKEND_DEFAULTS = {
+    "cohere": ("Cohere", 20.0, 2, 4),
+    "groq": ("Groq", 30.0, 2, 4),
+    "huggingface": ("HuggingFace", 60.0, 2, 4),
+    "translate": ("Translate", 5.0, 1, 4),
+    "search": ("Search", 10.0, 1, 4),
+}
+
+BreakerThreshold = int(env_vars.get("BreakerThreshold", 5))  # consecutive failures before opening
+BreakerResetTimeout = float(env_vars.get("BreakerResetTimeout", 30))  # seconds before a trial call
+RetryBaseDelay = float(env_vars.get("RetryBaseDelay", 0.5))
+RetryMaxDelay = float(env_vars.get("RetryMaxDelay", 4.0))
+
+# ==============================
+# Errors
+# ==============================
+class DeadlineExceeded(TimeoutError):
+    pass
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+class OperationCancelled(RuntimeError):
+    pass
+
+# ==============================
+# Cancellation
+# ==============================
+# Shared by everything working on one turn (decision, LLM stream, speech).
+# cancel() is safe from any thread; callbacks registered with on_cancel run
+# once, on the cancelling thread, and on_cancel returns a function that
+# unregisters the callback again.
+class CancellationToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.reason = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Cancel callback failed: {e}")
+
+    def on_cancel(self, callback):
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelled(self.reason)
+
+    # Sleeps up to `timeout` seconds; returns True as soon as it is cancelled.
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._event.wait(timeout)
+
+# ==============================
+# Latency Histogram
+# ==============================
+BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float("inf"))
+
+class LatencyHistogram:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * len(BUCKETS_MS)
+        self.total_ms = 0.0
+        self.count = 0
+
+    def observe(self, ms: float):
+        with self._lock:
+            self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+            self.total_ms += ms
+            self.count += 1
+
+    # Upper bound of the bucket holding the q-th quantile.
+    def quantile(self, q: float) -> float:
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = q * self.count
+            seen = 0
+            for bound, count in zip(BUCKETS_MS, self.counts):
+                seen += count
+                if seen >= target:
+                    return bound
+            return BUCKETS_MS[-1]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            buckets = {f"<={b:g}ms": c for b, c in zip(BUCKETS_MS, self.counts) if c}
+            count, total = self.count, self.total_ms
+        return {
+            "count": count,
+            "mean_ms": total / count if count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "buckets": buckets,
+        }
+
+# ==============================
+# Circuit Breaker
+# ==============================
+# Closed: calls go through. After `threshold` consecutive failures it opens
+# and calls fail fast. After `reset_timeout` one trial call is let through
+# (half-open); success closes it again, failure re-opens it. A trial that
+# ends without an answer either way (the turn was cancelled) is released so
+# the next call can try again.
+class CircuitBreaker:
+    def __init__(self, threshold: int = BreakerThreshold, reset_timeout: float = BreakerResetTimeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def release(self):
+        with self._lock:
+            self._trial_running = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+# ==============================
+# Backends
+# ==============================
+class Backend:
+    def __init__(self, name: str):
+        prefix, timeout, retries, workers = BACKEND_DEFAULTS.get(name, (name, 30.0, 2, 4))
+        self.name = name
+        self.timeout = float(env_vars.get(f"{prefix}Timeout", timeout))
+        self.retries = int(env_vars.get(f"{prefix}Retries", retries))
+        # Remote calls run on the backend's own pool so the caller can stop
+        # waiting at the deadline even when the client library never times
+        # out. A call that hangs keeps its thread (a running future can't be
+        # cancelled), but only this backend runs short of workers; a stuck
+        # image request can't hold up Cohere or Groq.
+        self.workers = int(env_vars.get(f"{prefix}Workers", workers))
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{name}-call")
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyHistogram()
+        self.failures = 0
+        self.fallbacks = 0
+
+    def stats(self) -> dict:
+        return {
+            "state": self.breaker.state,
+            "timeout": self.timeout,
+            "retries": self.retries,
+            "workers": self.workers,
+            "failures": self.failures,
+            "fallbacks": self.fallbacks,
+            "latency": self.latency.snapshot(),
+        }
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def GetBackend(name: str) -> Backend:
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = Backend(name)
+        return _backends[name]
+
+def BackendStats() -> dict:
+    with _backends_lock:
+        backends = dict(_backends)
+    return {name: backend.stats() for name, backend in backends.items()}
+
+# ==============================
+# Resilient Call
+# ==============================
+_MISSING = object()
+
+# future.result() that also gives up when the cancel token fires.
+def _Await(future, timeout: float, cancel: CancellationToken | None):
+    if cancel is None:
+        return future.result(timeout=timeout)
+    deadline = time.monotonic() + timeout
+    while True:
+        cancel.raise_if_cancelled()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise FutureTimeout()
+        try:
+            return future.result(timeout=min(remaining, 0.1))
+        except FutureTimeout:
+            continue
+
+# 4xx responses (other than 429) won't get better by retrying.
+def IsRetryable(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status != 429:
+        return False
+    return not isinstance(error, CircuitOpenError)
+
+# With a cancel token the caller stops waiting as soon as it is cancelled and
+# OperationCancelled is raised, even if a fallback was given. Cancellation is
+# not counted as a backend failure.
+def ResilientCall(backend_name: str, function, *args, fallback=_MISSING, timeout: float | None = None,
+                  retries: int | None = None, cancel: CancellationToken | None = None, **kwargs):
+    backend = GetBackend(backend_name)
+    timeout = backend.timeout if timeout is None else timeout
+    retries = backend.retries if retries is None else retries
+    deadline = time.monotonic() + timeout
+    error = None
+
+    for attempt in range(retries + 1):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            error = error or DeadlineExceeded(f"{backend_name}: deadline of {timeout:g}s exceeded")
+            break
+        if not backend.breaker.allow():
+            error = CircuitOpenError(f"{backend_name}: circuit open after repeated failures")
+            break
+
+        started = time.perf_counter()
+        future = backend.executor.submit(function, *args, **kwargs)
+        try:
+            result = _Await(future, remaining, cancel)
+        except OperationCancelled:
+            future.cancel()
+            backend.breaker.release()
+            raise
+        except FutureTimeout:
+            future.cancel()
+            error = DeadlineExceeded(f"{backend_name}: no response within {timeout:g}s")
+        except Exception as e:
+            error = e
+        else:
+            backend.latency.observe((time.perf_counter() - started) * 1000)
+            backend.breaker.success()
+            return result
+
+        backend.latency.observe((time.perf_counter() - started) * 1000)
+        backend.breaker.failure()
+        backend.failures += 1
+        print(f"⚠️ {backend_name} call failed (attempt {attempt + 1}/{retries + 1}): {error}")
+
+        if attempt == retries or not IsRetryable(error):
+            break
+
+        # Exponential backoff with full jitter, never sleeping past the deadline.
+        delay = random.uniform(0, min(RetryMaxDelay, RetryBaseDelay * 2 ** attempt))
+        delay = max(0.0, min(delay, deadline - time.monotonic()))
+        if cancel is None:
+            time.sleep(delay)
+        elif cancel.wait(delay):
+            cancel.raise_if_cancelled()
+
+    if fallback is not _MISSING:
+        backend.fallbacks += 1
+        return fallback() if callable(fallback) else fallback
+    raise error
+
+# ==============================
+# Self Check
+# ==============================
+# Drives one breaker through open, half-open and a cancelled trial call, and
+# checks that a backend with hung calls leaves the others their workers.
+if __name__ == "__main__":
+    backend = GetBackend("self-check")
+    backend.breaker = CircuitBreaker(threshold=1, reset_timeout=0.05)
+    checks = []
+
+    def Fail():
+        raise ConnectionError("down")
+
+    ResilientCall("self-check", Fail, fallback=None, retries=0)
+    checks.append(("opens after a failure", backend.breaker.state == "open"))
+
+    time.sleep(0.06)
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel).start()
+    try:
+        ResilientCall("self-check", time.sleep, 0.3, cancel=token, retries=0)
+        checks.append(("cancelled trial raises", False))
+    except OperationCancelled:
+        checks.append(("cancelled trial raises", True))
+    checks.append(("cancelled trial is released", backend.breaker.allow()))
+    backend.breaker.success()
+    checks.append(("trial success closes it", backend.breaker.state == "closed"))
+
+    # Hung calls fill one backend's pool; another backend still answers at once.
+    hung = GetBackend("self-check-hung")
+    for _ in range(hung.workers * 2):
+        ResilientCall("self-check-hung", time.sleep, 0.5, fallback=None, timeout=0.05, retries=0)
+    started = time.perf_counter()
+    answer = ResilientCall("self-check", lambda: "ok", timeout=0.2, retries=0)
+    checks.append(("hung backend leaves others free", answer == "ok" and time.perf_counter() - started < 0.1))
+
+    for name, passed in checks:
+        print(f"{'ok  ' if passed else 'FAIL'} {name}")
+    print(BackendStats()["self-check"])
+    sys.exit(0 if all(passed for _, passed in checks) else 1)
@@ -1,77 +1,289 @@
 from dotenv import dotenv_values
+from collections import deque
+from array import array
+import threading
+import json
+import math
+import time
+import sys
+import re
 import os
-import mtranslate as mt
 import speech_recognition as sr
-from langdetect import detect, DetectorFactory
-
-# Fix random results from langdetect
-DetectorFactory.seed = 0
-
-# ---------------- Font Fix ----------------
-import matplotlib
-matplotlib.rcParams['font.family'] = 'Noto Sans Devanagari'  # Or "Mangal" if installed
+from Backend.Language import DetectLanguage, Translate
+from Backend.TextUtils import QueryModifier
 
 # Load environment variables from the .env file.
 env_vars = dotenv_values(".env")
 
-# Get the current working directory.
-current_dir = os.getcwd()
-
-# Define the path for temporary files.
-TempDirPath = rf"{current_dir}/frontend/Files"
-os.makedirs(TempDirPath, exist_ok=True)
-
-# Function to set assistant's status by writing it to a file.
-def SetAssistantStatus(Status):
-    with open(rf'{TempDirPath}/Status.data', "w", encoding='utf-8') as file:
-        file.write(Status)
-
-# Function to modify a query to ensure proper punctuation and formatting.
-def QueryModifier(Query: str) -> str:
-    new_query = Query.lower().strip()
-    query_words = new_query.split()
-    question_words = [
-        "how", "what", "who", "where", "when", "why", "which", "whose", "whom",
-        "can you", "what's", "where's", "how's"
-    ]
-    
-    if query_words:
-        if any(new_query.startswith(word) for word in question_words):
-            if query_words[-1][-1] in ['.', '?', '!']:
-                new_query = new_query[:-1] + "?"
-            else:
-                new_query += "?"
-        else:
-            if query_words[-1][-1] in ['.', '?', '!']:
-                new_query = new_query[:-1] + "."
-            else:
-                new_query += "."
-    return new_query.capitalize()
+# Barge-in voice-activity detection (see BargeInMonitor). A frame counts as
+# speech when its energy is BargeInRatio times the running noise floor (and at
+# least BargeInMinEnergy); BargeInMinSpeechMs of speech triggers the barge-in.
+# The floor is learned from the loudest of the first BargeInSeedMs of frames,
+# and learned again whenever playback starts or stops.
+BargeInRatio = float(env_vars.get("BargeInRatio", 3.0))
+BargeInMinEnergy = float(env_vars.get("BargeInMinEnergy", 300))
+BargeInMinSpeechMs = float(env_vars.get("BargeInMinSpeechMs", 250))
+BargeInSilenceMs = float(env_vars.get("BargeInSilenceMs", 800))
+BargeInMaxSeconds = float(env_vars.get("BargeInMaxSeconds", 15))
+BargeInSeedMs = float(env_vars.get("BargeInSeedMs", 300))
+
+# Speech recognition backend: "google" (online) or "vosk" (offline, streaming).
+SpeechBackend = env_vars.get("SpeechBackend", "google").strip().lower()
+VoskModelPath = env_vars.get("VoskModelPath", os.path.join("Data", "vosk-model-small-en-us-0.15"))
+SpeechMaxSeconds = float(env_vars.get("SpeechMaxSeconds", 15))  # longest single utterance
+STTFixturesPath = os.path.join("Data", "STTFixtures")
 
-# Universal translator using mtranslate
+# Universal translator (cached, see Language.py)
 def UniversalTranslator(Text: str, target_lang="en") -> str:
-    translated = mt.translate(Text, target_lang, "auto")
+    translated = Translate(Text, target_lang)
     return translated.capitalize()
 
-# Speech recognition with automatic language detection
-def recognize_speech() -> str:
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        SetAssistantStatus("Listening...")
-        print(" 🎤 Speak now...")
-        audio = recognizer.listen(source)
+# RMS energy of a frame of signed 16-bit little-endian PCM.
+def FrameEnergy(frame: bytes) -> float:
+    samples = array("h", frame[:len(frame) - len(frame) % 2])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+# Listens on the microphone while the assistant is busy (thinking or
+# speaking). When sustained speech is detected it calls on_speech() once,
+# which is where the caller cancels the current turn, then keeps recording
+# until the user pauses. stop() returns that recording as sr.AudioData (or
+# None if nobody spoke), so the interrupting words are not lost while the
+# regular listener is reopened.
+#
+# A floor learned while the room was quiet ("Thinking ...") would let the
+# assistant's own voice from the speakers trigger a barge-in as soon as the
+# reply starts playing. So whenever is_playing() changes, the floor is
+# learned again from the frames that follow: while the reply plays, the user
+# has to talk over it, not merely over the silence before it.
+class BargeInMonitor:
+    def __init__(self, on_speech=None, is_playing=None):
+        self.on_speech = on_speech
+        self.is_playing = is_playing or (lambda: False)
+        self.triggered = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._audio = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self._audio
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        try:
+            with sr.Microphone() as source:
+                self._listen(source)
+        except Exception as e:
+            print(f"Barge-in monitor stopped: {e}")
+
+    def _listen(self, source):
+        frame_ms = 1000 * source.CHUNK / source.SAMPLE_RATE
+        needed = max(1, int(BargeInMinSpeechMs / frame_ms))
+        silence_limit = max(1, int(BargeInSilenceMs / frame_ms))
+        max_frames = int(BargeInMaxSeconds * 1000 / frame_ms)
+        seed_frames = max(1, int(BargeInSeedMs / frame_ms))
+
+        # Keep a little audio from before the trigger so the first syllable survives.
+        preroll = deque(maxlen=needed + int(300 / frame_ms))
+        noise = None
+        seed = []
+        playing = None
+        voiced = 0
+
+        while not self._stop.is_set():
+            frame = source.stream.read(source.CHUNK)
+            energy = FrameEnergy(frame)
+            preroll.append(frame)
+
+            now_playing = bool(self.is_playing())
+            if now_playing != playing:
+                playing = now_playing
+                noise, seed, voiced = None, [], 0
+            if noise is None:
+                seed.append(energy)
+                if len(seed) >= seed_frames:
+                    noise = max(seed)
+                continue
+
+            if energy > max(BargeInMinEnergy, noise * BargeInRatio):
+                voiced += 1
+                if voiced >= needed:
+                    break
+            else:
+                voiced = 0
+                noise = 0.95 * noise + 0.05 * energy
+        else:
+            return
+
+        self.triggered.set()
+        print(" ✋ Barge-in detected")
+        if self.on_speech:
+            try:
+                self.on_speech()
+            except Exception as e:
+                print(f"Barge-in callback failed: {e}")
+
+        # Record the interruption until the user pauses (stop() waits for this).
+        frames = list(preroll)
+        quiet = 0
+        while quiet < silence_limit and len(frames) < max_frames:
+            frame = source.stream.read(source.CHUNK)
+            frames.append(frame)
+            quiet = quiet + 1 if FrameEnergy(frame) <= max(BargeInMinEnergy, noise * BargeInRatio) else 0
+
+        self._audio = sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+# ------------------------------
+# Speech recognition backends
+# ------------------------------
+# A backend turns microphone audio into text:
+#   listen(source, on_partial) -> text   records one utterance from an open
+#                                         sr.Microphone and transcribes it
+#   transcribe(audio, on_partial) -> text transcribes recorded sr.AudioData
+# Streaming backends call on_partial(text) with the words recognized so far
+# while the user is still talking. Pick one with SpeechBackend in .env.
+
+class GoogleSpeechBackend:
+    name = "google"
+    sample_rate = None  # the microphone's default
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def listen(self, source, on_partial=None) -> str:
+        return self.transcribe(self.recognizer.listen(source))
+
+    # Sends the whole utterance once it is over (needs the network).
+    def transcribe(self, audio, on_partial=None) -> str:
+        return self.recognizer.recognize_google(audio, language="en-US")
+
+# Vosk models take a while to load and are shared (speech backend, wake word).
+_vosk_models = {}
+_vosk_models_lock = threading.Lock()
+
+def GetVoskModel(model_path: str = VoskModelPath):
+    import vosk  # optional dependency, only needed for offline recognition
+    with _vosk_models_lock:
+        if model_path not in _vosk_models:
+            vosk.SetLogLevel(-1)
+            _vosk_models[model_path] = vosk.Model(model_path)
+        return _vosk_models[model_path]
+
+# Offline, streaming recognition with Vosk (Kaldi) on the CPU. Download a model
+# from https://alphacephei.com/vosk/models and point VoskModelPath at it.
+class VoskSpeechBackend:
+    name = "vosk"
+    sample_rate = 16000
+    CHUNK_BYTES = 4000  # 125 ms of 16 kHz 16-bit audio
+
+    def __init__(self, model_path: str = VoskModelPath):
+        import vosk
+        self._vosk = vosk
+        self.model = GetVoskModel(model_path)
+
+    def _recognizer(self, sample_rate):
+        return self._vosk.KaldiRecognizer(self.model, sample_rate)
+
+    # Vosk marks the end of an utterance itself (a short silence), so the
+    # final text is ready as soon as the user stops talking.
+    def listen(self, source, on_partial=None) -> str:
+        recognizer = self._recognizer(source.SAMPLE_RATE)
+        last = ""
+        speech_started = None
+        while True:
+            frame = source.stream.read(source.CHUNK)
+            if recognizer.AcceptWaveform(frame):
+                text = json.loads(recognizer.Result()).get("text", "")
+                if text:
+                    return text
+                last, speech_started = "", None
+                continue
+
+            partial = json.loads(recognizer.PartialResult()).get("partial", "")
+            if partial and partial != last:
+                last = partial
+                speech_started = speech_started or time.monotonic()
+                if on_partial:
+                    on_partial(partial)
+            if speech_started and time.monotonic() - speech_started > SpeechMaxSeconds:
+                return json.loads(recognizer.FinalResult()).get("text", "")
+
+    def transcribe(self, audio, on_partial=None) -> str:
+        recognizer = self._recognizer(self.sample_rate)
+        data = audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2)
+        texts = []
+        last = ""
+        for start in range(0, len(data), self.CHUNK_BYTES):
+            if recognizer.AcceptWaveform(data[start:start + self.CHUNK_BYTES]):
+                texts.append(json.loads(recognizer.Result()).get("text", ""))
+            elif on_partial:
+                partial = json.loads(recognizer.PartialResult()).get("partial", "")
+                if partial and partial != last:
+                    last = partial
+                    on_partial(" ".join(texts + [partial]).strip())
+        texts.append(json.loads(recognizer.FinalResult()).get("text", ""))
+        return " ".join(t for t in texts if t)
+
+SPEECH_BACKENDS = {
+    "google": GoogleSpeechBackend,
+    "vosk": VoskSpeechBackend,
+}
+
+_speech_backend = None
+_speech_backend_lock = threading.Lock()
+
+def GetSpeechBackend():
+    global _speech_backend
+    with _speech_backend_lock:
+        if _speech_backend is None:
+            _speech_backend = SPEECH_BACKENDS.get(SpeechBackend, GoogleSpeechBackend)()
+        return _speech_backend
+
+# Speech recognition with automatic language detection. Pass `audio` to
+# transcribe something already recorded (e.g. by BargeInMonitor);
+# on_partial(text) receives interim transcripts from streaming backends.
+# on_status(text) reports progress; Main passes the state bus setter, and
+# without one nothing is reported.
+def recognize_speech(on_status=None, audio=None, on_partial=None) -> str:
+    on_status = on_status or (lambda status: None)
+    backend = GetSpeechBackend()
 
     try:
         # Step 1: Recognize raw text in default language (let’s use English model)
-        Text = recognizer.recognize_google(audio, language="en-US")
+        if audio is None:
+            with sr.Microphone(sample_rate=backend.sample_rate) as source:
+                on_status("Listening...")
+                print(" 🎤 Speak now...")
+                Text = backend.listen(source, on_partial)
+        else:
+            Text = backend.transcribe(audio, on_partial)
+
+        if not Text.strip():
+            return ""  # no speech detected
 
         # Step 2: Detect the real language
-        detected_lang = detect(Text)
+        detected_lang = DetectLanguage(Text)
         print(f" 🌍 Detected language: {detected_lang}")
 
         # Step 3: If not English, translate to English
         if detected_lang != "en":
-            SetAssistantStatus("Translating...")
+            on_status("Translating...")
             Text = UniversalTranslator(Text, "en")
 
         return QueryModifier(Text)  # Always clean output
@@ -81,19 +293,108 @@ def recognize_speech() -> str:
     except sr.RequestError:
         return "Could not request results from speech service."
 
+# ------------------------------
+# Benchmark
+# ------------------------------
+# Word error rate and latency over a folder of recordings: every <name>.wav
+# (16-bit PCM) needs a <name>.txt with the reference transcript.
+#   python SpeechToText.py --benchmark [folder] [--backends google,vosk]
+def NormalizeTranscript(text: str) -> list[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+# Word-level Levenshtein distance divided by the reference length.
+def WordErrorRate(reference: str, hypothesis: str) -> float:
+    ref, hyp = NormalizeTranscript(reference), NormalizeTranscript(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / max(len(ref), 1)
+
+def LoadFixtures(folder: str) -> list:
+    fixtures = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(".wav"):
+            continue
+        transcript_path = os.path.join(folder, name[:-4] + ".txt")
+        if not os.path.exists(transcript_path):
+            continue
+        with sr.AudioFile(os.path.join(folder, name)) as source:
+            audio = sr.Recognizer().record(source)
+        with open(transcript_path, "r", encoding="utf-8") as f:
+            fixtures.append((name, audio, f.read().strip()))
+    return fixtures
+
+def Benchmark(folder: str = STTFixturesPath, backends=("google", "vosk")):
+    fixtures = LoadFixtures(folder)
+    if not fixtures:
+        print(f"No fixtures in {folder} (expected <name>.wav + <name>.txt pairs).")
+        return {}
+
+    results = {}
+    for backend_name in backends:
+        try:
+            backend = SPEECH_BACKENDS[backend_name]()
+        except Exception as e:
+            print(f"{backend_name}: unavailable ({e})")
+            continue
+
+        errors, latencies, first_partials, audio_seconds = [], [], [], 0.0
+        for name, audio, reference in fixtures:
+            partial_times = []
+            started = time.perf_counter()
+            try:
+                hypothesis = backend.transcribe(audio, on_partial=lambda _: partial_times.append(time.perf_counter()))
+            except (sr.UnknownValueError, sr.RequestError):
+                hypothesis = ""
+            latencies.append(time.perf_counter() - started)
+            if partial_times:
+                first_partials.append(partial_times[0] - started)
+            errors.append(WordErrorRate(reference, hypothesis))
+            audio_seconds += len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+
+        latencies.sort()
+        results[backend_name] = {
+            "files": len(fixtures),
+            "wer": sum(errors) / len(errors),
+            "latency_p50": latencies[len(latencies) // 2],
+            "latency_max": latencies[-1],
+            "real_time_factor": sum(latencies) / audio_seconds if audio_seconds else 0.0,
+            "first_partial": sum(first_partials) / len(first_partials) if first_partials else None,
+        }
+        stats = results[backend_name]
+        first = f"{stats['first_partial'] * 1000:.0f} ms" if stats["first_partial"] is not None else "n/a"
+        print(f"{backend_name:8} WER {stats['wer']:.1%}  latency p50 {stats['latency_p50'] * 1000:.0f} ms "
+              f"(max {stats['latency_max'] * 1000:.0f} ms)  RTF {stats['real_time_factor']:.2f}  "
+              f"first partial {first}")
+    return results
+
 # ------------------------------
 # Main execution block
 # ------------------------------
 if __name__ == "__main__":
+    from Backend.WakeWord import WaitForWakeWord
+
+    if "--benchmark" in sys.argv:
+        args = sys.argv[sys.argv.index("--benchmark") + 1:]
+        names = ("google", "vosk")
+        if "--backends" in args:
+            index = args.index("--backends")
+            names = tuple(args[index + 1].split(","))
+            del args[index:index + 2]
+        Benchmark(args[0] if args else STTFixturesPath, names)
+        sys.exit(0)
+
     while True:
-        Query = recognize_speech()
+        # Idle on the local wake-word detector; only then run full recognition.
+        print(" (Idle mode) Waiting for wake word 'Jarvis'...")
+        WaitForWakeWord()
+        Query = recognize_speech(on_partial=lambda text: print(f" … {text}", end="\r"))
 
         if not Query.strip():
             continue  
 
-        if "jarvis" not in Query.lower():
-            print(" (Idle mode) Waiting for wake word 'Jarvis'...")
-            continue  
-
         os.system("cls" if os.name == "nt" else "clear")
         print(" ✅ Recognized:", Query)
@@ -0,0 +1,78 @@
+# ==================================
+# StressRealtimeSearch.py
+# ==================================
+# Runs many realtime queries at once against a stand-in LLM client and stub
+# search provider, and checks that no answer saw another query's results.
+#   python -m Backend.StressRealtimeSearch [N]
+
+from Backend.RealtimeSearchEngine import RealtimeSearchEngine, SystemChatBot
+from Backend.WebSearch import SetSearchProvider, SetSearchCache, StubSearchProvider, SearchCache
+from types import SimpleNamespace
+import asyncio
+import random
+import time
+import sys
+import re
+
+# A stand-in for the Groq client that streams back which search results and
+# question it was given, pausing between chunks so concurrent calls interleave.
+class EchoClient:
+    def __init__(self, delay=0.002):
+        self.delay = delay
+        self.chat = self
+        self.completions = self
+
+    def create(self, messages, stream=True, **kwargs):
+        searched = [m["content"].split("\n", 1)[0] for m in messages if m["content"].startswith("The search results")]
+        reply = f"{' | '.join(searched)} || asked: {messages[-1]['content']}"
+        return EchoStream(reply.split(" "), self.delay)
+
+class EchoStream:
+    def __init__(self, words, delay):
+        self.words = words
+        self.delay = delay
+        self.closed = False
+
+    def __iter__(self):
+        for word in self.words:
+            if self.closed:
+                return
+            time.sleep(random.uniform(0, self.delay))
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word + " "))])
+
+    def close(self):
+        self.closed = True
+
+# Function to run many realtime queries at once from an event loop (as the
+# orchestrator in Main.py does) and check that every answer saw only its own
+# question and search results.
+def StressTest(n=200):
+    SetSearchProvider(StubSearchProvider(delay=0.01))
+    SetSearchCache(SearchCache(path=None))
+    echo = EchoClient()
+    before = [dict(message) for message in SystemChatBot]
+    queries = [f"population of city{i}" for i in range(n)]
+
+    async def RunAll():
+        return await asyncio.gather(*(
+            asyncio.to_thread(RealtimeSearchEngine, query, None, echo, False) for query in queries
+        ))
+
+    started = time.perf_counter()
+    answers = asyncio.run(RunAll())
+    elapsed = time.perf_counter() - started
+
+    leaked = []
+    for i, answer in enumerate(answers):
+        seen = set(re.findall(r"city\d+", answer))
+        if seen != {f"city{i}"}:
+            leaked.append((queries[i], sorted(seen)))
+    unchanged = before == list(SystemChatBot)
+    print(f"{n} concurrent queries in {elapsed:.2f}s: {n - len(leaked)} isolated, {len(leaked)} mixed up, "
+          f"shared messages {'unchanged' if unchanged else 'MODIFIED'}")
+    for query, seen in leaked[:10]:
+        print(f"  {query!r} saw {seen}")
+    return not leaked and unchanged
+
+if __name__ == "__main__":
+    sys.exit(0 if StressTest(int(sys.argv[1]) if len(sys.argv) > 1 else 200) else 1)
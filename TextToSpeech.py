@@ -3,11 +3,14 @@ import asyncio  # for asynchronous operations
 import edge_tts  # for text-to-speech functionality
 import os  # for file path handling
 import re  # for regex to remove emojis
+import io  # for playing audio straight from memory
+import time  # for latency metrics
+import queue  # for handing audio from the synthesis thread to playback
+import threading  # for synthesizing while earlier sentences play
+from collections import deque
 from dotenv import dotenv_values
-from langdetect import detect, DetectorFactory
-
-# Fix random results from langdetect
-DetectorFactory.seed = 0
+from Backend.Language import DetectLanguage
+from Backend.ArtifactStore import ArtifactStore, ArtifactKey
 
 # Load environment variables from a .env file
 env_vars = dotenv_values(".env")
@@ -75,11 +78,47 @@ LANGUAGE_CODE_NORMALIZER = {
 
 # Default fallback voice
 DEFAULT_VOICE = env_vars.get("AssistantVoice", "en-CA-LiamNeural")
+VOICE_PITCH = '+5Hz'
+VOICE_RATE = '+13%'
+
+# ✅ On-disk audio cache: repeated phrases play without a network round-trip
+AUDIO_CACHE_DIR = os.path.join("Data", "AudioCache")
+AudioCacheMB = float(env_vars.get("AudioCacheMB", 64))
+AudioCacheMaxChars = int(env_vars.get("AudioCacheMaxChars", 300))  # longer texts are rarely repeated
+
+# Phrases synthesized in the background at startup ("|"-separated in .env).
+DEFAULT_PREWARM_PHRASES = [
+    "Your image has been generated successfully.",
+    "Opening youtube", "Opening google", "Opening chrome",
+    "Something went wrong. Please try again.",
+]
+PrewarmPhrases = [p.strip() for p in env_vars.get("PrewarmPhrases", "").split("|") if p.strip()]
+
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+def GetAudioCache() -> ArtifactStore:
+    global _audio_cache
+    with _audio_cache_lock:
+        if _audio_cache is None:
+            _audio_cache = ArtifactStore(AUDIO_CACHE_DIR, max_bytes=int(AudioCacheMB * 1024 * 1024))
+        return _audio_cache
+
+def AudioCacheKey(text: str, voice: str, pitch: str = VOICE_PITCH, rate: str = VOICE_RATE) -> str:
+    normalized = " ".join(text.lower().split())
+    return ArtifactKey(f"edge-tts:{voice}", normalized, {"pitch": pitch, "rate": rate})
+
+def AudioCacheStats() -> dict:
+    return GetAudioCache().stats()
 
 # ✅ Create global event loop
 loop = asyncio.new_event_loop()
 asyncio.set_event_loop(loop)
 
+# ✅ One utterance at a time: replies and background notifications (e.g. a
+# finished image) may ask to speak from different threads.
+SpeechLock = threading.RLock()
+
 
 # ✅ Helper function to remove emojis
 def remove_emojis(text: str) -> str:
@@ -97,83 +136,362 @@ def remove_emojis(text: str) -> str:
     return emoji_pattern.sub(r"", text)
 
 
-# ✅ Faster: Stream audio instead of saving first
-async def TextToAudioFile(text: str, lang_code: str) -> str:
-    file_path = r"Data/speech.mp3"
+# ✅ Pick the Edge TTS voice for a piece of text
+def VoiceFor(text: str) -> str:
+    detected = DetectLanguage(text)
+    lang_code = LANGUAGE_CODE_NORMALIZER.get(detected, "en-US")
+    return LANGUAGE_VOICE_MAP.get(lang_code, DEFAULT_VOICE)
 
-    if os.path.exists(file_path):
-        try:
-            os.remove(file_path)
-        except:
-            pass
 
-    voice = LANGUAGE_VOICE_MAP.get(lang_code, DEFAULT_VOICE)
+# ✅ Synthesize straight into memory (served from the audio cache when possible)
+async def TextToAudioBytes(text: str, voice: str) -> bytes:
+    cache = GetAudioCache()
+    key = AudioCacheKey(text, voice)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
 
-    communicate = edge_tts.Communicate(text, voice, pitch='+5Hz', rate='+13%')
+    communicate = edge_tts.Communicate(text, voice, pitch=VOICE_PITCH, rate=VOICE_RATE)
+    audio = bytearray()
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
 
-    # Stream and save quickly
-    with open(file_path, "wb") as f:
-        async for chunk in communicate.stream():
-            if chunk["type"] == "audio":
-                f.write(chunk["data"])
+    if audio and len(text) <= AudioCacheMaxChars:
+        cache.put(key, bytes(audio), ".mp3", model=voice, prompt=text)
+    return bytes(audio)
 
-    return file_path
 
+# ✅ Synthesize fixed phrases ahead of time (run in a background thread)
+def PrewarmAudioCache(extra_phrases=()):
+    phrases = (PrewarmPhrases or DEFAULT_PREWARM_PHRASES) + list(extra_phrases)
+    cache = GetAudioCache()
+    warm_loop = asyncio.new_event_loop()
+    warmed = 0
+    try:
+        for phrase in phrases:
+            clean_text = remove_emojis(phrase).strip()
+            if not clean_text:
+                continue
+            voice = VoiceFor(clean_text)
+            if AudioCacheKey(clean_text, voice) in cache:
+                continue
+            try:
+                warm_loop.run_until_complete(TextToAudioBytes(clean_text, voice))
+                warmed += 1
+            except Exception as e:
+                print(f"Error pre-warming '{clean_text}': {e}")
+    finally:
+        warm_loop.close()
+    print(f"🔊 Audio cache ready ({warmed} new phrases, {cache.stats()['entries']} cached)")
+
+
+# -------------------------------
+# Playback engine
+# -------------------------------
 
-def TTS(text, func=lambda r=None: True):
+# Default playback callback: never asks to stop.
+def KeepPlaying(r=None):
+    return True
+
+
+class Clip:
+    def __init__(self, sound):
+        self.sound = sound
+        self.length = sound.get_length()
+        self.done = threading.Event()
+        self.interrupted = False
+
+
+# ✅ Keeps the mixer open for the whole session and plays decoded clips from
+# memory on one channel. The next clip is handed to Channel.queue() while the
+# current one plays, so sentences follow each other without a gap. The
+# playback thread sleeps until a clip ends or something changes; stop()
+# interrupts immediately.
+class AudioPlayer:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._generation = 0  # bumped by stop()
+        self._channel = None
+        self._thread = None
+
+    def _ensure_started(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            self._channel = pygame.mixer.Channel(0)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    # Decode on the caller's thread so playback never waits for it.
+    def enqueue(self, audio) -> Clip:
+        self._ensure_started()
+        source = io.BytesIO(audio) if isinstance(audio, (bytes, bytearray)) else audio
+        clip = Clip(pygame.mixer.Sound(file=source))
+        with self._cond:
+            self._pending.append(clip)
+            self._cond.notify_all()
+        return clip
+
+    # Blocks until the clip finishes. Returns False if it was interrupted,
+    # either by stop() or because func() returned False.
+    def wait(self, clip: Clip, func=KeepPlaying) -> bool:
+        if func is KeepPlaying:
+            clip.done.wait()
+        else:
+            while not clip.done.wait(0.1):
+                if func() is False:
+                    self.stop()
+                    break
+        return not clip.interrupted
+
+    def play(self, audio, func=KeepPlaying) -> bool:
+        return self.wait(self.enqueue(audio), func)
+
+    def stop(self):
+        with self._cond:
+            self._generation += 1
+            for clip in self._pending:
+                clip.interrupted = True
+                clip.done.set()
+            self._pending.clear()
+            if self._channel is not None:
+                self._channel.stop()
+            self._cond.notify_all()
+
+    def is_busy(self) -> bool:
+        with self._cond:
+            return bool(self._pending) or (self._channel is not None and self._channel.get_busy())
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                current = self._pending.popleft()
+                generation = self._generation
+                self._channel.play(current.sound)
+            end = time.monotonic() + current.length
+            queued = None
+
+            while current is not None:
+                with self._cond:
+                    stopped = self._generation != generation
+                    if not stopped and queued is None and self._pending:
+                        queued = self._pending.popleft()
+                        self._channel.queue(queued.sound)  # ✅ gapless hand-over
+                    remaining = end - time.monotonic()
+                    if not stopped and remaining > 0:
+                        self._cond.wait(remaining)
+                        continue
+
+                if stopped:
+                    for clip in (current, queued):
+                        if clip:
+                            clip.interrupted = True
+                            clip.done.set()
+                    break
+
+                current.done.set()
+                current, queued = queued, None
+                if current:
+                    end += current.length
+
+
+Player = AudioPlayer()
+
+
+# A cancel token (see Resilience.CancellationToken) stops playback the moment
+# it fires, e.g. when the user starts talking over the reply.
+def TTS(text, func=KeepPlaying, cancel=None):
+    unregister = cancel.on_cancel(Player.stop) if cancel is not None else None
     try:
         # ✅ Remove emojis before speaking
         clean_text = remove_emojis(text)
 
-        # Detect language quickly
+        # Detect language quickly and pick the matching voice
+        voice = VoiceFor(clean_text)
+
+        # Generate audio in memory (or take it from the cache)
+        audio = loop.run_until_complete(TextToAudioBytes(clean_text, voice))
+        if cancel is not None and cancel.cancelled:
+            return False
+
+        # Play immediately on the already-open audio device
+        clip = Player.enqueue(audio)
+        if cancel is not None and cancel.cancelled:
+            Player.stop()  # cancelled while the clip was being queued
+        return Player.wait(clip, func)
+
+    except Exception as e:
+        print(f"Error in TTS: {e}")
+        return False
+
+    finally:
+        if unregister:
+            unregister()
         try:
-            detected = detect(clean_text)
-        except:
-            detected = "en"
+            func(False)
+        except Exception as e:
+            print(f"Error in finally block: {e}")
 
-        # Normalize language
-        lang_code = LANGUAGE_CODE_NORMALIZER.get(detected, "en-US")
 
-        # Generate & save audio faster (streaming)
-        file_path = loop.run_until_complete(TextToAudioFile(clean_text, lang_code))
+def TextToSpeech(text, func=KeepPlaying, cancel=None):
+    words = text.split()
+    
+    with SpeechLock:
+        if len(words) > 200:  # ✅ Speak only 200 words
+            speak_part = " ".join(words[:200]) + ". The rest is on the screen."
+            print(text)  # Full response still shown
+            TTS(speak_part, func, cancel)
+        else:
+            TTS(text, func, cancel)
 
-        # Play immediately
-        if not pygame.mixer.get_init():
-            pygame.mixer.init()
 
-        pygame.mixer.music.load(file_path)
-        pygame.mixer.music.play()
+# -------------------------------
+# Streaming text-to-speech
+# -------------------------------
 
-        while pygame.mixer.music.get_busy():
-            if func() is False:
+# A sentence ends at ., !, ? or the Devanagari danda followed by whitespace.
+SENTENCE_END = re.compile(r"[.!?।]+[\"')\]]*\s")
+
+# Very short fragments ("Mr.", "1.") are merged into the next sentence.
+MIN_SENTENCE_CHARS = 12
+
+# Only the first 200 words are spoken, as in TextToSpeech().
+MAX_SPOKEN_WORDS = 200
+
+# ✅ Time-to-first-audio of recent streamed replies, in seconds
+TimeToFirstAudio = deque(maxlen=100)
+
+
+def TimeToFirstAudioStats() -> dict:
+    samples = sorted(TimeToFirstAudio)
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "last": TimeToFirstAudio[-1],
+        "mean": sum(samples) / len(samples),
+        "p50": samples[len(samples) // 2],
+        "max": samples[-1],
+    }
+
+
+def SplitSentences(chunks):
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        start = 0
+        for match in SENTENCE_END.finditer(buffer):
+            if match.end() - start >= MIN_SENTENCE_CHARS:
+                yield buffer[start:match.end()].strip()
+                start = match.end()
+        buffer = buffer[start:]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def StreamingTextToSpeech(chunks, func=KeepPlaying, on_text=None, cancel=None) -> str:
+    started = time.perf_counter()
+    clips = queue.Queue()
+    received = []
+    halt = threading.Event()
+
+    def interrupt():
+        halt.set()
+        Player.stop()
+
+    def tee():
+        for chunk in chunks:
+            received.append(chunk)
+            yield chunk
+
+    # Runs on a worker thread: reads the LLM stream, cuts it into sentences
+    # and synthesizes each one while earlier sentences are already playing.
+    def synthesize():
+        synth_loop = asyncio.new_event_loop()
+        voice = None
+        words = 0
+        try:
+            for sentence in SplitSentences(tee()):
+                if on_text:
+                    on_text("".join(received))
+
+                if halt.is_set() or words >= MAX_SPOKEN_WORDS:
+                    continue  # keep reading so the full answer reaches the screen
+                words += len(sentence.split())
+                if words >= MAX_SPOKEN_WORDS:
+                    sentence += " The rest is on the screen."
+
+                clean_text = remove_emojis(sentence).strip()
+                if not clean_text:
+                    continue
+
+                if voice is None:
+                    voice = VoiceFor(clean_text)
+
+                try:
+                    clips.put(synth_loop.run_until_complete(TextToAudioBytes(clean_text, voice)))
+                except Exception as e:
+                    print(f"Error in TTS: {e}")
+        finally:
+            synth_loop.close()
+            clips.put(None)
+
+    threading.Thread(target=synthesize, daemon=True).start()
+
+    first = True
+    stopped = False
+    last = None
+    SpeechLock.acquire()
+    unregister = cancel.on_cancel(interrupt) if cancel is not None else None
+    try:
+        while True:
+            try:
+                audio = clips.get(timeout=None if func is KeepPlaying and cancel is None else 0.1)
+            except queue.Empty:
+                audio = b""
+            if audio is None:
                 break
-            pygame.time.Clock().tick(10)
 
-        return True
+            if not stopped and func is not KeepPlaying and func() is False:
+                stopped = True
+                interrupt()
+            if cancel is not None and cancel.cancelled:
+                stopped = True
+            if stopped or not audio:
+                continue  # drain so the worker can finish
+
+            if first:
+                TimeToFirstAudio.append(time.perf_counter() - started)
+                print(f"⏱️ Time to first audio: {TimeToFirstAudio[-1]:.2f}s")
+                first = False
+
+            # ✅ Queued behind the previous sentence, played back to back
+            last = Player.enqueue(audio)
+            if cancel is not None and cancel.cancelled:
+                interrupt()  # cancelled while this clip was being queued
+
+        if last is not None and not stopped:
+            Player.wait(last, func)
 
     except Exception as e:
         print(f"Error in TTS: {e}")
-        return False
 
     finally:
+        if unregister:
+            unregister()
         try:
             func(False)
-            if pygame.mixer.get_init():
-                pygame.mixer.music.stop()
-                pygame.mixer.quit()
         except Exception as e:
             print(f"Error in finally block: {e}")
+        SpeechLock.release()
 
-
-def TextToSpeech(text, func=lambda r=None: True):
-    words = text.split()
-    
-    if len(words) > 200:  # ✅ Speak only 200 words
-        speak_part = " ".join(words[:200]) + ". The rest is on the screen."
-        print(text)  # Full response still shown
-        TTS(speak_part, func)
-    else:
-        TTS(text, func)
+    return "".join(received)
 
 
 # -------------------------------
@@ -0,0 +1,27 @@
+# ==================================
+# TextUtils.py
+# ==================================
+# Small text helpers shared by modules that shouldn't depend on each other
+# (the decision model must not pull in audio and speech recognition).
+
+# Function to modify a query to ensure proper punctuation and formatting.
+def QueryModifier(Query: str) -> str:
+    new_query = Query.lower().strip()
+    query_words = new_query.split()
+    question_words = [
+        "how", "what", "who", "where", "when", "why", "which", "whose", "whom",
+        "can you", "what's", "where's", "how's"
+    ]
+
+    if query_words:
+        if any(new_query.startswith(word) for word in question_words):
+            if query_words[-1][-1] in ['.', '?', '!']:
+                new_query = new_query[:-1] + "?"
+            else:
+                new_query += "?"
+        else:
+            if query_words[-1][-1] in ['.', '?', '!']:
+                new_query = new_query[:-1] + "."
+            else:
+                new_query += "."
+    return new_query.capitalize()
@@ -0,0 +1,211 @@
+# ==================================
+# WakeWord.py
+# ==================================
+
+from dotenv import dotenv_values
+from collections import deque
+from Backend.SpeechToText import FrameEnergy, GetVoskModel, VoskModelPath
+import speech_recognition as sr
+import json
+import time
+import sys
+import os
+
+# ==============================
+# Load Environment Variables
+# ==============================
+env_vars = dotenv_values(".env")
+WakeWord = env_vars.get("WakeWord", "jarvis").strip().lower()
+WakeWordMinEnergy = float(env_vars.get("WakeWordMinEnergy", 300))
+WakeWordRatio = float(env_vars.get("WakeWordRatio", 2.5))
+WakeWordFixturesPath = os.path.join("Data", "WakeWordFixtures")
+
+SAMPLE_RATE = 16000
+FRAME_BYTES = 1024 * 2  # 64 ms of 16 kHz 16-bit mono
+PREROLL_FRAMES = 5  # ~320 ms kept from before the energy gate opens
+HANGOVER_FRAMES = 8  # ~500 ms of quiet before the gate closes again
+
+# ==============================
+# Detector
+# ==============================
+# Two stages keep the idle cost low:
+# 1. An energy gate with an adaptive noise floor; silence and steady
+#    background noise never reach the recognizer.
+# 2. A Vosk recognizer restricted to the grammar [wake word, "[unk]"], so
+#    decoding is a tiny search instead of full dictation.
+# Nothing leaves the machine; full STT only starts after a detection.
+class WakeWordDetector:
+    def __init__(self, word: str = WakeWord, model_path: str = VoskModelPath):
+        import vosk  # optional dependency, shared with the Vosk speech backend
+        self.word = word
+        self._vosk = vosk
+        self.model = GetVoskModel(model_path)
+        self._recognizer = self._new_recognizer()
+        self._preroll = deque(maxlen=PREROLL_FRAMES)
+        self._noise = None
+        self._quiet = 0
+        self.gate_open = False
+        self.cpu_seconds = 0.0
+        self.audio_seconds = 0.0
+        self.decoded_seconds = 0.0
+        self.detections = 0
+
+    def _new_recognizer(self):
+        return self._vosk.KaldiRecognizer(self.model, SAMPLE_RATE, json.dumps([self.word, "[unk]"]))
+
+    def reset(self):
+        self._recognizer.Reset()
+        self._preroll.clear()
+        self._quiet = 0
+        self.gate_open = False
+
+    def _heard(self, result: str, key: str) -> bool:
+        return self.word in json.loads(result).get(key, "").split()
+
+    # Feed one frame of 16 kHz 16-bit mono audio; True when the wake word was heard.
+    def process(self, frame: bytes) -> bool:
+        started = time.thread_time()
+        try:
+            return self._process(frame)
+        finally:
+            self.cpu_seconds += time.thread_time() - started
+            self.audio_seconds += len(frame) / (2 * SAMPLE_RATE)
+
+    def _process(self, frame: bytes) -> bool:
+        energy = FrameEnergy(frame)
+        if self._noise is None:
+            self._noise = energy
+        loud = energy > max(WakeWordMinEnergy, self._noise * WakeWordRatio)
+
+        if not self.gate_open:
+            self._preroll.append(frame)
+            if not loud:
+                self._noise = 0.95 * self._noise + 0.05 * energy
+                return False
+            self.gate_open = True
+            frames = list(self._preroll)
+            self._preroll.clear()
+        else:
+            frames = [frame]
+            self._quiet = 0 if loud else self._quiet + 1
+
+        for chunk in frames:
+            self.decoded_seconds += len(chunk) / (2 * SAMPLE_RATE)
+            if self._recognizer.AcceptWaveform(chunk):
+                if self._heard(self._recognizer.Result(), "text"):
+                    return self._detected()
+            elif self._heard(self._recognizer.PartialResult(), "partial"):
+                return self._detected()
+
+        if self._quiet >= HANGOVER_FRAMES:
+            heard = self._heard(self._recognizer.FinalResult(), "text")
+            self.reset()
+            if heard:
+                self.detections += 1
+                return True
+        return False
+
+    def _detected(self) -> bool:
+        self.detections += 1
+        self.reset()
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "detections": self.detections,
+            "audio_seconds": self.audio_seconds,
+            "decoded_share": self.decoded_seconds / self.audio_seconds if self.audio_seconds else 0.0,
+            "cpu_load": self.cpu_seconds / self.audio_seconds if self.audio_seconds else 0.0,  # of one core
+        }
+
+# ==============================
+# Microphone Loop
+# ==============================
+_detector = None
+
+def GetWakeWordDetector() -> WakeWordDetector:
+    global _detector
+    if _detector is None:
+        _detector = WakeWordDetector()
+    return _detector
+
+# Blocks until the wake word is heard (or should_stop() returns True).
+def WaitForWakeWord(on_status=None, should_stop=None) -> bool:
+    detector = GetWakeWordDetector()
+    detector.reset()
+    with sr.Microphone(sample_rate=SAMPLE_RATE, chunk_size=FRAME_BYTES // 2) as source:
+        if on_status:
+            on_status(f"Say '{detector.word.title()}' ... ")
+        while True:
+            if should_stop and should_stop():
+                return False
+            if detector.process(source.stream.read(source.CHUNK)):
+                print(f" 👂 Wake word '{detector.word}' detected")
+                return True
+
+# ==============================
+# Benchmark
+# ==============================
+# Runs the detector over <folder>/positive/*.wav (each contains the wake word)
+# and <folder>/negative/*.wav (speech and noise without it):
+#   python WakeWord.py --benchmark [folder]
+def LoadClips(folder: str) -> list:
+    clips = []
+    if not os.path.isdir(folder):
+        return clips
+    for name in sorted(os.listdir(folder)):
+        if name.lower().endswith(".wav"):
+            with sr.AudioFile(os.path.join(folder, name)) as source:
+                audio = sr.Recognizer().record(source)
+            clips.append((name, audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)))
+    return clips
+
+def Detect(detector: WakeWordDetector, data: bytes) -> bool:
+    detector.reset()
+    # A second of silence at the end lets the gate close and flush.
+    data += bytes(2 * SAMPLE_RATE)
+    return any(detector.process(data[i:i + FRAME_BYTES]) for i in range(0, len(data), FRAME_BYTES))
+
+def Benchmark(folder: str = WakeWordFixturesPath) -> dict:
+    positives = LoadClips(os.path.join(folder, "positive"))
+    negatives = LoadClips(os.path.join(folder, "negative"))
+    if not positives and not negatives:
+        print(f"No fixtures in {folder} (expected positive/*.wav and negative/*.wav).")
+        return {}
+
+    detector = WakeWordDetector()
+    started = time.perf_counter()
+    missed = [name for name, data in positives if not Detect(detector, data)]
+    false_accepts = [name for name, data in negatives if Detect(detector, data)]
+    elapsed = time.perf_counter() - started
+
+    stats = detector.stats()
+    report = {
+        "positives": len(positives),
+        "negatives": len(negatives),
+        "false_reject_rate": len(missed) / len(positives) if positives else 0.0,
+        "false_accept_rate": len(false_accepts) / len(negatives) if negatives else 0.0,
+        "false_accepts_per_hour": len(false_accepts) / (stats["audio_seconds"] / 3600) if stats["audio_seconds"] else 0.0,
+        "cpu_load": stats["cpu_load"],
+        "decoded_share": stats["decoded_share"],
+        "speed": stats["audio_seconds"] / elapsed if elapsed else 0.0,
+    }
+    print(f"false rejects {len(missed)}/{len(positives)} ({report['false_reject_rate']:.1%})  "
+          f"false accepts {len(false_accepts)}/{len(negatives)} ({report['false_accept_rate']:.1%}, "
+          f"{report['false_accepts_per_hour']:.1f}/hour of audio)")
+    print(f"CPU {report['cpu_load']:.1%} of one core, recognizer ran on {report['decoded_share']:.0%} "
+          f"of the audio, {report['speed']:.0f}x real time")
+    for name in missed:
+        print(f"  missed:         {name}")
+    for name in false_accepts:
+        print(f"  false accept:   {name}")
+    return report
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        args = sys.argv[sys.argv.index("--benchmark") + 1:]
+        Benchmark(args[0] if args else WakeWordFixturesPath)
+    else:
+        while True:
+            WaitForWakeWord()
+            print(GetWakeWordDetector().stats())
@@ -0,0 +1,284 @@
+# ==================================
+# WebSearch.py
+# ==================================
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from Backend.Resilience import ResilientCall
+from Backend.Cache import TTLCache
+from dotenv import dotenv_values
+import threading
+import time
+import re
+import os
+
+# ==============================
+# Load Environment Variables
+# ==============================
+env_vars = dotenv_values(".env")
+SearchProviderName = env_vars.get("SearchProvider", "google").strip().lower()
+SearchResults = int(env_vars.get("SearchResults", 5))
+SearchCacheSize = int(env_vars.get("SearchCacheSize", 256))
+SearchCacheTTL = float(env_vars.get("SearchCacheTTL", 15 * 60))  # results go stale; keep this short
+SearchDuplicateThreshold = float(env_vars.get("SearchDuplicateThreshold", 0.8))  # token Jaccard
+SearchWorkers = int(env_vars.get("SearchWorkers", 4))  # sub-queries searched at the same time
+SearchContextChars = int(env_vars.get("SearchContextChars", 3000))  # merged snippets handed to the LLM
+SEARCH_CACHE_PATH = os.path.join("Data", "SearchCache.json")
+
+# ==============================
+# Providers
+# ==============================
+# A provider returns a list of {"title", "description", "url"} dicts.
+
+# Scrapes Google through the `googlesearch` package.
+class GoogleSearchProvider:
+    def __init__(self):
+        from googlesearch import search  # heavy; only imported when searching for real
+        self._search = search
+
+    def search(self, query: str, num_results: int = SearchResults) -> list[dict]:
+        return [
+            {"title": r.title, "description": r.description, "url": r.url}
+            for r in self._search(query, advanced=True, num_results=num_results)
+        ]
+
+# Answers from a fixed table (or a generated placeholder) and records every
+# query, so tests run offline and can count how often the network would be hit.
+# `delay` simulates the latency of a real search.
+class StubSearchProvider:
+    def __init__(self, results: dict | None = None, delay: float = 0.0):
+        self.results = results or {}
+        self.delay = delay
+        self.queries = []
+
+    def search(self, query: str, num_results: int = SearchResults) -> list[dict]:
+        self.queries.append(query)
+        if self.delay:
+            time.sleep(self.delay)
+        if query in self.results:
+            return self.results[query][:num_results]
+        return [
+            {"title": f"{query} ({i + 1})", "description": f"Stub result {i + 1} for {query}.",
+             "url": f"https://example.com/{i + 1}?q={'+'.join(query.split())}"}
+            for i in range(num_results)
+        ]
+
+SEARCH_PROVIDERS = {
+    "google": GoogleSearchProvider,
+    "stub": StubSearchProvider,
+}
+
+_provider = None
+_provider_lock = threading.Lock()
+
+def GetSearchProvider():
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = SEARCH_PROVIDERS.get(SearchProviderName, GoogleSearchProvider)()
+        return _provider
+
+def SetSearchProvider(provider):
+    global _provider
+    _provider = provider
+
+# ==============================
+# Query Keys
+# ==============================
+# "What's the weather in Delhi?" and "delhi weather" should share a key:
+# lowercase, drop punctuation and filler words, then sort the tokens.
+FILLER_WORDS = {
+    "a", "an", "the", "is", "are", "was", "what", "whats", "what's", "who", "whos", "tell", "me",
+    "about", "please", "in", "of", "for", "on", "at", "to", "can", "you", "search", "find",
+    "show", "give", "latest", "current", "today", "today's", "now", "right", "do", "does", "know",
+}
+TOKEN = re.compile(r"[\w']+")
+
+def QueryTokens(query: str) -> frozenset:
+    tokens = [t.strip("'") for t in TOKEN.findall(query.lower())]
+    meaningful = [t for t in tokens if t and t not in FILLER_WORDS]
+    return frozenset(meaningful or tokens)
+
+def NormalizeQuery(query: str) -> str:
+    return " ".join(sorted(QueryTokens(query)))
+
+def Jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+# ==============================
+# Search Cache
+# ==============================
+# Exact hits come from the TTLCache under the normalized key. On a miss the
+# query's tokens are compared with the recently cached ones; a Jaccard
+# overlap of at least `threshold` counts as the same search ("weather delhi
+# now" after "delhi weather"). The scan is linear but bounded by maxsize.
+class SearchCache:
+    def __init__(self, maxsize: int = SearchCacheSize, ttl: float = SearchCacheTTL,
+                 threshold: float = SearchDuplicateThreshold, path: str | None = SEARCH_CACHE_PATH):
+        self.threshold = threshold
+        self._results = TTLCache(maxsize=maxsize, ttl=ttl, path=path)
+        # normalized key -> token set, in insertion order; a key is its sorted tokens
+        self._tokens = OrderedDict((key, frozenset(key.split())) for key in self._results.keys())
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def _nearest(self, tokens: frozenset) -> str | None:
+        with self._lock:
+            candidates = list(self._tokens.items())
+        best, best_score = None, self.threshold
+        for key, other in reversed(candidates):  # newest first
+            score = Jaccard(tokens, other)
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    def get(self, query: str) -> list[dict] | None:
+        tokens = QueryTokens(query)
+        key = " ".join(sorted(tokens))
+        results = self._results.get(key)
+        if results is not None:
+            self.exact_hits += 1
+            return results
+
+        near = self._nearest(tokens)
+        results = self._results.get(near) if near is not None else None
+        if results is not None:
+            self.near_hits += 1
+            return results
+
+        self.misses += 1
+        return None
+
+    def put(self, query: str, results: list[dict]):
+        tokens = QueryTokens(query)
+        key = " ".join(sorted(tokens))
+        self._results.put(key, results)
+        with self._lock:
+            self._tokens[key] = tokens
+            self._tokens.move_to_end(key)
+            while len(self._tokens) > self._results.maxsize:
+                self._tokens.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.near_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.near_hits) / lookups if lookups else 0.0,
+            "cache": self._results.stats(),
+        }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def GetSearchCache() -> SearchCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchCache()
+        return _cache
+
+def SetSearchCache(cache: SearchCache):
+    global _cache
+    _cache = cache
+
+# ==============================
+# Search
+# ==============================
+# Cached search; an empty or failed search is not cached, so the next
+# attempt goes back to the provider.
+def Search(query: str, num_results: int = SearchResults) -> list[dict]:
+    cache = GetSearchCache()
+    results = cache.get(query)
+    if results is not None:
+        return results[:num_results]
+
+    results = ResilientCall("search", GetSearchProvider().search, query, num_results, fallback=list)
+    if results:
+        cache.put(query, results)
+    return results
+
+def SearchStats() -> dict:
+    return GetSearchCache().stats()
+
+# ==============================
+# Fan-Out
+# ==============================
+# "weather in delhi and who won the match" is two searches, not one long
+# query. Sub-queries run on a bounded pool (the provider is a scraper, so
+# only a few at a time); identical ones after normalization run once.
+_search_pool = ThreadPoolExecutor(max_workers=SearchWorkers, thread_name_prefix="search")
+
+def SearchMany(queries: list[str], num_results: int = SearchResults) -> list[list[dict]]:
+    unique = {}
+    for query in queries:
+        unique.setdefault(NormalizeQuery(query), query)
+    futures = [_search_pool.submit(Search, query, num_results) for query in unique.values()]
+    return [future.result() for future in futures]
+
+# Merges several ranked lists into one: reciprocal-rank fusion, so a result
+# found by more than one sub-query rises, while each sub-query's top results
+# still come before anyone's tail. Results with the same URL, or whose text
+# overlaps by `threshold` or more, are kept once. Results are added in rank
+# order until `budget` characters of title and description are used.
+def MergeResults(result_lists: list[list[dict]], budget: int = SearchContextChars,
+                 threshold: float = SearchDuplicateThreshold, k: int = 60) -> list[dict]:
+    scores = {}
+    first_seen = {}
+    for results in result_lists:
+        for rank, result in enumerate(results):
+            key = result.get("url") or result.get("title", "")
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+            first_seen.setdefault(key, result)
+
+    merged, seen_tokens, used = [], [], 0
+    for key in sorted(scores, key=scores.get, reverse=True):
+        result = first_seen[key]
+        tokens = QueryTokens(f"{result.get('title', '')} {result.get('description', '')}")
+        if any(Jaccard(tokens, other) >= threshold for other in seen_tokens):
+            continue
+        size = len(result.get("title", "")) + len(result.get("description", ""))
+        if merged and used + size > budget:
+            continue  # a shorter result further down may still fit
+        merged.append(result)
+        seen_tokens.append(tokens)
+        used += size
+    return merged
+
+# ==============================
+# Self Check
+# ==============================
+if __name__ == "__main__":
+    provider = StubSearchProvider()
+    SetSearchProvider(provider)
+    SetSearchCache(SearchCache(path=None))
+
+    queries = [
+        "What's the weather in Delhi?",
+        "delhi weather",
+        "weather in delhi right now",
+        "Who won the cricket world cup",
+        "who won the cricket world cup final",
+        "cricket world cup winner",
+        "Tell me about the latest iPhone",
+        "latest iphone",
+    ]
+    for query in queries:
+        Search(query)
+    print(f"{len(queries)} searches, {len(provider.queries)} provider calls: {provider.queries}")
+    print(SearchStats())
+
+    # Fan-out: two new sub-queries (plus a cached one) searched concurrently.
+    slow = StubSearchProvider(delay=0.3)
+    SetSearchProvider(slow)
+    started = time.perf_counter()
+    merged = MergeResults(SearchMany(["weather in Paris", "Paris population", "delhi weather"]), budget=400)
+    print(f"3 sub-queries in {time.perf_counter() - started:.2f}s, {len(slow.queries)} provider calls, "
+          f"{len(merged)} merged results:")
+    for result in merged:
+        print(f"  {result['title']}")